@@ -3,3 +3,14 @@ from django.apps import AppConfig
 
 class ApiConfig(AppConfig):
     name = "api"
+
+    def ready(self):
+        from django.apps import apps
+        from django.conf import settings
+        from . import checks  # noqa: F401
+        from .cache import track_table_changes
+
+        track_table_changes(
+            apps.get_model(label)
+            for label in settings.RESPONSE_CACHE_TRACKED_MODELS
+        )
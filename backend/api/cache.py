@@ -0,0 +1,363 @@
+"""Conditional GET and response cache for read-only views.
+
+Responses are fingerprinted without touching the database: the path, the
+normalized query string, the negotiated media type, the requester's role
+bucket and the versions of the tables the view reads.
+
+`ConditionalGetMixin` sends the fingerprint as `ETag`, and the time of the
+last change to those tables as `Last-Modified`; `If-None-Match` and
+`If-Modified-Since` are answered 304 before any query or serialization.
+`CachedResponseMixin` also caches the rendered body of `list` responses
+under the fingerprint:
+
+- anonymous requests share one bucket, so they are answered from the
+  cache without touching the database;
+- signed-in users share a bucket per role, except developers (who also
+  see their own unpublished content) and views with per-user fields,
+  which get one bucket per user.
+
+Table versions are bumped by model signals for the models listed in
+`RESPONSE_CACHE_TRACKED_MODELS` (and for every many-to-many change);
+code that writes with queryset updates or `bulk_create` bumps them
+itself with `bump_table_versions`.
+
+Both mixins count requests, 304s, cache hits and coalesced requests per
+view; see `cache_metrics`.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+from .coalesce import coalesce
+from .compression import apply_encoding, precompress
+
+
+TABLE_VERSION_KEY = 'api:table-version:{}'
+TABLE_MODIFIED_KEY = 'api:table-modified:{}'
+METRIC_KEY = 'api:metrics:{}:{}'
+METRIC_EVENTS = (
+    'requests', 'not_modified', 'cache_hits', 'cache_misses', 'coalesced',
+)
+
+# Only machine-readable responses are cached; the browsable API embeds
+# the current user and forms
+CACHED_FORMATS = ('json', 'msgpack')
+
+
+def _table(model):
+    return model._meta.db_table
+
+
+def table_state(models):
+    """Return the current versions of the models' tables, in order, and
+    the time (epoch seconds) of the latest change to any of them."""
+    tables = [_table(model) for model in models]
+    keys = [TABLE_VERSION_KEY.format(table) for table in tables]
+    modified_keys = [TABLE_MODIFIED_KEY.format(table) for table in tables]
+    found = cache.get_many(keys + modified_keys)
+    missing = [key for key in keys + modified_keys if key not in found]
+    if missing:
+        now = time.time()
+        for key in missing:
+            initial = int(now * 1000) if key in keys else now
+            cache.add(key, initial, timeout=None)
+        found.update(cache.get_many(missing))
+    return (
+        [found[key] for key in keys],
+        max((found[key] for key in modified_keys), default=0),
+    )
+
+
+def table_versions(models):
+    """Return the current versions of the models' tables, in order."""
+    return table_state(models)[0]
+
+
+def bump_table_versions(models):
+    """Invalidate cached responses built from the models' tables."""
+    now = time.time()
+    for model in models:
+        key = TABLE_VERSION_KEY.format(_table(model))
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, int(now * 1000), timeout=None)
+            cache.incr(key)
+    cache.set_many(
+        {TABLE_MODIFIED_KEY.format(_table(model)): now for model in models},
+        timeout=None,
+    )
+
+
+def _model_changed(sender, raw=False, **kwargs):
+    if not raw:
+        bump_table_versions([sender])
+
+
+def _m2m_changed(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_table_versions([sender])
+
+
+def track_table_changes(models):
+    """Bump table versions when instances of `models` are saved or
+    deleted, and on every many-to-many change."""
+    for model in models:
+        post_save.connect(
+            _model_changed, sender=model,
+            dispatch_uid=f'api-cache-save-{_table(model)}',
+        )
+        post_delete.connect(
+            _model_changed, sender=model,
+            dispatch_uid=f'api-cache-delete-{_table(model)}',
+        )
+    m2m_changed.connect(_m2m_changed, dispatch_uid='api-cache-m2m')
+
+
+def role_bucket(request, per_user=False):
+    """Cache bucket of the requester: `anon`, `user`, `admin`, or one
+    bucket per developer (and per user with `per_user`)."""
+    user = request.user
+    if not user or not user.is_authenticated:
+        return 'anon'
+    role = getattr(user, 'role', None) or 'user'
+    if per_user or role == 'developer':
+        return f'{role}:{user.pk}'
+    return role
+
+
+# Names of the views using the mixins below, reported by `cache_metrics`
+_metric_views = set()
+
+
+def _count(view, event):
+    key = METRIC_KEY.format(view, event)
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def cache_metrics():
+    """Request, 304, response cache and coalescing counts per view, with
+    hit rates."""
+    names = sorted(_metric_views)
+    found = cache.get_many([
+        METRIC_KEY.format(name, event)
+        for name in names for event in METRIC_EVENTS
+    ])
+    metrics = {}
+    for name in names:
+        counts = {
+            event: found.get(METRIC_KEY.format(name, event), 0)
+            for event in METRIC_EVENTS
+        }
+        requests = counts['requests']
+        lookups = counts['cache_hits'] + counts['cache_misses']
+        counts['not_modified_rate'] = (
+            round(counts['not_modified'] / requests, 4) if requests else None
+        )
+        counts['cache_hit_rate'] = (
+            round(counts['cache_hits'] / lookups, 4) if lookups else None
+        )
+        metrics[name] = counts
+    return metrics
+
+
+class ConditionalGetMixin:
+    """Answers conditional GETs of `list` and `retrieve` (see module docs).
+
+    `cache_models` lists the models (or many-to-many through models)
+    whose changes affect the response; `cache_per_user` marks views whose
+    responses include per-user fields, and such views return the version
+    of that per-user data from `get_user_state`. Views whose responses
+    also change with time (rankings over a sliding window) return the
+    length of the window step from `get_validator_period`.
+
+    Plain API views call `conditional(request, render)` from their
+    handler instead.
+    """
+    cache_models = ()
+    cache_per_user = False
+    validator_period = None
+
+    # Set by `conditional` for the request being answered
+    response_digest = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if not cls.__name__.endswith('Mixin'):
+            _metric_views.add(cls.__name__)
+
+    def get_validator_period(self):
+        return self.validator_period
+
+    def get_user_state(self, request):
+        """Version of the requester's own data in the response and the
+        time (epoch seconds) it last changed, or None."""
+        return None
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(request, super().retrieve, *args, **kwargs)
+
+    def response_fingerprint(self, request):
+        """Digest of everything the response depends on, and the time it
+        last changed; None for requests that are not validated."""
+        renderer = getattr(request, 'accepted_renderer', None)
+        if (
+            request.method not in ('GET', 'HEAD')
+            or renderer is None or renderer.format not in CACHED_FORMATS
+        ):
+            return None
+        versions, last_modified = table_state(self.cache_models)
+        period = self.get_validator_period()
+        window = ''
+        if period:
+            window = int(time.time() // period)
+            last_modified = max(last_modified, window * period)
+        user_version = ''
+        user_state = self.get_user_state(request)
+        if user_state is not None:
+            user_version, user_modified = user_state
+            last_modified = max(last_modified, user_modified)
+
+        query = sorted(
+            (name, value)
+            for name, values in request.query_params.lists()
+            for value in values if value != ''
+        )
+        parts = [
+            request.path, repr(query), request.accepted_media_type,
+            role_bucket(request, self.cache_per_user),
+            request.headers.get('Accept-Language', '')
+            if self._varies_on_language(request) else '',
+            str(window), str(user_version), *map(str, versions),
+        ]
+        digest = hashlib.blake2b(
+            '\0'.join(parts).encode(), digest_size=16
+        ).hexdigest()
+        return digest, last_modified
+
+    def conditional(self, request, render, *args, **kwargs):
+        """Return 304 when the client's copy is current, else the response
+        of `render`, with validators attached."""
+        view = type(self).__name__
+        fingerprint = self.response_fingerprint(request)
+        if fingerprint is None:
+            return render(request, *args, **kwargs)
+        digest, last_modified = fingerprint
+        self.response_digest = digest
+        etag = f'"{digest}"'
+        # HTTP dates have one-second resolution; round up so a change later
+        # in the same second is not reported as older than the response
+        last_modified = int(-(-last_modified // 1))
+
+        _count(view, 'requests')
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is not None:
+            if response.status_code == 304:
+                _count(view, 'not_modified')
+        else:
+            response = render(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            # Compressed bodies (api/compression.py) have their own bytes
+            weak = response.has_header('Content-Encoding')
+            response['ETag'] = f'W/{etag}' if weak else etag
+            response['Last-Modified'] = http_date(last_modified)
+        # The response depends on the token through the role bucket
+        patch_vary_headers(response, ['Authorization'])
+        if self._varies_on_language(request):
+            patch_vary_headers(response, ['Accept-Language'])
+        return response
+
+    def _varies_on_language(self, request):
+        return request.query_params.get('lang') == 'auto'
+
+
+class CachedResponseMixin(ConditionalGetMixin):
+    """Also caches the rendered body of `list` responses under their
+    fingerprint. Concurrent identical requests that miss the cache are
+    coalesced: one renders, the others reuse its response
+    (api/coalesce.py).
+
+    Plain API views wrap their renderer with `cached`.
+    """
+
+    def list(self, request, *args, **kwargs):
+        render = super(ConditionalGetMixin, self).list
+        return self.conditional(
+            request, self.cached(render), *args, **kwargs
+        )
+
+    def cached(self, render):
+        """`render` served from the response cache."""
+        def cached_render(request, *args, **kwargs):
+            if self.response_digest is None:
+                return render(request, *args, **kwargs)
+            view = type(self).__name__
+            # Entries are (body, content type, precompressed bodies)
+            key = f'api:response-body:{self.response_digest}'
+            cached = cache.get(key)
+            if cached is not None:
+                _count(view, 'cache_hits')
+                content, content_type, encoded = cached
+                return apply_encoding(
+                    request,
+                    HttpResponse(content, content_type=content_type),
+                    encoded,
+                )
+
+            _count(view, 'cache_misses')
+
+            def compute():
+                response = render(request, *args, **kwargs)
+                response.accepted_renderer = request.accepted_renderer
+                response.accepted_media_type = request.accepted_media_type
+                response.renderer_context = self.get_renderer_context()
+                response.render()
+                content_type = response['Content-Type']
+                encoded = {}
+                if response.status_code == 200:
+                    encoded = precompress(response.content, content_type)
+                    cache.set(
+                        key, (response.content, content_type, encoded),
+                        timeout=settings.RESPONSE_CACHE_TIMEOUT,
+                    )
+                return response, (
+                    response.content, content_type, response.status_code,
+                    encoded,
+                )
+
+            def lookup():
+                found = cache.get(key)
+                if found is None:
+                    return None
+                content, content_type, encoded = found
+                return None, (content, content_type, 200, encoded)
+
+            (response, entry), shared = coalesce(
+                key, compute, settings.RESPONSE_COALESCE_TIMEOUT,
+                lookup if settings.RESPONSE_COALESCE_SHARED else None,
+            )
+            content, content_type, status, encoded = entry
+            if shared:
+                # Followers get their own copy of the leader's response
+                _count(view, 'coalesced')
+                response = HttpResponse(
+                    content, content_type=content_type, status=status
+                )
+            return apply_encoding(request, response, encoded)
+        return cached_render
@@ -0,0 +1,113 @@
+"""Request coalescing ("single flight").
+
+When identical expensive requests arrive together, one of them (the
+leader) computes the result and the others wait for it instead of running
+the same queries:
+
+- within a worker process, followers block on the leader's call and get
+  its result, or its exception re-raised;
+- optionally across workers, the leader also holds a lock in the shared
+  cache, and followers in other processes poll for the result the leader
+  stores there. If the lock is released without a result (the leader
+  failed), they compute it themselves.
+
+Followers never wait longer than `timeout` seconds; after that they
+compute the result themselves.
+"""
+
+import threading
+import time
+
+from django.core.cache import cache
+
+
+LOCK_KEY = 'api:flight:{}'
+# Interval between polls of followers in other workers (seconds)
+POLL_INTERVAL = 0.05
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key within the process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, compute, timeout):
+        """Return `(result, shared)`: the result of `compute()`, run once
+        for all concurrent callers with `key`, and whether it came from
+        another caller."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            if not call.done.wait(timeout):
+                return compute(), False
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = compute()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+
+flights = SingleFlight()
+
+
+def _shared(key, compute, lookup, timeout):
+    lock = LOCK_KEY.format(key)
+    deadline = time.monotonic() + timeout
+    while not cache.add(lock, 1, timeout=max(1, int(timeout))):
+        if time.monotonic() >= deadline:
+            return compute(), False
+        time.sleep(POLL_INTERVAL)
+        result = lookup()
+        if result is not None:
+            return result, True
+        if cache.get(lock) is None:
+            # Released without a result: try to lead
+            continue
+    try:
+        # The previous leader may have finished between two polls
+        result = lookup()
+        if result is not None:
+            return result, True
+        return compute(), False
+    finally:
+        cache.delete(lock)
+
+
+def coalesce(key, compute, timeout, lookup=None):
+    """Run `compute()` once for concurrent callers with `key`; returns
+    `(result, shared)`.
+
+    With `lookup`, callers are also coalesced across workers: `compute`
+    must store its result where `lookup()` finds it (returning None while
+    it is missing).
+    """
+    if lookup is None:
+        return flights.do(key, compute, timeout)
+    (result, shared), joined = flights.do(
+        key, lambda: _shared(key, compute, lookup, timeout), timeout
+    )
+    return result, shared or joined
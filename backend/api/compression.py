@@ -0,0 +1,211 @@
+"""Response compression.
+
+`CompressionMiddleware` compresses GET responses whose content type is in
+`COMPRESSIBLE_CONTENT_TYPES` with the best encoding the client accepts:
+brotli (when the `brotli` package is installed), then gzip.
+
+- Bodies shorter than `COMPRESSION_MIN_SIZE` are sent as they are.
+- Streaming responses are compressed chunk by chunk, flushing after each
+  chunk so that clients receive data as it is produced. Up to
+  `COMPRESSION_MIN_SIZE` bytes are read ahead to apply the size threshold.
+- Responses that are already encoded (cached bodies stored compressed,
+  see `precompress`), partial content and other methods are left alone;
+  compressing only GET responses keeps secrets returned by POSTs (tokens)
+  out of reach of compression side channels.
+
+Compressed responses get a weak ETag and `Vary: Accept-Encoding`.
+"""
+
+import gzip
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+
+# Server preference, best first
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def accepted_encoding(request):
+    """The preferred encoding the client accepts (`Accept-Encoding`,
+    honouring q-values), or None."""
+    header = request.headers.get('Accept-Encoding', '')
+    weights = {}
+    for item in header.split(','):
+        name, _, params = item.partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        weight = 1.0
+        for param in params.split(';'):
+            key, _, value = param.partition('=')
+            if key.strip() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[name] = weight
+
+    best, best_weight = None, 0.0
+    for encoding in ENCODINGS:
+        weight = weights.get(encoding, weights.get('*', 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def compressible(content_type):
+    media_type = (content_type or '').split(';')[0].strip().lower()
+    return media_type in settings.COMPRESSIBLE_CONTENT_TYPES
+
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(
+            data, quality=settings.COMPRESSION_BROTLI_QUALITY
+        )
+    return gzip.compress(
+        data, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0
+    )
+
+
+def precompress(content, content_type):
+    """`{encoding: body}` of every supported encoding worth sending for a
+    response body, to store next to it in a cache."""
+    if len(content) < settings.COMPRESSION_MIN_SIZE or not compressible(
+        content_type
+    ):
+        return {}
+    encoded = {}
+    for encoding in ENCODINGS:
+        body = compress(content, encoding)
+        if len(body) < len(content):
+            encoded[encoding] = body
+    return encoded
+
+
+def apply_encoding(request, response, encoded):
+    """Replace the body of `response` with the variant in `encoded` (from
+    `precompress`) the client prefers, if any."""
+    encoding = accepted_encoding(request)
+    if encoding not in encoded:
+        return response
+    response.content = encoded[encoding]
+    if response.has_header('Content-Length'):
+        response['Content-Length'] = str(len(response.content))
+    response['Content-Encoding'] = encoding
+    patch_vary_headers(response, ['Accept-Encoding'])
+    _weaken_etag(response)
+    return response
+
+
+class _StreamCompressor:
+    def __init__(self, encoding):
+        if encoding == 'br':
+            compressor = brotli.Compressor(
+                quality=settings.COMPRESSION_BROTLI_QUALITY
+            )
+            self.process = compressor.process
+            self.flush = compressor.flush
+            self.finish = compressor.finish
+        else:
+            compressor = zlib.compressobj(
+                settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31
+            )
+            self.process = compressor.compress
+            self.flush = lambda: compressor.flush(zlib.Z_SYNC_FLUSH)
+            self.finish = compressor.flush
+
+    def chunk(self, data):
+        return self.process(data) + self.flush()
+
+
+def compress_stream(chunks, encoding):
+    compressor = _StreamCompressor(encoding)
+    for chunk in chunks:
+        data = compressor.chunk(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def acompress_stream(chunks, encoding):
+    compressor = _StreamCompressor(encoding)
+    async for chunk in chunks:
+        data = compressor.chunk(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+def _weaken_etag(response):
+    etag = response.get('ETag')
+    if etag and etag.startswith('"'):
+        response['ETag'] = 'W/' + etag
+
+
+class CompressionMiddleware:
+    """Compresses responses (see module docs)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            request.method != 'GET'
+            or response.status_code == 206
+            or response.has_header('Content-Encoding')
+            or not compressible(response.get('Content-Type'))
+        ):
+            return response
+        patch_vary_headers(response, ['Accept-Encoding'])
+        encoding = accepted_encoding(request)
+        if encoding is None:
+            return response
+
+        if not response.streaming:
+            content = response.content
+            if len(content) < settings.COMPRESSION_MIN_SIZE:
+                return response
+            body = compress(content, encoding)
+            if len(body) >= len(content):
+                return response
+            response.content = body
+            response['Content-Length'] = str(len(body))
+        elif response.is_async:
+            response.streaming_content = acompress_stream(
+                response.streaming_content, encoding
+            )
+            del response['Content-Length']
+        else:
+            chunks = iter(response.streaming_content)
+            head, size = [], 0
+            for chunk in chunks:
+                head.append(chunk)
+                size += len(chunk)
+                if size >= settings.COMPRESSION_MIN_SIZE:
+                    break
+            else:
+                # The whole stream is below the threshold
+                response.streaming_content = head
+                return response
+            response.streaming_content = compress_stream(
+                _chain(head, chunks), encoding
+            )
+            del response['Content-Length']
+
+        response['Content-Encoding'] = encoding
+        _weaken_etag(response)
+        return response
+
+
+def _chain(head, rest):
+    yield from head
+    yield from rest
@@ -0,0 +1,42 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from games.models import Game
+
+
+def _measure(game):
+    """Compute size and digest for one game file (runs in a worker thread)."""
+    try:
+        game.record_file_metadata()
+    except Exception:
+        return None
+    return game
+
+
+class Command(BaseCommand):
+    help = 'Records file size and SHA-256 for games stored before hashing'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Number of files hashed in parallel'
+        )
+
+    def handle(self, *args, **options):
+        qs = (
+            Game.objects.filter(file_sha256='')
+            .exclude(file_path='')
+            .only('id', 'file_path')
+        )
+        updated = []
+        with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as pool:
+            for game in pool.map(_measure, qs.iterator()):
+                if game is not None and game.file_sha256:
+                    updated.append(game)
+
+        Game.objects.bulk_update(
+            updated, ['file_size', 'file_sha256'], batch_size=200
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Recorded hashes for {len(updated)} game file(s)'
+        ))
@@ -0,0 +1,72 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from api.cache import bump_table_versions
+from games.models import Game, Screenshot
+from games.placeholders import build_placeholder
+
+
+def _compute(screenshot):
+    """Build the placeholder for one screenshot (runs in a worker thread)."""
+    try:
+        with screenshot.image_path.open('rb') as f:
+            return screenshot, build_placeholder(f)
+    except Exception:
+        return screenshot, ''
+
+
+def _save(screenshots):
+    """Store placeholders; the games' cached fragments (keyed on
+    `updated_at`) and cached responses carry them, so refresh those."""
+    Screenshot.objects.bulk_update(screenshots, ['placeholder'])
+    Game.touch({screenshot.game_id for screenshot in screenshots})
+    bump_table_versions([Screenshot, Game])
+
+
+class Command(BaseCommand):
+    help = 'Computes image placeholders for screenshots that lack one'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Number of threads decoding images in parallel'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=200,
+            help='Rows written per bulk update'
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Recompute placeholders even when one is already stored'
+        )
+
+    def handle(self, *args, **options):
+        qs = Screenshot.objects.only('id', 'game_id', 'image_path').order_by('id')
+        if not options['force']:
+            qs = qs.filter(placeholder='')
+
+        batch_size = max(1, options['batch_size'])
+        done = failed = 0
+        pending = []
+
+        # Image decoding happens in worker threads; database writes stay on
+        # the main thread and are flushed in batches with bulk_update.
+        with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as pool:
+            for screenshot, placeholder in pool.map(_compute, qs.iterator()):
+                if not placeholder:
+                    failed += 1
+                    continue
+                screenshot.placeholder = placeholder
+                pending.append(screenshot)
+                if len(pending) >= batch_size:
+                    _save(pending)
+                    done += len(pending)
+                    pending = []
+
+        if pending:
+            _save(pending)
+            done += len(pending)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Placeholders updated: {done}, failed: {failed}'
+        ))
@@ -0,0 +1,111 @@
+import datetime
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from api.renderers import MessagePackRenderer, ORJSONRenderer
+
+
+RENDERERS = [
+    ('json (stdlib)', JSONRenderer()),
+    ('orjson', ORJSONRenderer()),
+    ('msgpack', MessagePackRenderer()),
+]
+
+
+def games_list_payload(count):
+    """A `games-list` response of `count` games, as GameSerializer
+    returns it (strings for timestamps, nested categories)."""
+    categories = [
+        {
+            'id': i, 'name': f'Category {i}', 'description': 'Games of a kind',
+            'name_ar': f'فئة {i}', 'description_ar': 'ألعاب من نوع ما',
+        }
+        for i in range(1, 9)
+    ]
+    return [
+        {
+            'id': i,
+            'title': f'Game {i}',
+            'description': 'A long description of the game. ' * 8,
+            'title_ar': f'لعبة {i}',
+            'description_ar': 'وصف طويل للعبة. ' * 8,
+            'file_path': f'http://testserver/media/games/{i:064x}.zip',
+            'status': 'approved',
+            'developer': i % 50,
+            'categories': categories[i % 3:i % 3 + 2],
+            'base_screenshot': f'http://testserver/media/screenshots/{i}.jpg',
+            'base_screenshot_placeholder': 'data:image/jpeg;base64,' + 'A' * 600,
+            'average_rating': 3.5 + (i % 3) / 2,
+            'download_count': i * 7,
+            'in_library': None,
+            'file_validation_status': 'valid',
+            'file_validation_report': {
+                'errors': [], 'format': 'zip', 'size': i * 1024,
+                'entries': 12, 'ratio': 2.5,
+            },
+            'created_at': '2025-12-18T19:00:00.123456Z',
+            'updated_at': '2025-12-18T19:00:00.123456Z',
+        }
+        for i in range(count)
+    ]
+
+
+def analytics_payload(count):
+    """Analytics-style rows of `count` periods, with the raw date,
+    datetime and Decimal values that go through the encoder fallback."""
+    start = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+    return [
+        {
+            'period': (start + datetime.timedelta(days=i)).date(),
+            'computed_at': start + datetime.timedelta(days=i, seconds=i),
+            'count': i % 500,
+            'average_rating': Decimal('3.75') + Decimal(i % 5) / 4,
+        }
+        for i in range(count)
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Compares response serialization throughput of the renderers'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--games', type=int, default=5000,
+            help='Games in the games-list payload'
+        )
+        parser.add_argument(
+            '--rows', type=int, default=20000,
+            help='Rows in the analytics payload'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='Renders per renderer and payload (the best run is kept)'
+        )
+
+    def handle(self, *args, **options):
+        payloads = [
+            (f'games-list ({options["games"]} games)',
+             games_list_payload(options['games'])),
+            (f'analytics ({options["rows"]} rows)',
+             analytics_payload(options['rows'])),
+        ]
+        repeat = max(1, options['repeat'])
+
+        for label, data in payloads:
+            self.stdout.write(label)
+            baseline = None
+            for name, renderer in RENDERERS:
+                best = float('inf')
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    body = renderer.render(data, renderer.media_type, {})
+                    best = min(best, time.perf_counter() - started)
+                baseline = baseline or best
+                self.stdout.write(
+                    f'  {name:<14} {best * 1000:9.2f} ms'
+                    f'  {len(body) / best / 1024 ** 2:9.1f} MiB/s'
+                    f'  {len(body) / 1024:9.1f} KiB'
+                    f'  x{baseline / best:.1f}'
+                )
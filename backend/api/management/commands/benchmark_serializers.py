@@ -0,0 +1,94 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Avg, Count
+from django.test import RequestFactory
+from rest_framework.request import Request
+from games.models import Game, Review
+from games.serializers import GameSerializer, ReviewSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares the field-by-field and compiled list serialization of '
+        'games and reviews from the current database'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit', type=int, default=1000,
+            help='Rows loaded per model'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='Runs per serializer (the best run is kept)'
+        )
+        parser.add_argument(
+            '--query', default='',
+            help='Query string of the simulated request, e.g. "view=card"'
+        )
+
+    def handle(self, *args, **options):
+        limit = options['limit']
+        path = '/api/games/games-list/'
+        if options['query']:
+            path += '?' + options['query']
+        host = next(
+            (h.lstrip('.') for h in settings.ALLOWED_HOSTS if h != '*'),
+            'localhost',
+        )
+        request = Request(RequestFactory().get(path, HTTP_HOST=host))
+        context = {'request': request}
+
+        games = list(
+            Game.objects.filter(status='approved')
+            .select_related('cover')
+            .prefetch_related('categories')
+            .annotate(
+                average_rating=Avg('reviews__rating'),
+                download_count=Count('downloads', distinct=True),
+            )
+            .order_by('-created_at')[:limit]
+        )
+        reviews = list(
+            Review.objects.select_related('user').order_by('-created_at')[:limit]
+        )
+        if not games and not reviews:
+            raise CommandError(
+                'No games or reviews to serialize; run populate_db first.'
+            )
+
+        for label, serializer_class, rows in (
+            ('games', GameSerializer, games),
+            ('reviews', ReviewSerializer, reviews),
+        ):
+            if not rows:
+                continue
+            child = serializer_class(context=context)
+            per_field = self._best(
+                options['repeat'],
+                lambda: [child.to_representation(row) for row in rows],
+            )
+            compiled = self._best(
+                options['repeat'],
+                lambda: [
+                    represent(row)
+                    for represent in [child.compile_representation()]
+                    for row in rows
+                ],
+            )
+            self.stdout.write(
+                f'{label} ({len(rows)} rows): '
+                f'per-field {per_field * 1000:.2f} ms, '
+                f'compiled {compiled * 1000:.2f} ms '
+                f'(x{per_field / compiled:.1f})'
+            )
+
+    def _best(self, repeat, func):
+        best = float('inf')
+        for _ in range(max(1, repeat)):
+            started = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - started)
+        return best
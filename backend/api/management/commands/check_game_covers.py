@@ -0,0 +1,49 @@
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from games.models import Game, Screenshot
+
+
+class Command(BaseCommand):
+    help = (
+        'Checks that every Game.cover points at its base screenshot '
+        '(use --fix to repair mismatches)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix', action='store_true',
+            help='Repair inconsistent games instead of only reporting them'
+        )
+
+    def handle(self, *args, **options):
+        # Expected state, built from a single query over base screenshots
+        expected = {
+            game_id: (shot_id, default_storage.url(name))
+            for game_id, shot_id, name in Screenshot.objects.filter(
+                is_base=True
+            ).values_list('game_id', 'id', 'image_path')
+        }
+
+        mismatched = []
+        games = Game.objects.values_list('id', 'cover_id', 'cover_url')
+        for game_id, cover_id, cover_url in games.iterator():
+            if (cover_id, cover_url) != expected.get(game_id, (None, '')):
+                mismatched.append(game_id)
+
+        for game_id in mismatched:
+            self.stdout.write(
+                self.style.WARNING(f'Game {game_id}: cover out of sync')
+            )
+            if options['fix']:
+                Game.sync_cover(game_id)
+
+        if not mismatched:
+            self.stdout.write(self.style.SUCCESS('All game covers consistent'))
+        elif options['fix']:
+            self.stdout.write(
+                self.style.SUCCESS(f'Repaired {len(mismatched)} game(s)')
+            )
+        else:
+            self.stdout.write(self.style.ERROR(
+                f'{len(mismatched)} inconsistent game(s); rerun with --fix'
+            ))
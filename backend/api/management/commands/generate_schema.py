@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from api.schema import write_schema
+
+
+class Command(BaseCommand):
+    help = (
+        'Generates the OpenAPI schema served at /swagger.json into '
+        'API_SCHEMA_FILE (run on deploy)'
+    )
+
+    def handle(self, *args, **options):
+        document = write_schema()
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {settings.API_SCHEMA_FILE} '
+            f'({len(document.content)} bytes, '
+            f'{len(document.gzipped)} gzipped)'
+        ))
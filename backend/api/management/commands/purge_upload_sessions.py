@@ -0,0 +1,55 @@
+import os
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from games.models import UploadSession
+
+
+class Command(BaseCommand):
+    help = 'Deletes stale resumable upload sessions and their part files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours', type=int,
+            default=settings.UPLOAD_SESSION_MAX_AGE_HOURS,
+            help='Remove unattached sessions idle for longer than this'
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['hours'])
+        stale = UploadSession.objects.exclude(status='attached').filter(
+            updated_at__lt=cutoff
+        )
+
+        removed = 0
+        for session in stale.iterator():
+            session.discard()
+            session.delete()
+            removed += 1
+
+        # Part files whose session row no longer exists (e.g. manual
+        # deletes) and chunk files left by crashed requests are removed
+        # once they are old enough.
+        orphans = 0
+        upload_dir = settings.UPLOAD_SESSION_DIR
+        if os.path.isdir(upload_dir):
+            known = {
+                f'{pk}.part'
+                for pk in UploadSession.objects.values_list('pk', flat=True)
+            }
+            for name in os.listdir(upload_dir):
+                path = os.path.join(upload_dir, name)
+                if name in known or not name.endswith(('.part', '.chunk')):
+                    continue
+                mtime = datetime.fromtimestamp(
+                    os.path.getmtime(path), tz=dt_timezone.utc
+                )
+                if mtime < cutoff:
+                    os.remove(path)
+                    orphans += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Removed {removed} stale session(s) and {orphans} orphan file(s)'
+        ))
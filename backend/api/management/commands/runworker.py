@@ -0,0 +1,129 @@
+import os
+import socket
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+)
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+from jobs.queue import (
+    autodiscover_tasks, claim, enqueue_due_periodic, execute, sync_schedule
+)
+
+
+def _init_process():
+    """Process pool initializer: each child sets up Django on its own."""
+    django.setup()
+    autodiscover_tasks()
+
+
+def _run_job(job_id, visibility_timeout):
+    close_old_connections()
+    try:
+        return execute(job_id, visibility_timeout)
+    finally:
+        close_old_connections()
+
+
+class Command(BaseCommand):
+    help = 'Runs background jobs from the job queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', type=int, default=None,
+            help='Number of jobs run in parallel (default: 4 threads, or '
+                 'one process per CPU core)'
+        )
+        parser.add_argument(
+            '--mode', choices=['thread', 'process'], default='thread',
+            help='Run jobs in a thread pool (I/O-bound work) or a process '
+                 'pool (CPU-bound work)'
+        )
+        parser.add_argument(
+            '--queues', default='',
+            help='Comma-separated queues to consume (default: all)'
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0,
+            help='Seconds to sleep when no job is ready'
+        )
+        parser.add_argument(
+            '--visibility-timeout', type=int,
+            default=settings.JOBS_VISIBILITY_TIMEOUT,
+            help='Seconds before an unfinished job is handed to another worker'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Run the jobs that are ready now, then exit'
+        )
+
+    def handle(self, *args, **options):
+        autodiscover_tasks()
+        sync_schedule()
+
+        concurrency = options['concurrency']
+        if concurrency is None:
+            concurrency = (
+                os.cpu_count() or 1 if options['mode'] == 'process' else 4
+            )
+        concurrency = max(1, concurrency)
+        queues = [q for q in options['queues'].split(',') if q]
+        worker_id = f'{socket.gethostname()}:{os.getpid()}'
+
+        if options['mode'] == 'process':
+            # Forked children must not share the parent's DB connections
+            connections.close_all()
+            pool = ProcessPoolExecutor(
+                max_workers=concurrency, initializer=_init_process
+            )
+        else:
+            pool = ThreadPoolExecutor(
+                max_workers=concurrency, thread_name_prefix='job'
+            )
+
+        self.stdout.write(
+            f'Worker {worker_id} running {concurrency} {options["mode"]}(s)'
+        )
+        running = set()
+        done = failed = 0
+        try:
+            while True:
+                enqueue_due_periodic()
+                free = concurrency - len(running)
+                job_ids = []
+                if free > 0:
+                    job_ids = claim(
+                        worker_id, limit=free, queues=queues,
+                        visibility_timeout=options['visibility_timeout'],
+                    )
+                for job_id in job_ids:
+                    running.add(pool.submit(
+                        _run_job, job_id, options['visibility_timeout']
+                    ))
+
+                if not running:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                finished, running = wait(
+                    running, timeout=options['poll_interval'],
+                    return_when=FIRST_COMPLETED,
+                )
+                for future in finished:
+                    if future.exception() is None and future.result():
+                        done += 1
+                    else:
+                        failed += 1
+        except KeyboardInterrupt:
+            self.stdout.write('Stopping; waiting for running jobs')
+        finally:
+            pool.shutdown(wait=True)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Finished {done} job(s), {failed} failed'
+        ))
@@ -0,0 +1,63 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from games.models import Game
+from games.validation import get_limits, validate_file
+
+
+def _validate(item):
+    """Check one file (runs in a worker process, without database access)."""
+    game_id, path, sha256, limits = item
+    return game_id, sha256, validate_file(path, limits, sha256)
+
+
+class Command(BaseCommand):
+    help = 'Runs the integrity and zip-bomb checks on stored game files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Number of files checked in parallel (processes)'
+        )
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Re-check every game, not only those still pending'
+        )
+
+    def handle(self, *args, **options):
+        qs = Game.objects.exclude(file_path='')
+        if not options['all']:
+            qs = qs.filter(file_validation_status='pending')
+        limits = get_limits()
+        items = [
+            (game.pk, game.file_path.path, game.file_sha256, limits)
+            for game in qs.only('id', 'file_path', 'file_sha256')
+        ]
+
+        counts = {'valid': 0, 'invalid': 0}
+        # A file whose check crashes (or kills its worker process) is
+        # reported and left pending; the others are still recorded
+        failures = []
+        # Children must not inherit the parent's DB connections
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=max(1, options['workers'])) as pool:
+            futures = {pool.submit(_validate, item): item[0] for item in items}
+            for future in as_completed(futures):
+                try:
+                    game_id, sha256, report = future.result()
+                except Exception as exc:
+                    failures.append((futures[future], exc))
+                    continue
+                game = Game(pk=game_id, file_sha256=sha256)
+                game.record_file_validation(report)
+                counts[game.file_validation_status] += 1
+
+        for game_id, exc in sorted(failures, key=lambda failure: failure[0]):
+            self.stderr.write(f'Game {game_id}: check failed: {exc!r}')
+        style = self.style.WARNING if failures else self.style.SUCCESS
+        self.stdout.write(style(
+            f'Checked {len(items)} game file(s): {counts["valid"]} valid, '
+            f'{counts["invalid"]} invalid, {len(failures)} failed'
+        ))
@@ -0,0 +1,204 @@
+"""Admission control for expensive endpoints.
+
+Routes are put into cost classes by URL name (`ADMISSION_CLASSES`). Each
+class limits how many of its requests run at once in a worker process
+(`per_worker`) and across workers (`total`, counted with slot keys in the
+shared cache). A request that finds no free slot waits up to
+`queue_timeout` seconds for one, then gets `503 Service Unavailable` with
+`Retry-After`, so cheap routes (login, download authorization) keep their
+workers.
+
+Global slots are leased: the slot of a worker that died mid-request is
+freed after `lease` seconds. Each slot holds a token of the request that
+took it, and is only released while it still holds that token, so a
+request that outlived its lease does not free a slot someone else has
+taken since (atomically with Redis).
+
+The limits only bind where requests actually overlap: `per_worker` needs
+threaded workers (gunicorn `--worker-class gthread` with `--threads`; a
+sync worker runs one request at a time), and `total` needs a cache shared
+by all workers (`REDIS_URL`; with LocMem it is effectively per worker as
+well). The
+middleware runs before the view, so routes answered from the response
+cache should not be listed: their hits would queue behind cache misses.
+"""
+
+import secrets
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.redis import RedisCache
+from django.http import JsonResponse
+from django.urls import Resolver404, resolve
+
+
+SLOT_KEY = 'api:admission:{}:slot:{}'
+METRIC_KEY = 'api:admission:{}:{}'
+METRIC_EVENTS = ('admitted', 'queued', 'rejected', 'waiting', 'wait_ms')
+# Interval between attempts to take a global slot (seconds)
+POLL_INTERVAL = 0.05
+# Deletes KEYS[1] only while it holds ARGV[1]
+RELEASE_SCRIPT = (
+    "if redis.call('get', KEYS[1]) == ARGV[1] then "
+    "return redis.call('del', KEYS[1]) end return 0"
+)
+
+
+def _add(cost_class, event, delta=1):
+    key = METRIC_KEY.format(cost_class, event)
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        if not cache.add(key, delta, timeout=None):
+            cache.incr(key, delta)
+
+
+def _delete_if(key, token):
+    """Delete `key` if it still holds `token`."""
+    backend = caches['default']
+    if isinstance(backend, RedisCache):
+        key = backend.make_and_validate_key(key)
+        client = backend._cache.get_client(key, write=True)
+        client.eval(RELEASE_SCRIPT, 1, key, token)
+    elif backend.get(key) == token:
+        backend.delete(key)
+
+
+def admission_metrics():
+    """Admitted, queued and rejected counts per cost class, with the
+    number of requests waiting now and their mean wait."""
+    names = sorted(settings.ADMISSION_CLASSES)
+    found = cache.get_many([
+        METRIC_KEY.format(name, event)
+        for name in names for event in METRIC_EVENTS
+    ])
+    metrics = {}
+    for name in names:
+        counts = {
+            event: found.get(METRIC_KEY.format(name, event), 0)
+            for event in METRIC_EVENTS
+        }
+        wait_ms = counts.pop('wait_ms')
+        counts['mean_wait_ms'] = (
+            round(wait_ms / counts['queued'], 1) if counts['queued'] else None
+        )
+        metrics[name] = counts
+    return metrics
+
+
+class CostClass:
+    """Concurrency budget of one cost class."""
+
+    def __init__(self, name, routes, per_worker, total=None,
+                 queue_timeout=1.0, retry_after=5, lease=60):
+        self.name = name
+        self.routes = frozenset(routes)
+        self.total = total
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.lease = lease
+        self._local = threading.BoundedSemaphore(per_worker)
+
+    def acquire(self):
+        """Take a slot, waiting up to `queue_timeout`; returns the global
+        slot as `(number, token)` (`(-1, None)` without a global limit) or
+        None when rejected."""
+        started = time.monotonic()
+        deadline = started + self.queue_timeout
+        slot = self._try_acquire()
+        if slot is None:
+            _add(self.name, 'queued')
+            _add(self.name, 'waiting')
+            try:
+                slot = self._wait(deadline)
+            finally:
+                _add(self.name, 'waiting', -1)
+                _add(
+                    self.name, 'wait_ms',
+                    int((time.monotonic() - started) * 1000),
+                )
+        _add(self.name, 'admitted' if slot is not None else 'rejected')
+        return slot
+
+    def release(self, slot):
+        number, token = slot
+        if number >= 0:
+            _delete_if(SLOT_KEY.format(self.name, number), token)
+        self._local.release()
+
+    def _try_acquire(self):
+        if not self._local.acquire(blocking=False):
+            return None
+        slot = self._take_global_slot()
+        if slot is None:
+            self._local.release()
+        return slot
+
+    def _wait(self, deadline):
+        if not self._local.acquire(
+            timeout=max(0, deadline - time.monotonic())
+        ):
+            return None
+        while True:
+            slot = self._take_global_slot()
+            if slot is not None:
+                return slot
+            if time.monotonic() + POLL_INTERVAL > deadline:
+                self._local.release()
+                return None
+            time.sleep(POLL_INTERVAL)
+
+    def _take_global_slot(self):
+        if self.total is None:
+            return -1, None
+        # An int is stored as is by every backend (not pickled), so the
+        # release script can compare it
+        token = secrets.randbits(62)
+        for number in range(self.total):
+            if cache.add(
+                SLOT_KEY.format(self.name, number), token, timeout=self.lease
+            ):
+                return number, token
+        return None
+
+
+class AdmissionControlMiddleware:
+    """Runs requests of the routes in `ADMISSION_CLASSES` within their
+    class's concurrency budget (see module docs)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.routes = {}
+        for name, config in settings.ADMISSION_CLASSES.items():
+            cost_class = CostClass(name, **config)
+            for route in cost_class.routes:
+                self.routes[route] = cost_class
+
+    def __call__(self, request):
+        cost_class = self._classify(request)
+        if cost_class is None:
+            return self.get_response(request)
+
+        slot = cost_class.acquire()
+        if slot is None:
+            response = JsonResponse(
+                {'detail': 'The server is busy. Try again later.'},
+                status=503,
+            )
+            response['Retry-After'] = str(cost_class.retry_after)
+            return response
+        try:
+            return self.get_response(request)
+        finally:
+            cost_class.release(slot)
+
+    def _classify(self, request):
+        if not self.routes:
+            return None
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return None
+        return self.routes.get(match.url_name)
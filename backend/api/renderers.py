@@ -0,0 +1,120 @@
+"""Fast response renderers.
+
+`ORJSONRenderer` replaces DRF's `JSONRenderer` for compact output and
+`MessagePackRenderer` serves `application/msgpack` to clients that ask for
+it (`Accept: application/msgpack` or `?format=msgpack`). Values are the
+same as with the stdlib renderer: datetimes, Decimal, lazy strings and
+querysets are converted as DRF's `JSONEncoder.default` does (MessagePack
+carries datetimes as the same ISO strings, not as timestamps).
+"""
+
+import datetime
+from collections.abc import Mapping
+from decimal import Decimal
+
+import msgpack
+import orjson
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+_encoder = JSONEncoder()
+
+# orjson writes datetimes, dates and times like DRF does once a zero UTC
+# offset is written as `Z`
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+class JSONFragment(Mapping):
+    """A mapping whose JSON encoding is already known, e.g. cached.
+
+    `ORJSONRenderer` embeds the bytes as they are. Other renderers and
+    Python code see the decoded mapping.
+    """
+    __slots__ = ('json', '_data')
+
+    def __init__(self, json):
+        self.json = json
+        self._data = None
+
+    def _decoded(self):
+        if self._data is None:
+            self._data = orjson.loads(self.json)
+        return self._data
+
+    def __getitem__(self, key):
+        return self._decoded()[key]
+
+    def __iter__(self):
+        return iter(self._decoded())
+
+    def __len__(self):
+        return len(self._decoded())
+
+    def __repr__(self):
+        return f'JSONFragment({self._decoded()!r})'
+
+
+def encode_default(obj):
+    """Fallback for the types the fast encoders don't handle natively.
+
+    The most common ones are converted inline, exactly as DRF's
+    `JSONEncoder.default` does; anything else is handed to it.
+    """
+    cls = type(obj)
+    if cls is JSONFragment:
+        return dict(obj)
+    if cls is datetime.datetime:
+        representation = obj.isoformat()
+        if representation.endswith('+00:00'):
+            representation = representation[:-6] + 'Z'
+        return representation
+    if cls is datetime.date:
+        return obj.isoformat()
+    if cls is Decimal:
+        return float(obj)
+    return _encoder.default(obj)
+
+
+def _orjson_default(obj):
+    if type(obj) is JSONFragment:
+        return orjson.Fragment(obj.json)
+    return encode_default(obj)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """`JSONRenderer` backed by orjson.
+
+    Indented output (`Accept: application/json; indent=4` and the
+    browsable API) still goes through the stdlib encoder.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=_orjson_default, option=ORJSON_OPTIONS)
+        # Keep the output a strict JavaScript subset, as JSONRenderer does
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(
+                b'\xe2\x80\xa9', b'\\u2029'
+            )
+        return ret
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Renders MessagePack with the same values as the JSON renderers."""
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(
+            data, default=encode_default, use_bin_type=True, datetime=False
+        )
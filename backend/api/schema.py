@@ -0,0 +1,85 @@
+"""OpenAPI schema generated once per deploy.
+
+Introspecting every view and serializer takes hundreds of milliseconds, so
+the schema is not generated per request: `manage.py generate_schema`
+writes it (with a gzip copy) to `API_SCHEMA_FILE` at deploy time, and each
+process loads the file once. Processes started without the file generate
+the schema in memory on first use.
+"""
+
+import gzip
+import hashlib
+import threading
+
+from django.conf import settings
+from django.test import RequestFactory
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson
+from drf_yasg.generators import OpenAPISchemaGenerator
+from rest_framework.request import Request
+
+
+API_INFO = openapi.Info(
+    title="IndieHub API",
+    default_version="v1",
+    description="API documentation for IndieHub",
+)
+
+
+class SchemaDocument:
+    """Encoded schema with its gzip copy and ETag (weak, as it covers
+    both encodings)."""
+
+    def __init__(self, content, gzipped=None):
+        self.content = content
+        self.gzipped = gzipped or gzip.compress(content, mtime=0)
+        self.etag = f'W/"{hashlib.sha256(content).hexdigest()[:32]}"'
+
+
+def generate_schema():
+    """Generate the public schema; returns the encoded JSON bytes."""
+    # Views introspect an anonymous request, as when the schema was
+    # generated per hit
+    host = next(
+        (h.lstrip('.') for h in settings.ALLOWED_HOSTS if h != '*'),
+        'localhost',
+    )
+    request = Request(RequestFactory().get('/swagger.json', HTTP_HOST=host))
+    schema = OpenAPISchemaGenerator(API_INFO).get_schema(request, public=True)
+    # Clients resolve paths against the host serving the schema
+    schema.pop('host', None)
+    schema.pop('schemes', None)
+    return OpenAPICodecJson(validators=[]).encode(schema)
+
+
+def write_schema():
+    """Write the schema and its gzip copy to `API_SCHEMA_FILE`."""
+    path = settings.API_SCHEMA_FILE
+    document = SchemaDocument(generate_schema())
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(document.content)
+    path.with_name(path.name + '.gz').write_bytes(document.gzipped)
+    return document
+
+
+_document = None
+_lock = threading.Lock()
+
+
+def schema_document():
+    """The schema of this deploy, loaded (or generated) once per
+    process."""
+    global _document
+    if _document is None:
+        with _lock:
+            if _document is None:
+                path = settings.API_SCHEMA_FILE
+                gz_path = path.with_name(path.name + '.gz')
+                if path.exists():
+                    _document = SchemaDocument(
+                        path.read_bytes(),
+                        gz_path.read_bytes() if gz_path.exists() else None,
+                    )
+                else:
+                    _document = SchemaDocument(generate_schema())
+    return _document
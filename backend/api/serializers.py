@@ -0,0 +1,225 @@
+"""Compiled read path for list serializers.
+
+DRF serializes each row by dispatching through every field object
+(`get_attribute`, `to_representation`, method fields). For lists, the
+serializers below resolve each readable field to a plain accessor once
+per response (`compile_representation()`) and apply it to every row.
+
+Output is identical to `Serializer.to_representation()`: common model
+field types get inline equivalents of their DRF conversion, and any
+field without one (or any row the fast accessor can't handle) goes
+through the field's own methods.
+"""
+
+from django.db import models
+from django.utils.encoding import iri_to_uri
+from rest_framework import ISO_8601, serializers
+from rest_framework.fields import SkipField
+from rest_framework.relations import PKOnlyObject
+from rest_framework.settings import api_settings
+
+
+SKIP = object()
+_MISSING = object()
+
+
+def absolute_url_builder(request):
+    """`request.build_absolute_uri` for site-relative URLs, with the
+    scheme and host resolved once per request instead of per call."""
+    if request is None:
+        return lambda url: url
+    prefix = request.build_absolute_uri('/')[:-1]
+
+    def build(url):
+        if (
+            url.startswith('/') and not url.startswith('//')
+            and '/./' not in url and '/../' not in url
+        ):
+            return iri_to_uri(prefix + url)
+        return request.build_absolute_uri(url)
+    return build
+
+
+def _generic_accessor(field):
+    """The per-field steps of `Serializer.to_representation`."""
+    def get(instance):
+        try:
+            attribute = field.get_attribute(instance)
+        except SkipField:
+            return SKIP
+        check_for_none = (
+            attribute.pk if isinstance(attribute, PKOnlyObject) else attribute
+        )
+        if check_for_none is None:
+            return None
+        return field.to_representation(attribute)
+    return get
+
+
+def _attribute_accessor(field, convert):
+    """Reads a single-attribute source directly and applies `convert`
+    (the field's conversion) to non-null values."""
+    attr = field.source_attrs[0]
+    generic = _generic_accessor(field)
+
+    def get(instance):
+        value = getattr(instance, attr, _MISSING)
+        if value is _MISSING or callable(value):
+            return generic(instance)
+        if value is None:
+            return None
+        return convert(value)
+    return get
+
+
+def _datetime_converter(field):
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    if output_format is None or output_format.lower() != ISO_8601:
+        return None
+    field_timezone = (
+        field.timezone if hasattr(field, 'timezone')
+        else field.default_timezone()
+    )
+    if field_timezone is None:
+        return None
+
+    def convert(value):
+        if isinstance(value, str) or value.utcoffset() is None:
+            return field.to_representation(value)
+        value = value.astimezone(field_timezone).isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+    return convert
+
+
+def _file_converter(field, build_url):
+    if not getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL):
+        return None
+
+    def convert(value):
+        if not value:
+            return None
+        try:
+            url = value.url
+        except AttributeError:
+            return None
+        return build_url(url)
+    return convert
+
+
+def _choice_converter(field):
+    choices = field.choice_strings_to_values
+
+    def convert(value):
+        if value == '':
+            return value
+        return choices.get(str(value), value)
+    return convert
+
+
+def _nested_list_accessor(field):
+    attr = field.source_attrs[0]
+    represent = field.child.compile_representation()
+    generic = _generic_accessor(field)
+
+    def get(instance):
+        value = getattr(instance, attr, _MISSING)
+        if value is _MISSING:
+            return generic(instance)
+        if value is None:
+            return None
+        if isinstance(value, models.manager.BaseManager):
+            value = value.all()
+        return [represent(item) for item in value]
+    return get
+
+
+def compile_field(serializer, field, build_url):
+    """Accessor (instance -> representation, or SKIP) for one field."""
+    if isinstance(field, serializers.SerializerMethodField):
+        return getattr(serializer, field.method_name)
+    if len(field.source_attrs) != 1:
+        return _generic_accessor(field)
+
+    if isinstance(field, serializers.ListSerializer):
+        if isinstance(field.child, CompiledReadMixin):
+            return _nested_list_accessor(field)
+        return _generic_accessor(field)
+    if isinstance(field, serializers.PrimaryKeyRelatedField):
+        if field.use_pk_only_optimization() and field.pk_field is None:
+            name = field.source_attrs[0]
+            return lambda instance: instance.serializable_value(name)
+        return _generic_accessor(field)
+
+    convert = None
+    field_type = type(field)
+    if field_type in (serializers.CharField, serializers.EmailField,
+                      serializers.SlugField, serializers.URLField):
+        convert = str
+    elif field_type is serializers.IntegerField:
+        convert = int
+    elif field_type is serializers.FloatField:
+        convert = float
+    elif field_type is serializers.ChoiceField:
+        convert = _choice_converter(field)
+    elif field_type is serializers.DateTimeField:
+        convert = _datetime_converter(field)
+    elif field_type in (serializers.FileField, serializers.ImageField):
+        convert = _file_converter(field, build_url)
+    elif field_type is serializers.JSONField and not field.binary:
+        convert = _identity
+    if convert is None:
+        return _generic_accessor(field)
+    return _attribute_accessor(field, convert)
+
+
+def _identity(value):
+    return value
+
+
+class CompiledReadMixin:
+    """Serializer mixin providing `compile_representation()`.
+
+    Subclasses may return accessors for fields that need per-request
+    state (absolute URLs, per-user lookups) from `compiled_accessors()`.
+    """
+
+    def compiled_accessors(self, build_url):
+        return {}
+
+    def compile_representation(self, names=None):
+        """Returns a function equivalent to `self.to_representation`, or
+        to the part of it made of the fields in `names`."""
+        build_url = absolute_url_builder(self.context.get('request'))
+        custom = self.compiled_accessors(build_url)
+        accessors = [
+            (
+                field.field_name,
+                custom.get(field.field_name)
+                or compile_field(self, field, build_url),
+            )
+            for field in self._readable_fields
+            if names is None or field.field_name in names
+        ]
+
+        def represent(instance):
+            ret = {}
+            for name, accessor in accessors:
+                value = accessor(instance)
+                if value is not SKIP:
+                    ret[name] = value
+            return ret
+        return represent
+
+
+class CompiledListSerializer(serializers.ListSerializer):
+    """`many=True` serializer using the child's compiled read path."""
+
+    def to_representation(self, data):
+        iterable = (
+            data.all() if isinstance(data, models.manager.BaseManager)
+            else data
+        )
+        represent = self.child.compile_representation()
+        return [represent(item) for item in iterable]
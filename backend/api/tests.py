@@ -1,6 +1,34 @@
+import datetime
+import gzip
+import io
+import json
+import tempfile
+import threading
+import time
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
+
+import brotli
+import msgpack
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.http import StreamingHttpResponse
+from django.test import RequestFactory, override_settings
 from django.urls import reverse
+from drf_yasg.generators import OpenAPISchemaGenerator
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APITestCase
+from games.models import Category
+from api import schema
+from api.coalesce import coalesce
+from api.compression import CompressionMiddleware
+from api.middleware import SLOT_KEY, CostClass
+from api.renderers import MessagePackRenderer, ORJSONRenderer
+
+User = get_user_model()
 
 class WelcomeTests(APITestCase):
     def test_welcome_endpoint(self):
@@ -8,3 +36,206 @@ class WelcomeTests(APITestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['message'], "Welcome to the IndieHub API!")
+
+
+class RendererTests(APITestCase):
+    def test_fast_renderers_match_drf_json(self):
+        data = {
+            'utc': datetime.datetime(2025, 1, 1, 12, 0, 0, 123456, tzinfo=datetime.timezone.utc),
+            'offset': datetime.datetime(2025, 7, 1, 1, 2, 3, tzinfo=datetime.timezone(datetime.timedelta(hours=1))),
+            'naive': datetime.datetime(2025, 1, 1),
+            'date': datetime.date(2025, 1, 2),
+            'decimal': Decimal('1.10'),
+            'text': 'عربي  ',
+            'rows': ({'count': 1},),
+        }
+        expected = JSONRenderer().render(data)
+        self.assertEqual(ORJSONRenderer().render(data), expected)
+        self.assertEqual(
+            msgpack.unpackb(MessagePackRenderer().render(data)),
+            json.loads(expected),
+        )
+
+    def test_msgpack_negotiation_and_parsing(self):
+        response = self.client.get('/api/welcome/', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(msgpack.unpackb(response.content), {'message': "Welcome to the IndieHub API!"})
+
+        response = self.client.get('/api/welcome/')
+        self.assertEqual(response['Content-Type'], 'application/json')
+
+        User.objects.create_user(username='packed', password='p')
+        response = self.client.post(
+            reverse('user-login'), {'username': 'packed', 'password': 'p'},
+            format='msgpack', HTTP_ACCEPT='application/msgpack',
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('token', msgpack.unpackb(response.content))
+
+
+class CoalesceTests(APITestCase):
+    def test_concurrent_calls_share_one_computation(self):
+        release = threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            release.wait(5)
+            if len(calls) == 1:
+                raise ValueError('boom')
+            return 'fresh'
+
+        # The leader's exception reaches every follower
+        results = []
+
+        def run(**kwargs):
+            try:
+                results.append(coalesce('key', compute, 5, **kwargs))
+            except ValueError as exc:
+                results.append(str(exc))
+
+        threads = [threading.Thread(target=run) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.2)  # let the followers join the leader's call
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['boom'] * 4)
+
+        # Across workers: a follower polls for the stored result
+        cache.add('api:flight:shared', 1)
+        threading.Timer(0.2, cache.set, ('shared-result', 'stored')).start()
+        self.assertEqual(
+            coalesce('shared', compute, 5, lambda: cache.get('shared-result')),
+            ('stored', True),
+        )
+        cache.delete('api:flight:shared')
+
+        # Followers stop waiting after the timeout and compute themselves
+        release.clear()
+        waiter = threading.Thread(target=lambda: coalesce('slow', compute, 5))
+        waiter.start()
+        while len(calls) < 2:
+            time.sleep(0.01)
+        self.assertEqual(coalesce('slow', lambda: 'own', 0.1), ('own', False))
+        release.set()
+        waiter.join()
+
+
+class AdmissionControlTests(APITestCase):
+    def test_expensive_routes_shed_load_when_saturated(self):
+        classes = {'expensive': {
+            'routes': ['popular-games-list'], 'per_worker': 1, 'total': 1,
+            'queue_timeout': 0.1, 'retry_after': 7,
+        }}
+        with override_settings(ADMISSION_CLASSES=classes):
+            # Another worker holds the only global slot
+            cache.add(SLOT_KEY.format('expensive', 0), 1)
+            response = self.client.get(reverse('popular-games-list'))
+            self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+            self.assertEqual(response['Retry-After'], '7')
+            # Other routes are not limited
+            self.assertEqual(self.client.get('/api/welcome/').status_code, status.HTTP_200_OK)
+
+            cache.delete(SLOT_KEY.format('expensive', 0))
+            response = self.client.get(reverse('popular-games-list'))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            # The slot is released after the response
+            self.assertIsNone(cache.get(SLOT_KEY.format('expensive', 0)))
+
+            admin = User.objects.create_superuser(
+                username='admin', email='a@a.com', password='p', role='admin'
+            )
+            self.client.force_authenticate(user=admin)
+            metrics = self.client.get(reverse('admission-metrics')).data['classes']
+        self.assertGreaterEqual(metrics['expensive']['rejected'], 1)
+        self.assertGreaterEqual(metrics['expensive']['queued'], 1)
+        self.assertGreaterEqual(metrics['expensive']['admitted'], 1)
+        self.assertEqual(metrics['expensive']['waiting'], 0)
+
+    def test_slot_taken_after_lease_expiry_is_kept(self):
+        cost_class = CostClass('expensive', [], per_worker=2, total=1)
+        key = SLOT_KEY.format('expensive', 0)
+        slot = cost_class.acquire()
+        # The lease runs out and another request takes the slot
+        cache.delete(key)
+        other = cost_class.acquire()
+        self.assertIsNotNone(other)
+        cost_class.release(slot)
+        self.assertEqual(cache.get(key), other[1])
+        cost_class.release(other)
+        self.assertIsNone(cache.get(key))
+
+
+class SchemaTests(APITestCase):
+    def test_schema_served_from_generated_file(self):
+        with tempfile.TemporaryDirectory() as tmp, \
+                override_settings(API_SCHEMA_FILE=Path(tmp) / 'swagger.json'):
+            call_command('generate_schema', stdout=io.StringIO())
+            schema._document = None
+            response = self.client.get('/swagger.json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertIn('/games/games-list/', json.loads(response.content)['paths'])
+            self.assertEqual(schema._document.content, (Path(tmp) / 'swagger.json').read_bytes())
+
+            etag = response['ETag']
+            response = self.client.get('/swagger.json', HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+            response = self.client.get('/swagger.json', HTTP_ACCEPT_ENCODING='gzip')
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            self.assertEqual(gzip.decompress(response.content), schema._document.content)
+
+            # The UI pages load the schema from swagger.json and do not
+            # generate it
+            with mock.patch.object(
+                OpenAPISchemaGenerator, 'get_schema',
+                side_effect=AssertionError('schema generated'),
+            ):
+                response = self.client.get('/swagger/')
+                self.assertContains(response, '/swagger.json')
+                response = self.client.get('/redoc/')
+                self.assertContains(response, '/swagger.json')
+            self.assertEqual(
+                self.client.get('/swagger/', {'format': 'openapi'}).status_code,
+                status.HTTP_404_NOT_FOUND,
+            )
+        schema._document = None
+
+
+class CompressionTests(APITestCase):
+    def test_responses_compressed_by_accepted_encoding(self):
+        for i in range(40):
+            Category.objects.create(name=f'Category {i}', name_ar=f'فئة {i}', description='Long description ' * 5)
+        url = reverse('category-list-list')
+        plain = self.client.get(url)
+        self.assertNotIn('Content-Encoding', plain)
+
+        # Stored compressed in the response cache: hits are not recompressed
+        for _ in range(2):
+            response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate, br')
+            self.assertEqual(response['Content-Encoding'], 'br')
+            self.assertEqual(brotli.decompress(response.content), plain.content)
+            self.assertIn('Accept-Encoding', response['Vary'])
+            self.assertTrue(response['ETag'].startswith('W/'))
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='br;q=0, gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        etag = response['ETag']
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Streams are compressed chunk by chunk past the size threshold
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip')
+        chunks = [b'x' * 600] * 4
+        middleware = CompressionMiddleware(lambda r: StreamingHttpResponse(
+            iter(chunks), content_type='text/plain'
+        ))
+        response = middleware(request)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), b''.join(chunks))
+        chunks = [b'short']
+        response = middleware(request)
+        self.assertNotIn('Content-Encoding', response)
+        self.assertEqual(b''.join(response.streaming_content), b'short')
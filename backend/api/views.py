@@ -1,9 +1,84 @@
+import re
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers
+)
+from django.views.decorators.http import require_safe
+from drf_yasg import openapi
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework import permissions
+from rest_framework.views import APIView
+from users.permissions import IsAdminUser
+from .cache import cache_metrics
+from .middleware import admission_metrics
+from .schema import API_INFO, schema_document
+
+
+_GZIP = re.compile(r'\bgzip\b')
 
 
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def welcome(request):
     return Response({"message": "Welcome to the IndieHub API!"})
+
+
+@require_safe
+def schema_json(request):
+    """OpenAPI schema of this deploy (api/schema.py), gzipped for clients
+    that accept it, with an ETag for revalidation."""
+    document = schema_document()
+    response = get_conditional_response(request, etag=document.etag)
+    if response is None:
+        gzipped = _GZIP.search(request.headers.get('Accept-Encoding', ''))
+        response = HttpResponse(
+            document.gzipped if gzipped else document.content,
+            content_type='application/json',
+        )
+        if gzipped:
+            response['Content-Encoding'] = 'gzip'
+    response['ETag'] = document.etag
+    patch_vary_headers(response, ['Accept-Encoding'])
+    patch_cache_control(
+        response, public=True, max_age=settings.API_SCHEMA_MAX_AGE
+    )
+    return response
+
+
+class SchemaUIView(APIView):
+    """
+    Swagger UI / ReDoc page (pass the renderer in `renderer_classes`).
+    Only the page shell is rendered: the UI loads the schema from
+    `swagger.json` (SPEC_URL), so nothing is generated here.
+    """
+    permission_classes = [permissions.AllowAny]
+    swagger_schema = None  # not part of the API
+
+    def get(self, request):
+        # The renderers only read the title and version of the document
+        return Response(openapi.Swagger(
+            info=API_INFO, _prefix='/', paths=openapi.Paths({})
+        ))
+
+
+class CacheMetricsView(APIView):
+    """
+    Conditional GET and response cache hit rates per view (admin only).
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({'views': cache_metrics()})
+
+
+class AdmissionMetricsView(APIView):
+    """
+    Admitted, queued and rejected requests per cost class (admin only).
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({'classes': admission_metrics()})
@@ -54,12 +54,17 @@ INSTALLED_APPS = [
     "games",
     "library",
     "downloads",
+    "jobs",
 ]
 
 # Place CorsMiddleware as high as possible (before CommonMiddleware)
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    # Outermost after security, so it sees the final response body
+    "api.compression.CompressionMiddleware",
     'corsheaders.middleware.CorsMiddleware',
+    # After CORS, so that 503s from load shedding carry CORS headers
+    "api.middleware.AdmissionControlMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -101,6 +106,24 @@ REST_FRAMEWORK = {
         'registration': '5/hour',
         'login': '5/minute',
     },
+    # orjson for JSON, MessagePack for clients that send
+    # `Accept: application/msgpack` (see api/renderers.py)
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.ORJSONRenderer',
+        'api.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.ORJSONParser',
+        'api.parsers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'TEST_REQUEST_RENDERER_CLASSES': [
+        'rest_framework.renderers.MultiPartRenderer',
+        'api.renderers.ORJSONRenderer',
+        'api.renderers.MessagePackRenderer',
+    ],
 }
 
 
@@ -162,6 +185,15 @@ CACHES = {
         "LOCATION": "unique-snowflake",
     }
 }
+# Cache invalidation (table versions, categories and catalog versions) is
+# shared through this cache, and background workers write to it too, so
+# any deployment with more than one process (web workers plus
+# `runworker`) needs a shared backend: set REDIS_URL.
+if os.environ.get("REDIS_URL"):
+    CACHES["default"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ["REDIS_URL"],
+    }
 
 
 # Password validation
@@ -204,6 +236,154 @@ STATIC_URL = "static/"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Resumable game uploads: chunks are written into part files here and moved
+# into MEDIA_ROOT/games/ on completion, so keep it on the same filesystem.
+UPLOAD_SESSION_DIR = MEDIA_ROOT / "uploads"
+# Unfinished upload sessions older than this are garbage-collected
+UPLOAD_SESSION_MAX_AGE_HOURS = 24
+# Chunk size of the per-file manifests used for parallel, verified downloads
+GAME_MANIFEST_CHUNK_SIZE = 8 * 1024 * 1024
+# Manifests and archive indexes are built by a background job; requests
+# for a file still missing them get 202 with this Retry-After (seconds),
+# and the job is queued again at most this often
+GAME_FILE_INDEX_RETRY_AFTER = 10
+# Limits enforced by the background checks of uploaded game files
+# (see games/validation.py); compression ratio guards against zip bombs
+GAME_FILE_MAX_SIZE = 8 * 1024 ** 3
+GAME_ARCHIVE_MAX_ENTRIES = 100_000
+GAME_ARCHIVE_MAX_UNCOMPRESSED = 32 * 1024 ** 3
+GAME_ARCHIVE_MAX_RATIO = 100
+# Catalog delta-sync feed: maximum changes per page, and how long change
+# log rows are kept (older cursors get 410 Gone and must fully resync)
+CATALOG_CHANGES_PAGE_SIZE = 1000
+# Seconds a change row must age before the feed serves it, so that rows
+# of transactions still committing are not skipped by a later cursor
+# (catalog and library change feeds)
+CATALOG_CHANGES_COMMIT_LAG = 5
+CATALOG_CHANGES_RETENTION_DAYS = 30
+# Library delta sync: removal tombstones are kept this long; older
+# `since` cursors get 410 Gone and must reload the full library
+LIBRARY_TOMBSTONE_RETENTION_DAYS = 90
+# Cached per-user library game ids behind the `in_library` flag (seconds;
+# library writes invalidate the entry)
+LIBRARY_IDS_CACHE_TIMEOUT = 60 * 60
+# Offline catalog snapshots (gzip NDJSON) for desktop cold start: gzip
+# level and how many recent snapshots are kept for in-flight downloads
+CATALOG_SNAPSHOT_COMPRESSION_LEVEL = 6
+CATALOG_SNAPSHOT_KEEP = 2
+# Cached list responses of the public read-only endpoints (seconds), and
+# the models whose saves and deletes invalidate them (api/cache.py)
+RESPONSE_CACHE_TIMEOUT = 60 * 5
+RESPONSE_CACHE_TRACKED_MODELS = [
+    'games.Game', 'games.Category', 'games.Screenshot', 'games.Review',
+    'downloads.DownloadHistory', 'users.User',
+]
+# Concurrent identical requests missing the response cache are computed
+# once; the others wait up to RESPONSE_COALESCE_TIMEOUT seconds for the
+# result, then compute it themselves. Set RESPONSE_COALESCE_SHARED to also
+# coalesce across worker processes through a lock in a shared cache
+RESPONSE_COALESCE_TIMEOUT = 10
+RESPONSE_COALESCE_SHARED = (
+    os.environ.get("RESPONSE_COALESCE_SHARED", "False") == "True"
+)
+# Validators (ETag/Last-Modified) of responses ranking downloads over a
+# sliding window (trending) change at least this often (seconds)
+TRENDING_VALIDATOR_PERIOD = 60 * 60
+# Lifetime of the cached per-game JSON fragments behind game lists and
+# details (seconds); they are keyed on the game's updated_at
+GAME_FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 24
+# Cache-Control max-age of the public categories list (seconds); clients
+# revalidate with If-None-Match after that, answered 304 while unchanged
+CATEGORY_LIST_MAX_AGE = 60 * 60
+# zstd level of the delta patches generated between game builds
+GAME_PATCH_COMPRESSION_LEVEL = 19
+
+# Response compression (api/compression.py): brotli (when installed) or
+# gzip for GET responses of these types of at least COMPRESSION_MIN_SIZE
+# bytes; cached list responses are stored compressed
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_GZIP_LEVEL = 6
+COMPRESSION_BROTLI_QUALITY = 5
+COMPRESSIBLE_CONTENT_TYPES = [
+    "application/json",
+    "application/msgpack",
+    "application/openapi+json",
+    "application/javascript",
+    "text/html",
+    "text/plain",
+    "text/css",
+    "text/csv",
+]
+# Admission control (api/middleware.py): routes (URL names) of each cost
+# class, how many of their requests may run at once per worker and across
+# workers, how long a request waits for a slot before 503 + Retry-After
+# (seconds), and the lease of a global slot (seconds). Routes served from
+# the response cache (CachedResponseMixin) are left out: admission runs
+# before the cache lookup and would queue cache hits. `per_worker` only
+# binds with several threads per worker (gunicorn gthread with --threads,
+# which needs Postgres, see the Dockerfile) and `total` only with a shared
+# cache (REDIS_URL)
+ADMISSION_CLASSES = {
+    "expensive": {
+        "routes": [
+            "analytics-downloads",
+            "analytics-ratings-average",
+            "analytics-ratings-distribution",
+            "downloads-list",
+            "popular-games-list",
+            "game-moderation",
+        ],
+        "per_worker": 2,
+        "total": 16,
+        "queue_timeout": 2.0,
+        "retry_after": 5,
+        "lease": 60,
+    },
+}
+
+# OpenAPI schema written by `manage.py generate_schema` on deploy and
+# served from memory (api/schema.py); clients may reuse it this long
+# (seconds) before revalidating with its ETag
+API_SCHEMA_FILE = BASE_DIR / "openapi" / "swagger.json"
+API_SCHEMA_MAX_AGE = 60 * 60
+SWAGGER_SETTINGS = {"SPEC_URL": "schema-json"}
+REDOC_SETTINGS = {"SPEC_URL": "schema-json"}
+
+# Background jobs (run with `manage.py runworker`)
+# A running job whose worker has not finished within this many seconds is
+# considered abandoned and claimed again
+JOBS_VISIBILITY_TIMEOUT = 15 * 60
+# Failed jobs are retried after JOBS_RETRY_BACKOFF * 2**(attempt - 1) seconds
+JOBS_MAX_ATTEMPTS = 3
+JOBS_RETRY_BACKOFF = 30
+# Run jobs synchronously when enqueued (handy for local development)
+JOBS_EAGER = os.environ.get("JOBS_EAGER", "False") == "True"
+# Periodic jobs enqueued by the workers; interval is in seconds
+JOBS_PERIODIC = [
+    {
+        "name": "purge-upload-sessions",
+        "task": "jobs.management_command",
+        "args": ["purge_upload_sessions"],
+        "interval": 60 * 60,
+    },
+    {
+        "name": "prune-catalog-changes",
+        "task": "games.prune_catalog_changes",
+        "interval": 24 * 60 * 60,
+    },
+    {
+        "name": "prune-library-removals",
+        "task": "library.prune_removals",
+        "interval": 24 * 60 * 60,
+    },
+    {
+        # Skipped when the catalog has not changed since the last snapshot
+        "name": "build-catalog-snapshot",
+        "task": "games.build_catalog_snapshot",
+        "interval": 15 * 60,
+    },
+]
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -1,9 +1,10 @@
 from django.contrib import admin
 from django.urls import path, include
-from api.views import welcome
-from rest_framework import permissions
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
+from api.views import (
+    AdmissionMetricsView, CacheMetricsView, SchemaUIView, schema_json,
+    welcome
+)
+from drf_yasg.renderers import ReDocRenderer, SwaggerUIRenderer
 
 from django.conf import settings
 from django.conf.urls.static import static
@@ -11,39 +12,41 @@ from django.conf.urls.static import static
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/welcome/', welcome),
+    path(
+        'api/metrics/cache/', CacheMetricsView.as_view(),
+        name='cache-metrics'
+    ),
+    path(
+        'api/metrics/admission/', AdmissionMetricsView.as_view(),
+        name='admission-metrics'
+    ),
     path('api/users/', include('users.urls')),
     path('api/games/', include('games.urls')),
     path('api/library/', include('library.urls')),
     path('api/downloads/', include('downloads.urls')),
+    path('api/jobs/', include('jobs.urls')),
 ]
 
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 
-schema_view = get_schema_view(
-    openapi.Info(
-        title="IndieHub API",
-        default_version="v1",
-        description="API documentation for IndieHub",
-    ),
-    public=True,
-    permission_classes=(permissions.AllowAny,),
-)
-
+# The schema is generated once per deploy (api/schema.py) and served by
+# `swagger.json`; the UI pages are static shells that fetch it from there
+# (SPEC_URL) and never run the schema generator
 urlpatterns += [
     path(
         "swagger.json",
-        schema_view.without_ui(cache_timeout=0),
+        schema_json,
         name="schema-json",
     ),
     path(
         "swagger/",
-        schema_view.with_ui("swagger", cache_timeout=0),
+        SchemaUIView.as_view(renderer_classes=(SwaggerUIRenderer,)),
         name="schema-swagger-ui",
     ),
     path(
         "redoc/",
-        schema_view.with_ui("redoc", cache_timeout=0),
+        SchemaUIView.as_view(renderer_classes=(ReDocRenderer,)),
         name="schema-redoc",
     ),
 ]
@@ -1,10 +1,19 @@
+import gzip
+import hashlib
+import io
+import json
 import os
+import zipfile
+import zstandard
+from django.test import override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
-from games.models import Game
+from games.models import ArchiveIndex, BuildPatch, FileManifest, Game
+from games.patches import generate_patch
+from games.snapshots import build_snapshot
 from .models import DownloadHistory
 
 User = get_user_model()
@@ -73,3 +82,179 @@ class DownloadTests(APITestCase):
         response = self.client.delete(url_detail)
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertEqual(DownloadHistory.objects.count(), 0)
+
+    def test_download_sends_integrity_headers(self):
+        digest = hashlib.sha256(b'dummy content').hexdigest()
+        self.assertEqual(self.game.file_sha256, digest)
+        self.assertEqual(self.game.file_size, len(b'dummy content'))
+
+        self.client.force_authenticate(user=self.user)
+        url = reverse('game-download', args=[self.game.id])
+        response = self.client.get(url)
+        self.assertEqual(response['ETag'], f'"{digest}"')
+        self.assertTrue(response['Digest'].startswith('sha-256='))
+
+        # Conditional request is answered without streaming or logging
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=f'"{digest}"')
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(DownloadHistory.objects.count(), 1)
+
+    def test_identical_uploads_are_deduplicated(self):
+        other = Game.objects.create(
+            title='Same Build', title_ar='لعبة',
+            description='Desc', description_ar='وصف',
+            developer=self.dev, status='approved',
+            file_path=SimpleUploadedFile('renamed.zip', b'dummy content')
+        )
+        self.assertEqual(other.file_path.name, self.game.file_path.name)
+
+    def test_manifest_and_range_download(self):
+        payload = bytes(range(256)) * 4
+        with override_settings(GAME_MANIFEST_CHUNK_SIZE=300):
+            game = Game.objects.create(
+                title='Chunked', title_ar='لعبة',
+                description='Desc', description_ar='وصف',
+                developer=self.dev, status='approved',
+                file_path=SimpleUploadedFile('chunked.zip', payload)
+            )
+            self.client.force_authenticate(user=self.user)
+            manifest_url = reverse('game-manifest', args=[game.id])
+            # The manifest is built by a background job; 202 until then
+            with override_settings(JOBS_EAGER=True), \
+                    self.captureOnCommitCallbacks(execute=True):
+                response = self.client.get(manifest_url)
+            self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+            self.assertIn('Retry-After', response)
+            response = self.client.get(manifest_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['chunk_size'], 300)
+        chunks = response.data['chunks']
+        self.assertEqual(len(chunks), 4)
+
+        url = reverse('game-download', args=[game.id])
+        response = self.client.get(url, HTTP_RANGE='bytes=300-599')
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(response['Content-Range'], f'bytes 300-599/{len(payload)}')
+        body = b''.join(response.streaming_content)
+        self.assertEqual(body, payload[300:600])
+        self.assertEqual(hashlib.sha256(body).hexdigest(), chunks[1])
+        # Only the first chunk of a download is logged
+        self.assertEqual(DownloadHistory.objects.count(), 0)
+
+        response = self.client.get(url, HTTP_RANGE=f'bytes={len(payload)}-')
+        self.assertEqual(response.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+
+        # The digest of a legacy file is stored when its manifest is built
+        Game.objects.filter(pk=game.pk).update(file_sha256='')
+        game.refresh_from_db()
+        FileManifest.ensure(game)
+        game.refresh_from_db()
+        self.assertEqual(game.file_sha256, hashlib.sha256(payload).hexdigest())
+
+    def test_build_patch_chain(self):
+        v1 = os.urandom(50000)
+        v2 = v1[:20000] + b'patched!' + v1[20000:]
+        game = Game.objects.create(
+            title='Versioned', title_ar='لعبة',
+            description='Desc', description_ar='وصف',
+            developer=self.dev, status='approved',
+            file_path=SimpleUploadedFile('v.zip', v1)
+        )
+        game.file_path = SimpleUploadedFile('v.zip', v2)
+        game.save()
+        self.assertEqual(list(game.builds.values_list('version', flat=True)), [1, 2])
+
+        patch = generate_patch(BuildPatch.objects.get(source__game=game).pk)
+        self.assertEqual(patch.status, 'ready')
+        self.assertLess(patch.size, 1000)
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(reverse('game-patches', args=[game.id]), {'from': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['strategy'], 'patch')
+        self.assertEqual([p['to'] for p in response.data['patches']], [2])
+
+        response = self.client.get(reverse('game-patch-file', args=[game.id, patch.id]))
+        body = b''.join(response.streaming_content)
+        dictionary = zstandard.ZstdCompressionDict(v1, dict_type=zstandard.DICT_TYPE_RAWCONTENT)
+        decompressor = zstandard.ZstdDecompressor(dict_data=dictionary, max_window_size=2 ** patch.window_log)
+        self.assertEqual(decompressor.decompress(body), v2)
+
+        response = self.client.get(reverse('game-patches', args=[game.id]), {'from': 2})
+        self.assertEqual(response.data['strategy'], 'up_to_date')
+        response = self.client.get(reverse('game-patches', args=[game.id]), {'from': 'abc'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_archive_index_and_entry_download(self):
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, 'w') as archive:
+            archive.writestr('bin/game.exe', b'MZ' * 5000, compress_type=zipfile.ZIP_DEFLATED)
+            archive.writestr('readme.txt', b'hello', compress_type=zipfile.ZIP_STORED)
+            archive.writestr('docs/دليل "1".txt', b'!', compress_type=zipfile.ZIP_STORED)
+        # The index is built by the upload's background job
+        with override_settings(JOBS_EAGER=True), \
+                self.captureOnCommitCallbacks(execute=True):
+            game = Game.objects.create(
+                title='Zipped', title_ar='لعبة',
+                description='Desc', description_ar='وصف',
+                developer=self.dev, status='approved',
+                file_path=SimpleUploadedFile('zipped.zip', buf.getvalue())
+            )
+            broken = Game.objects.create(
+                title='Broken', title_ar='لعبة',
+                description='Desc', description_ar='وصف',
+                developer=self.dev, status='approved',
+                file_path=SimpleUploadedFile('broken.zip', b'not a zip')
+            )
+        self.client.force_authenticate(user=self.user)
+
+        # A corrupt archive is recorded once, not re-read per request
+        self.assertTrue(ArchiveIndex.objects.get(sha256=broken.file_sha256).error)
+        response = self.client.get(reverse('game-archive', args=[broken.id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.get(reverse('game-archive', args=[game.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['entry_count'], 3)
+        self.assertEqual(response.data['install_size'], 10006)
+        names = [e['name'] for e in response.data['entries']]
+        self.assertEqual(names, ['bin/game.exe', 'readme.txt', 'docs/دليل "1".txt'])
+
+        for index, expected in enumerate([b'MZ' * 5000, b'hello']):
+            response = self.client.get(reverse('game-archive-entry', args=[game.id, index]))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(b''.join(response.streaming_content), expected)
+
+        # Member names are encoded, not pasted into the header
+        response = self.client.get(reverse('game-archive-entry', args=[game.id, 2]))
+        self.assertEqual(
+            response['Content-Disposition'],
+            "attachment; filename*=utf-8''%D8%AF%D9%84%D9%8A%D9%84%20%221%22.txt",
+        )
+
+    def test_catalog_snapshot(self):
+        snapshot = build_snapshot()
+        self.assertEqual(build_snapshot().pk, snapshot.pk)  # unchanged catalog
+
+        response = self.client.get(reverse('catalog-snapshot-info'))
+        self.assertEqual(response.data['game_count'], 1)
+        cursor = response.data['cursor']
+
+        response = self.client.get(reverse('catalog-snapshot'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['X-Catalog-Cursor'], str(cursor))
+        body = b''.join(response.streaming_content)
+        lines = [json.loads(line) for line in gzip.decompress(body).splitlines()]
+        self.assertEqual(lines[0]['type'], 'header')
+        self.assertEqual(lines[0]['cursor'], cursor)
+        self.assertEqual([l['id'] for l in lines if l['type'] == 'game'], [self.game.id])
+        self.assertEqual((lines[-1]['type'], lines[-1]['games']), ('end', 1))
+
+        etag = response['ETag']
+        response = self.client.get(
+            reverse('catalog-snapshot'), HTTP_RANGE='bytes=10-', HTTP_IF_RANGE=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(b''.join(response.streaming_content), body[10:])
+        response = self.client.get(reverse('catalog-snapshot'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
@@ -3,6 +3,13 @@ from django.urls import path
 from .views import (
     DownloadHistoryViewSet,
     DownloadGameView,
+    GameManifestView,
+    GamePatchPlanView,
+    GamePatchFileView,
+    GameArchiveView,
+    GameArchiveEntryView,
+    CatalogSnapshotView,
+    CatalogSnapshotInfoView,
     PopularGamesViewSet
 )
 
@@ -24,6 +31,41 @@ urlpatterns = [
 		DownloadGameView.as_view(),
 		name='game-download',
 	),
+	path(
+		'games/<int:game_id>/manifest/',
+		GameManifestView.as_view(),
+		name='game-manifest',
+	),
+	path(
+		'games/<int:game_id>/patches/',
+		GamePatchPlanView.as_view(),
+		name='game-patches',
+	),
+	path(
+		'games/<int:game_id>/patches/<int:patch_id>/',
+		GamePatchFileView.as_view(),
+		name='game-patch-file',
+	),
+	path(
+		'games/<int:game_id>/archive/',
+		GameArchiveView.as_view(),
+		name='game-archive',
+	),
+	path(
+		'games/<int:game_id>/archive/entries/<int:entry_index>/',
+		GameArchiveEntryView.as_view(),
+		name='game-archive-entry',
+	),
+	path(
+		'catalog/snapshot/',
+		CatalogSnapshotView.as_view(),
+		name='catalog-snapshot',
+	),
+	path(
+		'catalog/snapshot/info/',
+		CatalogSnapshotInfoView.as_view(),
+		name='catalog-snapshot-info',
+	),
 ]
 
 # append router URLs (list/retrieve/create for DownloadHistory)
@@ -6,11 +6,24 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
-from django.http import FileResponse, Http404
-from games.models import Game
+from django.http import (
+    FileResponse, Http404, HttpResponse, StreamingHttpResponse
+)
+from rest_framework.exceptions import PermissionDenied
+from django.urls import reverse
+from games.models import (
+    Game, FileManifest, BuildPatch, ArchiveIndex, CatalogSnapshot
+)
+from games.archives import ArchiveError, get_entry, iter_entries, stream_entry
+from games.patches import patch_chain
 from games.serializers import GameSerializer
+from django.conf import settings
 from django.db.models import Count
+from django.utils.http import content_disposition_header
+from django.utils.text import slugify
+import base64
 import os
+import posixpath
 
 
 class DownloadHistoryViewSet(viewsets.ModelViewSet):
@@ -35,28 +48,41 @@ class DownloadHistoryViewSet(viewsets.ModelViewSet):
         )
 
 
+def _get_downloadable_game(request, game_id):
+    """Return the game if the user may download it.
+
+    Raises Http404 for unknown games and PermissionDenied unless the game
+    is approved or the user is its developer or an admin.
+    """
+    # fetch game or 404
+    try:
+        game = Game.objects.get(pk=game_id)
+    except Game.DoesNotExist:
+        raise Http404
+
+    # allow download only for approved games or owners/admins
+    user = request.user
+    if not (
+        game.status == 'approved'
+        or getattr(user, 'role', None) == 'admin'
+        or user == game.developer
+    ):
+        raise PermissionDenied('Not allowed to download this game.')
+    return game
+
+
 class DownloadGameView(APIView):
-    """Stream a game's file to authenticated users and log the download."""
+    """Stream a game's file to authenticated users and log the download.
+
+    Supports single `Range: bytes=start-end` requests (with `If-Range`) so
+    clients can fetch manifest chunks over parallel connections and
+    re-fetch only corrupted pieces.
+    """
     permission_classes = [IsAuthenticated]
 
     def get(self, request, game_id):
-        # fetch game or 404
-        try:
-            game = Game.objects.get(pk=game_id)
-        except Game.DoesNotExist:
-            raise Http404
-
-        # allow download only for approved games or owners/admins
+        game = _get_downloadable_game(request, game_id)
         user = request.user
-        if not (
-            game.status == 'approved'
-            or getattr(user, 'role', None) == 'admin'
-            or user == game.developer
-        ):
-            return Response(
-                {'detail': 'Not allowed to download this game.'},
-                status=status.HTTP_403_FORBIDDEN,
-            )
 
         # ensure file exists
         file_field = game.file_path
@@ -64,24 +90,459 @@ class DownloadGameView(APIView):
         if not file_path or not os.path.exists(file_path):
             raise Http404
 
-        # Log download
-        DownloadHistory.objects.create(
-            game=game,
-            user=(user if user.is_authenticated else None),
-            ip_address=request.META.get('REMOTE_ADDR'),
-            device_info=request.META.get('HTTP_USER_AGENT', ''),
-        )
+        # Validators come from the hash recorded at upload time, so
+        # conditional requests are answered without reading the file.
+        etag = f'"{game.file_sha256}"' if game.file_sha256 else None
+        if etag and etag in _parse_etags(request.headers.get('If-None-Match')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            response['ETag'] = etag
+            return response
+
+        size = os.path.getsize(file_path)
+        byte_range = None
+        range_header = request.headers.get('Range')
+        if_range = request.headers.get('If-Range')
+        if range_header and (not if_range or (etag and if_range == etag)):
+            byte_range = _parse_range(range_header, size)
+            if byte_range is None:
+                response = HttpResponse(
+                    status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+                )
+                response['Content-Range'] = f'bytes */{size}'
+                return response
+
+        # Log download once per client download: ranged fetches of later
+        # chunks are part of the same download.
+        if byte_range is None or byte_range[0] == 0:
+            DownloadHistory.objects.create(
+                game=game,
+                user=(user if user.is_authenticated else None),
+                ip_address=request.META.get('REMOTE_ADDR'),
+                device_info=request.META.get('HTTP_USER_AGENT', ''),
+            )
 
     # Stream file response (dev).
     # In production use X-Accel-Redirect or presigned URLs.
+        filename = _download_filename(game, file_path)
+        if byte_range is None:
+            response = FileResponse(
+                open(file_path, 'rb'),
+                as_attachment=True,
+                filename=filename,
+            )
+        else:
+            start, end = byte_range
+            response = StreamingHttpResponse(
+                _read_range(file_path, start, end),
+                status=status.HTTP_206_PARTIAL_CONTENT,
+                content_type='application/octet-stream',
+            )
+            response['Content-Length'] = str(end - start + 1)
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            response['Content-Disposition'] = (
+                f'attachment; filename="{filename}"'
+            )
+        response['Accept-Ranges'] = 'bytes'
+        if etag:
+            digest = base64.b64encode(
+                bytes.fromhex(game.file_sha256)
+            ).decode('ascii')
+            response['ETag'] = etag
+            response['Digest'] = f'sha-256={digest}'
+            response['Repr-Digest'] = f'sha-256=:{digest}:'
+        return response
+
+
+def _index_pending(game):
+    """202 response for a file whose indexes are not built yet; queues
+    the background job that builds them."""
+    game.request_file_indexes()
+    response = Response(
+        {'detail': 'The file index is being built. Try again later.'},
+        status=status.HTTP_202_ACCEPTED,
+    )
+    response['Retry-After'] = str(settings.GAME_FILE_INDEX_RETRY_AFTER)
+    return response
+
+
+class GameManifestView(APIView):
+    """Return the chunk manifest of a game's file.
+
+    Each chunk `i` covers bytes `[i * chunk_size, min((i + 1) * chunk_size,
+    size))` of the file served by the download endpoint and can be fetched
+    with a Range request and checked against its SHA-256. Responds 202
+    while the manifest is being built.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, game_id):
+        game = _get_downloadable_game(request, game_id)
+        if not game.file_path:
+            raise Http404
+        manifest = FileManifest.lookup(game)
+        if manifest is None:
+            return _index_pending(game)
+
+        etag = f'"{manifest.sha256}"'
+        if etag in _parse_etags(request.headers.get('If-None-Match')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            response['ETag'] = etag
+            return response
+
+        response = Response({
+            'game': game.id,
+            'sha256': manifest.sha256,
+            'size': manifest.size,
+            'chunk_size': manifest.chunk_size,
+            'chunks': manifest.chunks,
+        })
+        response['ETag'] = etag
+        return response
+
+
+class GamePatchPlanView(APIView):
+    """Tell a client how to update from its installed build to the latest.
+
+    Query params (one of):
+      - from: installed build version
+      - from_sha256: SHA-256 of the installed archive
+
+    Returns the chain of consecutive patches when it exists and is smaller
+    than the latest build; otherwise points the client at the full download.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, game_id):
+        game = _get_downloadable_game(request, game_id)
+        latest = game.builds.order_by('-version').first()
+        if latest is None:
+            raise Http404
+
+        builds = game.builds.all()
+        installed = None
+        if request.query_params.get('from'):
+            try:
+                version = int(request.query_params['from'])
+            except ValueError:
+                return Response(
+                    {'detail': '`from` must be a build version number.'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            installed = builds.filter(version=version).first()
+        elif request.query_params.get('from_sha256'):
+            installed = builds.filter(
+                sha256=request.query_params['from_sha256'].lower()
+            ).order_by('-version').first()
+
+        download_url = request.build_absolute_uri(
+            reverse('game-download', args=[game.id])
+        )
+        data = {
+            'game': game.id,
+            'latest': {
+                'version': latest.version,
+                'sha256': latest.sha256,
+                'size': latest.size,
+            },
+            'download_url': download_url,
+            'patches': [],
+        }
+
+        chain = patch_chain(game, installed) if installed else None
+        if chain == []:
+            data['strategy'] = 'up_to_date'
+        elif chain is None:
+            data['strategy'] = 'full'
+            data['total_size'] = latest.size
+        else:
+            data['strategy'] = 'patch'
+            data['patches'] = [
+                {
+                    'id': patch.id,
+                    'from': patch.source.version,
+                    'to': patch.target.version,
+                    'size': patch.size,
+                    'sha256': patch.sha256,
+                    'window_log': patch.window_log,
+                    'url': request.build_absolute_uri(reverse(
+                        'game-patch-file', args=[game.id, patch.id]
+                    )),
+                }
+                for patch in chain
+            ]
+            data['total_size'] = sum(patch.size for patch in chain)
+        return Response(data)
+
+
+class GamePatchFileView(APIView):
+    """Stream one ready patch file of a game."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, game_id, patch_id):
+        game = _get_downloadable_game(request, game_id)
+        try:
+            patch = BuildPatch.objects.select_related(
+                'source', 'target'
+            ).get(pk=patch_id, source__game=game, status='ready')
+        except BuildPatch.DoesNotExist:
+            raise Http404
+
+        etag = f'"{patch.sha256}"'
+        if etag in _parse_etags(request.headers.get('If-None-Match')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            response['ETag'] = etag
+            return response
+
         response = FileResponse(
-            open(file_path, 'rb'),
+            patch.file.open('rb'),
             as_attachment=True,
-            filename=os.path.basename(file_path),
+            filename=(
+                f'{slugify(game.title) or "game"}-'
+                f'{patch.source.version}-{patch.target.version}.zst'
+            ),
+        )
+        response['ETag'] = etag
+        return response
+
+
+def _archive_index(game):
+    """`(index, None)` for a game's indexed zip, or `(None, response)`
+    while the index is being built. Raises 404 when the file is not a
+    zip or could not be indexed."""
+    if not ArchiveIndex.indexable(game):
+        raise Http404
+    index = ArchiveIndex.lookup(game)
+    if index is None:
+        return None, _index_pending(game)
+    if index.error:
+        raise Http404
+    return index, None
+
+
+class GameArchiveView(APIView):
+    """List the contents of a game's zip archive from its stored index.
+
+    Query params:
+      - prefix: only return entries whose name starts with this path
+
+    Each entry's `offset`/`compressed_size` locate its raw data in the
+    archive, so it can also be fetched with a Range download request.
+    Responds 202 while the index is being built.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, game_id):
+        game = _get_downloadable_game(request, game_id)
+        index, pending = _archive_index(game)
+        if pending is not None:
+            return pending
+
+        etag = f'"{index.sha256}"'
+        if etag in _parse_etags(request.headers.get('If-None-Match')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            response['ETag'] = etag
+            return response
+
+        prefix = request.query_params.get('prefix', '')
+        entries = [
+            entry for entry in iter_entries(bytes(index.index))
+            if entry['name'].startswith(prefix)
+        ]
+        response = Response({
+            'game': game.id,
+            'sha256': index.sha256,
+            'entry_count': index.entry_count,
+            'install_size': index.total_size,
+            'compressed_size': index.total_compressed,
+            'entries': entries,
+        })
+        response['ETag'] = etag
+        return response
+
+
+class GameArchiveEntryView(APIView):
+    """Stream one uncompressed entry of a game's zip archive.
+
+    Only the entry's byte range is read from the archive. The expected
+    CRC-32 is sent in `X-Entry-CRC32` so clients can verify the content.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, game_id, entry_index):
+        game = _get_downloadable_game(request, game_id)
+        index, pending = _archive_index(game)
+        if pending is not None:
+            return pending
+        entry = get_entry(bytes(index.index), entry_index)
+        if entry is None:
+            raise Http404
+
+        etag = f'"{index.sha256}-{entry_index}"'
+        if etag in _parse_etags(request.headers.get('If-None-Match')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            response['ETag'] = etag
+            return response
+
+        try:
+            stream = stream_entry(game.file_path.path, entry)
+            first = next(stream, b'')
+        except ArchiveError as exc:
+            return Response(
+                {'detail': str(exc)},
+                status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            )
+
+        def content():
+            yield first
+            yield from stream
+
+        response = StreamingHttpResponse(
+            content(), content_type='application/octet-stream'
         )
+        response['Content-Length'] = str(entry['size'])
+        response['Content-Disposition'] = content_disposition_header(
+            True, posixpath.basename(entry['name']) or 'entry'
+        )
+        response['ETag'] = etag
+        response['X-Entry-CRC32'] = f'{entry["crc32"]:08x}'
         return response
 
 
+class CatalogSnapshotInfoView(APIView):
+    """Metadata of the latest offline catalog snapshot."""
+    permission_classes = []  # Allow any
+
+    def get(self, request):
+        snapshot = CatalogSnapshot.objects.first()
+        if snapshot is None:
+            raise Http404
+        return Response({
+            'cursor': snapshot.cursor,
+            'game_count': snapshot.game_count,
+            'size': snapshot.size,
+            'sha256': snapshot.sha256,
+            'created_at': snapshot.created_at,
+            'url': request.build_absolute_uri(reverse('catalog-snapshot')),
+        })
+
+
+class CatalogSnapshotView(APIView):
+    """Download the latest offline catalog snapshot (gzip NDJSON).
+
+    Resumable with `Range` + `If-Range`; the ETag is the file's SHA-256,
+    so a range request against a newer snapshot gets the full file. The
+    `X-Catalog-Cursor` header gives the change feed cursor to sync from.
+    """
+    permission_classes = []  # Allow any
+
+    def get(self, request):
+        snapshot = CatalogSnapshot.objects.first()
+        if snapshot is None:
+            raise Http404
+        try:
+            file_path = snapshot.file.path
+        except (NotImplementedError, ValueError):
+            raise Http404
+        if not os.path.exists(file_path):
+            raise Http404
+
+        etag = f'"{snapshot.sha256}"'
+        if etag in _parse_etags(request.headers.get('If-None-Match')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            response['ETag'] = etag
+            return response
+
+        size = snapshot.size
+        byte_range = None
+        range_header = request.headers.get('Range')
+        if_range = request.headers.get('If-Range')
+        if range_header and (not if_range or if_range == etag):
+            byte_range = _parse_range(range_header, size)
+            if byte_range is None:
+                response = HttpResponse(
+                    status=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+                )
+                response['Content-Range'] = f'bytes */{size}'
+                return response
+
+        filename = os.path.basename(snapshot.file.name)
+        if byte_range is None:
+            response = FileResponse(
+                open(file_path, 'rb'),
+                as_attachment=True,
+                filename=filename,
+                content_type='application/gzip',
+            )
+        else:
+            start, end = byte_range
+            response = StreamingHttpResponse(
+                _read_range(file_path, start, end),
+                status=status.HTTP_206_PARTIAL_CONTENT,
+                content_type='application/gzip',
+            )
+            response['Content-Length'] = str(end - start + 1)
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            response['Content-Disposition'] = (
+                f'attachment; filename="{filename}"'
+            )
+        response['Accept-Ranges'] = 'bytes'
+        response['ETag'] = etag
+        response['X-Catalog-Cursor'] = str(snapshot.cursor)
+        return response
+
+
+def _parse_range(header, size):
+    """Parse a single `bytes=` range into inclusive (start, end).
+
+    Returns None when the range is malformed or not satisfiable.
+    Multi-range requests are not supported.
+    """
+    unit, _, spec = header.partition('=')
+    if unit.strip() != 'bytes' or ',' in spec:
+        return None
+    first, _, last = spec.strip().partition('-')
+    try:
+        if first == '':
+            # suffix range: last N bytes
+            length = int(last)
+            if length <= 0:
+                return None
+            return max(size - length, 0), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def _read_range(path, start, end, block_size=1024 * 1024):
+    """Yield bytes `start..end` (inclusive) of a file in blocks."""
+    remaining = end - start + 1
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while remaining > 0:
+            block = f.read(min(block_size, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            yield block
+
+
+def _parse_etags(header):
+    """Split an If-None-Match header into its entity tags."""
+    if not header:
+        return set()
+    return {tag.strip().removeprefix('W/') for tag in header.split(',')}
+
+
+def _download_filename(game, file_path):
+    """Human-friendly attachment name (stored names are content hashes)."""
+    extension = os.path.splitext(file_path)[1]
+    return f'{slugify(game.title) or "game"}{extension}'
+
+
 class PopularGamesViewSet(viewsets.ReadOnlyModelViewSet):
     """
     API endpoint to list games sorted by popularity (download count).
@@ -91,6 +552,8 @@ class PopularGamesViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = GameSerializer
 
     def get_queryset(self):
-        return Game.objects.filter(status='approved').annotate(
+        return Game.objects.filter(status='approved').select_related(
+            'cover'
+        ).annotate(
             download_count=Count('downloads')
         ).order_by('-download_count')
@@ -1,7 +1,7 @@
 #!/bin/sh
 set -e
 
-echo "Running entrypoint: migrations, populate_db, then start server"
+echo "Running entrypoint: migrations, populate_db, job worker, then start server"
 
 # Wait for possible DB service (if using a separate DB) - simple loop with timeout
 # If using sqlite this will just proceed immediately.
@@ -16,8 +16,25 @@ done
 echo "Collecting static files (if configured)"
 python manage.py collectstatic --no-input || true
 
+echo "Generating the OpenAPI schema"
+python manage.py generate_schema
+
 echo "Populating DB (manage.py populate_db)"
 # If the command fails, we still want to continue to start the server.
 python manage.py populate_db || echo "populate_db failed or not present"
 
+# Background jobs (upload finalization, file validation, manifests, archive
+# indexes, patches, snapshots, periodic cleanup) only run in a worker. It
+# runs next to the server so that it shares the database and media files,
+# and is restarted if it exits. Set RUN_WORKER=0 when workers run elsewhere.
+if [ "${RUN_WORKER:-1}" = "1" ]; then
+  echo "Starting the job worker (manage.py runworker)"
+  (
+    while true; do
+      python manage.py runworker || echo "runworker exited, restarting"
+      sleep 1
+    done
+  ) &
+fi
+
 exec "$@"
@@ -0,0 +1,134 @@
+"""Central-directory index of uploaded zip archives.
+
+The index is built once per stored blob by reading only the zip central
+directory and the fixed-size local header of each entry (no extraction).
+Entries are packed into a compact binary table so listing contents or
+serving a single entry never needs to re-parse the archive.
+"""
+
+import struct
+import zipfile
+import zlib
+
+
+# data_offset, compressed_size, file_size, crc32, method, name length
+ENTRY_STRUCT = struct.Struct('<QQQIHH')
+LOCAL_HEADER_STRUCT = struct.Struct('<4s5H3I2H')
+LOCAL_HEADER_SIGNATURE = b'PK\x03\x04'
+
+STORED = zipfile.ZIP_STORED
+DEFLATED = zipfile.ZIP_DEFLATED
+READ_BLOCK_SIZE = 1024 * 1024
+
+
+class ArchiveError(Exception):
+    """Raised when an archive cannot be indexed or read."""
+
+
+def build_index(path):
+    """Index a zip file on disk.
+
+    Returns a dict with the packed `index` bytes, `entry_count`,
+    `total_size` (uncompressed) and `total_compressed`.
+    """
+    packed = bytearray()
+    count = total_size = total_compressed = 0
+    try:
+        with open(path, 'rb') as f, zipfile.ZipFile(f) as archive:
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                # The local header's extra field can differ from the
+                # central directory's, so read it to find where data starts.
+                f.seek(info.header_offset)
+                header = f.read(LOCAL_HEADER_STRUCT.size)
+                if len(header) != LOCAL_HEADER_STRUCT.size:
+                    raise ArchiveError(f'Truncated header for {info.filename}')
+                fields = LOCAL_HEADER_STRUCT.unpack(header)
+                if fields[0] != LOCAL_HEADER_SIGNATURE:
+                    raise ArchiveError(f'Bad local header for {info.filename}')
+                name_length, extra_length = fields[-2], fields[-1]
+                data_offset = (
+                    info.header_offset + LOCAL_HEADER_STRUCT.size
+                    + name_length + extra_length
+                )
+
+                name = info.filename.encode('utf-8')
+                packed += ENTRY_STRUCT.pack(
+                    data_offset, info.compress_size, info.file_size,
+                    info.CRC, info.compress_type, len(name),
+                )
+                packed += name
+                count += 1
+                total_size += info.file_size
+                total_compressed += info.compress_size
+    except (zipfile.BadZipFile, OSError, struct.error, ValueError) as exc:
+        raise ArchiveError(str(exc)) from exc
+
+    return {
+        'index': bytes(packed),
+        'entry_count': count,
+        'total_size': total_size,
+        'total_compressed': total_compressed,
+    }
+
+
+def iter_entries(packed):
+    """Yield entry dicts from a packed index, in archive order."""
+    view = memoryview(packed)
+    position = index = 0
+    while position < len(view):
+        (
+            data_offset, compressed_size, size, crc, method, name_length
+        ) = ENTRY_STRUCT.unpack_from(view, position)
+        position += ENTRY_STRUCT.size
+        name = bytes(view[position:position + name_length]).decode('utf-8')
+        position += name_length
+        yield {
+            'index': index,
+            'name': name,
+            'offset': data_offset,
+            'compressed_size': compressed_size,
+            'size': size,
+            'crc32': crc,
+            'method': method,
+        }
+        index += 1
+
+
+def get_entry(packed, wanted):
+    """Return the entry at position `wanted`, or None."""
+    for entry in iter_entries(packed):
+        if entry['index'] == wanted:
+            return entry
+    return None
+
+
+def stream_entry(path, entry):
+    """Yield the uncompressed bytes of one entry.
+
+    Only the entry's byte range of the archive is read. Stored and
+    deflated entries are supported (the methods zip tools use by default).
+    """
+    if entry['method'] not in (STORED, DEFLATED):
+        raise ArchiveError('Unsupported compression method')
+
+    decompressor = zlib.decompressobj(-15) if entry['method'] == DEFLATED else None
+    remaining = entry['compressed_size']
+    with open(path, 'rb') as f:
+        f.seek(entry['offset'])
+        while remaining > 0:
+            block = f.read(min(READ_BLOCK_SIZE, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            if decompressor is None:
+                yield block
+            else:
+                data = decompressor.decompress(block)
+                if data:
+                    yield data
+        if decompressor is not None:
+            tail = decompressor.flush()
+            if tail:
+                yield tail
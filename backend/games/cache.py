@@ -0,0 +1,51 @@
+"""Version counters for cache invalidation.
+
+Cached catalog data (lists, home sections) includes the current catalog
+version in its key; category responses use the categories version as
+their ETag. Each game's serialized fragments are keyed on its
+`updated_at` instead (see fragments.py). Bumping a version invalidates everything
+derived from it at once; stale entries simply expire.
+
+A missing counter (evicted or first use) restarts from the current time in
+milliseconds, so it never goes back to a value used before.
+"""
+
+import time
+
+from django.core.cache import cache
+
+
+CATALOG_VERSION_KEY = 'games:catalog-version'
+CATEGORIES_VERSION_KEY = 'games:categories-version'
+
+
+def _get_version(key):
+    return cache.get_or_set(key, lambda: int(time.time() * 1000), timeout=None)
+
+
+def _bump_version(key):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        return cache.incr(key)
+
+
+def catalog_version():
+    """Return the current catalog version."""
+    return _get_version(CATALOG_VERSION_KEY)
+
+
+def bump_catalog_version():
+    """Invalidate cached catalog data. Returns the new version."""
+    return _bump_version(CATALOG_VERSION_KEY)
+
+
+def categories_version():
+    """Return the current categories version."""
+    return _get_version(CATEGORIES_VERSION_KEY)
+
+
+def bump_categories_version():
+    """Invalidate cached category data. Returns the new version."""
+    return _bump_version(CATEGORIES_VERSION_KEY)
@@ -0,0 +1,131 @@
+"""Cached per-game JSON fragments.
+
+Each game's serialized representation is cached as JSON bytes, one entry
+per response variant (selected fields, language, absolute-URL prefix).
+Keys include the game's `updated_at`, which every change to the game,
+its cover or its categories sets (also from worker processes), and the
+categories version, so entries never need to be deleted.
+
+Fields that depend on the request or on the query rather than on the
+game (`in_library`, and the `average_rating`/`download_count`
+annotations) are not cached: a fragment holds the encoded members of
+each run of other fields, and the per-response fields are encoded and
+spliced back between them, so objects keep the serializer's field order.
+"""
+
+import hashlib
+
+import orjson
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models
+
+from api.renderers import ORJSON_OPTIONS, JSONFragment, encode_default
+from api.serializers import CompiledListSerializer
+from .cache import categories_version
+
+
+# Per-request or per-query fields, encoded on every response
+DYNAMIC_FIELDS = ('in_library', 'average_rating', 'download_count')
+
+
+def _variant(serializer, names):
+    """Short digest of everything besides the game that shapes its
+    fragment."""
+    from .serializers import requested_language
+
+    request = serializer.context.get('request')
+    parts = [
+        request.build_absolute_uri('/') if request is not None else '',
+        requested_language(request) or '',
+        *names,
+    ]
+    return hashlib.blake2b(
+        '|'.join(parts).encode(), digest_size=8
+    ).hexdigest()
+
+
+def _runs(names):
+    """Split field names into alternating runs of cached and dynamic
+    fields; the first run (possibly empty) is cached."""
+    runs = [[]]
+    for name in names:
+        if (name in DYNAMIC_FIELDS) != (len(runs) % 2 == 0):
+            runs.append([])
+        runs[-1].append(name)
+    return runs
+
+
+def _members(rep, runs, parity):
+    """The JSON members of `rep` for each run at even (`parity` 0) or
+    odd positions, without braces. Keys renamed by the representation
+    (language selection) stay in the run of their field."""
+    run_of = {
+        name: i // 2
+        for i, run in enumerate(runs) if i % 2 == parity for name in run
+    }
+    groups = [{} for _ in range((len(runs) - parity + 1) // 2)]
+    for key, value in rep.items():
+        groups[run_of.get(key, len(groups) - 1)][key] = value
+    return [
+        orjson.dumps(
+            group, default=encode_default, option=ORJSON_OPTIONS
+        )[1:-1]
+        for group in groups
+    ]
+
+
+def cached_representations(serializer, games):
+    """Representations of `games` as `JSONFragment`s, serializing only
+    the games missing from the cache."""
+    names = [field.field_name for field in serializer._readable_fields]
+    static = [name for name in names if name not in DYNAMIC_FIELDS]
+    dynamic = [name for name in names if name in DYNAMIC_FIELDS]
+    runs = _runs(names)
+
+    prefix = f'games:fragment:{_variant(serializer, names)}'
+    categories = categories_version()
+    keys = [
+        f'{prefix}:{game.pk}:{game.updated_at.isoformat()}:{categories}'
+        for game in games
+    ]
+    cached = cache.get_many(keys)
+
+    represent_static = None
+    represent_dynamic = (
+        serializer.compile_representation(dynamic) if dynamic else None
+    )
+    missed = {}
+    fragments = []
+    for game, key in zip(games, keys):
+        parts = cached.get(key)
+        if parts is None:
+            if represent_static is None:
+                represent_static = serializer.compile_representation(static)
+            parts = missed[key] = _members(represent_static(game), runs, 0)
+        if represent_dynamic is not None:
+            spliced = []
+            extra = _members(represent_dynamic(game), runs, 1)
+            for i, part in enumerate(parts):
+                spliced.append(part)
+                if i < len(extra):
+                    spliced.append(extra[i])
+            parts = spliced
+        fragments.append(
+            JSONFragment(b'{' + b','.join(p for p in parts if p) + b'}')
+        )
+
+    if missed:
+        cache.set_many(missed, timeout=settings.GAME_FRAGMENT_CACHE_TIMEOUT)
+    return fragments
+
+
+class CachedGameListSerializer(CompiledListSerializer):
+    """`many=True` game serializer assembled from cached fragments."""
+
+    def to_representation(self, data):
+        iterable = (
+            data.all() if isinstance(data, models.manager.BaseManager)
+            else data
+        )
+        return cached_representations(self.child, list(iterable))
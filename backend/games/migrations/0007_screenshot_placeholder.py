@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0006_add_review'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='screenshot',
+            name='placeholder',
+            field=models.TextField(
+                blank=True,
+                default='',
+                help_text='Tiny base64 data URI preview shown while the image loads',
+            ),
+        ),
+    ]
@@ -0,0 +1,56 @@
+"""Add a denormalized base-screenshot pointer (`cover`) on Game.
+
+The data migration points every game at its current base screenshot.
+"""
+from django.core.files.storage import default_storage
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_cover(apps, schema_editor):
+    Game = apps.get_model('games', 'Game')
+    Screenshot = apps.get_model('games', 'Screenshot')
+    for shot in Screenshot.objects.filter(is_base=True).only(
+        'id', 'game_id', 'image_path'
+    ):
+        Game.objects.filter(pk=shot.game_id).update(
+            cover_id=shot.id,
+            cover_url=default_storage.url(shot.image_path.name),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0007_screenshot_placeholder'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='game',
+            name='cover',
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                help_text='Base screenshot (maintained automatically)',
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name='+',
+                to='games.screenshot',
+            ),
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='cover_url',
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                help_text='URL of the base screenshot image (maintained automatically)',
+                max_length=500,
+            ),
+        ),
+        migrations.RunPython(
+            populate_cover,
+            reverse_code=migrations.RunPython.noop,
+        ),
+    ]
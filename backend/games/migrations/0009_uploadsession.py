@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0008_game_cover'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadSession',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(help_text='Original file name', max_length=255)),
+                ('size', models.PositiveBigIntegerField(help_text='Total file size in bytes')),
+                ('offset', models.PositiveBigIntegerField(default=0, help_text='Number of bytes received so far')),
+                ('sha256', models.CharField(blank=True, help_text='Expected SHA-256 of the whole file (hex, optional)', max_length=64)),
+                ('status', models.CharField(choices=[('uploading', 'Uploading'), ('complete', 'Complete'), ('attached', 'Attached')], default='uploading', help_text='Upload session status', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Creation timestamp')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='Last chunk timestamp')),
+                ('game', models.ForeignKey(blank=True, help_text='Game the file is attached to (optional until finalize)', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to='games.game')),
+                ('user', models.ForeignKey(help_text='Uploading user', on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Upload Session',
+                'verbose_name_plural': 'Upload Sessions',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
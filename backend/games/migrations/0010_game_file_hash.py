@@ -0,0 +1,43 @@
+import django.core.validators
+from django.db import migrations, models
+import games.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0009_uploadsession'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='game',
+            name='file_path',
+            field=models.FileField(
+                help_text='Game file (zip, rar, 7z, exe)',
+                storage=games.storage.get_game_file_storage,
+                upload_to='games/',
+                validators=[django.core.validators.FileExtensionValidator(allowed_extensions=['zip', 'rar', '7z', 'exe'])],
+            ),
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='file_size',
+            field=models.PositiveBigIntegerField(
+                blank=True,
+                editable=False,
+                help_text='Size of the game file in bytes',
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='file_sha256',
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                help_text='SHA-256 of the game file (hex)',
+                max_length=64,
+            ),
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0010_game_file_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FileManifest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(help_text='SHA-256 of the whole file (hex)', max_length=64, unique=True)),
+                ('size', models.PositiveBigIntegerField(help_text='File size in bytes')),
+                ('chunk_size', models.PositiveIntegerField(help_text='Size of every chunk except possibly the last')),
+                ('chunks', models.JSONField(default=list, help_text='SHA-256 hex digest of each chunk, in order')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Creation timestamp')),
+            ],
+            options={
+                'verbose_name': 'File Manifest',
+                'verbose_name_plural': 'File Manifests',
+            },
+        ),
+    ]
@@ -0,0 +1,76 @@
+"""Add build history (GameBuild) and delta patches (BuildPatch).
+
+Existing games with a hashed file get a first build.
+"""
+from django.db import migrations, models
+import django.db.models.deletion
+import games.storage
+
+
+def record_initial_builds(apps, schema_editor):
+    Game = apps.get_model('games', 'Game')
+    GameBuild = apps.get_model('games', 'GameBuild')
+    GameBuild.objects.bulk_create([
+        GameBuild(
+            game_id=game.id,
+            version=1,
+            file=game.file_path.name,
+            size=game.file_size,
+            sha256=game.file_sha256,
+        )
+        for game in Game.objects.exclude(file_sha256='').only(
+            'id', 'file_path', 'file_size', 'file_sha256'
+        )
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0011_filemanifest'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GameBuild',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField(help_text='Sequential build number (1 = first upload)')),
+                ('file', models.FileField(help_text='Build archive (shares the content-addressed blob)', storage=games.storage.get_game_file_storage, upload_to='games/')),
+                ('size', models.PositiveBigIntegerField(blank=True, help_text='Build size in bytes', null=True)),
+                ('sha256', models.CharField(blank=True, help_text='SHA-256 of the build (hex)', max_length=64)),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Creation timestamp')),
+                ('game', models.ForeignKey(help_text='Game this build belongs to', on_delete=django.db.models.deletion.CASCADE, related_name='builds', to='games.game')),
+            ],
+            options={
+                'verbose_name': 'Game Build',
+                'verbose_name_plural': 'Game Builds',
+                'ordering': ['game', 'version'],
+                'constraints': [models.UniqueConstraint(fields=('game', 'version'), name='unique_build_version_per_game')],
+            },
+        ),
+        migrations.CreateModel(
+            name='BuildPatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file', models.FileField(blank=True, help_text='zstd patch (decompress with the source build as dictionary)', upload_to='patches/')),
+                ('size', models.PositiveBigIntegerField(blank=True, help_text='Patch size in bytes', null=True)),
+                ('sha256', models.CharField(blank=True, help_text='SHA-256 of the patch file (hex)', max_length=64)),
+                ('window_log', models.PositiveSmallIntegerField(blank=True, help_text='zstd window log needed to apply the patch', null=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('ready', 'Ready'), ('skipped', 'Skipped'), ('failed', 'Failed')], default='pending', help_text='Generation status', max_length=20)),
+                ('error', models.TextField(blank=True, help_text='Failure or skip reason')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Creation timestamp')),
+                ('source', models.ForeignKey(help_text='Build the patch applies to', on_delete=django.db.models.deletion.CASCADE, related_name='patches_from', to='games.gamebuild')),
+                ('target', models.ForeignKey(help_text='Build the patch produces', on_delete=django.db.models.deletion.CASCADE, related_name='patches_to', to='games.gamebuild')),
+            ],
+            options={
+                'verbose_name': 'Build Patch',
+                'verbose_name_plural': 'Build Patches',
+                'constraints': [models.UniqueConstraint(fields=('source', 'target'), name='unique_patch_per_build_pair')],
+            },
+        ),
+        migrations.RunPython(
+            record_initial_builds,
+            reverse_code=migrations.RunPython.noop,
+        ),
+    ]
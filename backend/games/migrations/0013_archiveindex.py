@@ -0,0 +1,27 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0012_gamebuild_buildpatch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchiveIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(help_text='SHA-256 of the archive (hex)', max_length=64, unique=True)),
+                ('entry_count', models.PositiveIntegerField(help_text='Number of file entries')),
+                ('total_size', models.PositiveBigIntegerField(help_text='Sum of uncompressed entry sizes (install size)')),
+                ('total_compressed', models.PositiveBigIntegerField(help_text='Sum of compressed entry sizes')),
+                ('index', models.BinaryField(help_text='Packed entry table')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Creation timestamp')),
+            ],
+            options={
+                'verbose_name': 'Archive Index',
+                'verbose_name_plural': 'Archive Indexes',
+            },
+        ),
+    ]
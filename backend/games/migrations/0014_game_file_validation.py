@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0013_archiveindex'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='game',
+            name='file_validation_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('valid', 'Valid'), ('invalid', 'Invalid')], default='pending', editable=False, help_text='Result of the background file checks (games/validation.py)', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='file_validation_report',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Details of the file checks (errors, format, entries, ratio)'),
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='file_validated_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='When the file checks last ran', null=True),
+        ),
+    ]
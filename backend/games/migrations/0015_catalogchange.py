@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0014_game_file_validation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity', models.CharField(choices=[('game', 'Game'), ('category', 'Category')], help_text='Kind of object that changed', max_length=20)),
+                ('object_id', models.PositiveBigIntegerField(help_text='Primary key of the changed object (kept after deletion)')),
+                ('action', models.CharField(choices=[('upsert', 'Created or updated'), ('delete', 'Deleted or hidden')], help_text='Change type', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, help_text='Creation timestamp')),
+            ],
+            options={
+                'verbose_name': 'Catalog Change',
+                'verbose_name_plural': 'Catalog Changes',
+                'ordering': ['id'],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0015_catalogchange'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file', models.FileField(help_text='Compressed snapshot file', upload_to='snapshots/')),
+                ('cursor', models.PositiveBigIntegerField(help_text='Change log cursor the snapshot is consistent with')),
+                ('game_count', models.PositiveIntegerField(help_text='Number of games in the snapshot')),
+                ('size', models.PositiveBigIntegerField(help_text='Compressed size in bytes')),
+                ('sha256', models.CharField(help_text='SHA-256 of the compressed file (hex)', max_length=64)),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Creation timestamp')),
+            ],
+            options={
+                'verbose_name': 'Catalog Snapshot',
+                'verbose_name_plural': 'Catalog Snapshots',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0016_catalogsnapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archiveindex',
+            name='error',
+            field=models.CharField(blank=True, help_text='Why the archive could not be indexed (empty when indexed)', max_length=255),
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0017_archiveindex_error'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='uploadsession',
+            name='written',
+            field=models.PositiveBigIntegerField(default=0, help_text='Number of bytes stored in the part file'),
+        ),
+    ]
@@ -1,7 +1,24 @@
+import os
+import uuid
+from django.conf import settings
 from django.db import models
 from users.models import User
+from django.core.cache import cache
 from django.core.validators import FileExtensionValidator
+from django.db import transaction
 from django.db.models import Q
+from django.utils import timezone
+from jobs.queue import enqueue_on_commit
+from .archives import ArchiveError, build_index
+from api.cache import bump_table_versions
+from .placeholders import build_placeholder
+from .storage import (
+    digest_from_name, file_sha256, get_game_file_storage, scan_file
+)
+from .validation import get_limits, validate_file
+
+
+GAME_FILE_EXTENSIONS = ['zip', 'rar', '7z', 'exe']
 
 
 class Category(models.Model):
@@ -45,6 +62,11 @@ class Game(models.Model):
         ('approved', 'Approved'),
         ('rejected', 'Rejected'),
     ]
+    FILE_VALIDATION_CHOICES = [
+        ('pending', 'Pending'),
+        ('valid', 'Valid'),
+        ('invalid', 'Invalid'),
+    ]
 
     title = models.CharField(
         max_length=255,
@@ -62,11 +84,43 @@ class Game(models.Model):
     )
     file_path = models.FileField(
         upload_to='games/',
+        storage=get_game_file_storage,
         validators=[FileExtensionValidator(
-            allowed_extensions=['zip', 'rar', '7z', 'exe']
+            allowed_extensions=GAME_FILE_EXTENSIONS
         )],
         help_text='Game file (zip, rar, 7z, exe)'
     )
+    file_size = models.PositiveBigIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text='Size of the game file in bytes'
+    )
+    file_sha256 = models.CharField(
+        max_length=64,
+        blank=True,
+        editable=False,
+        help_text='SHA-256 of the game file (hex)'
+    )
+    file_validation_status = models.CharField(
+        max_length=20,
+        choices=FILE_VALIDATION_CHOICES,
+        default='pending',
+        editable=False,
+        help_text='Result of the background file checks (games/validation.py)'
+    )
+    file_validation_report = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        help_text='Details of the file checks (errors, format, entries, ratio)'
+    )
+    file_validated_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text='When the file checks last ran'
+    )
     status = models.CharField(
         max_length=20,
         choices=STATUS_CHOICES,
@@ -103,6 +157,24 @@ class Game(models.Model):
         blank=True,
         help_text='Reason for rejection (if rejected)'
     )
+    # Denormalized pointer to the base screenshot, maintained by the
+    # Screenshot signals (see games/signals.py). Lists select it with a
+    # single join instead of one filtered query per game.
+    cover = models.ForeignKey(
+        'Screenshot',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='+',
+        help_text='Base screenshot (maintained automatically)'
+    )
+    cover_url = models.CharField(
+        max_length=500,
+        blank=True,
+        editable=False,
+        help_text='URL of the base screenshot image (maintained automatically)'
+    )
     created_at = models.DateTimeField(
         auto_now_add=True,
         help_text='Creation timestamp'
@@ -112,6 +184,140 @@ class Game(models.Model):
         help_text='Last update timestamp'
     )
 
+    def save(self, *args, **kwargs):
+        # Store a new upload first so its content-addressed name (and so
+        # its digest) is known; size and hash are then recorded once here
+        # instead of being recomputed when the file is served.
+        new_file = bool(self.file_path) and not self.file_path._committed
+        if new_file:
+            self.file_path.save(
+                self.file_path.name, self.file_path.file, save=False
+            )
+            self.record_file_metadata()
+            self.reset_file_validation()
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {
+                    'file_path', 'file_size', 'file_sha256',
+                    'file_validation_status', 'file_validation_report',
+                    'file_validated_at',
+                }
+        super().save(*args, **kwargs)
+        self._saved_status = self.status
+        if new_file:
+            self.file_stored()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        game = super().from_db(db, field_names, values)
+        # A deferred status is unknown: assume it was public, so leaving
+        # the catalog still logs a tombstone
+        game._saved_status = game.__dict__.get('status', 'approved')
+        return game
+
+    @property
+    def was_public(self):
+        """Whether the stored row was approved before unsaved changes."""
+        return getattr(self, '_saved_status', None) == 'approved'
+
+    def file_stored(self):
+        """Record a newly stored file as a build and queue its background
+        work (indexes and validation) for after the transaction commits."""
+        enqueue_on_commit('games.build_file_indexes', self.pk)
+        enqueue_on_commit('games.validate_game_file', self.pk)
+        GameBuild.record(self)
+
+    def reset_file_validation(self):
+        self.file_validation_status = 'pending'
+        self.file_validation_report = {}
+        self.file_validated_at = None
+
+    def record_file_metadata(self):
+        """Set `file_size`/`file_sha256` from the stored game file."""
+        name = self.file_path.name
+        storage = self.file_path.storage
+        self.file_sha256 = digest_from_name(name)
+        try:
+            self.file_size = storage.size(name)
+            if not self.file_sha256:
+                # Legacy (non content-addressed) file: hash it once.
+                self.file_sha256 = file_sha256(storage.path(name))
+        except (OSError, NotImplementedError):
+            self.file_size = None
+
+    def build_file_indexes(self):
+        """Build the download manifest and archive index for the file.
+
+        Both are keyed by the file digest, so re-uploads of a known blob
+        reuse the stored indexes. Runs as a background job after uploads;
+        download views queue it for files stored without indexes.
+        """
+        FileManifest.ensure(self)
+        ArchiveIndex.ensure(self)
+
+    def request_file_indexes(self):
+        """Queue `build_file_indexes` for a file missing its indexes, at
+        most once per `GAME_FILE_INDEX_RETRY_AFTER` seconds."""
+        key = f'games:file-indexes:{self.pk}:{self.file_path.name}'
+        if cache.add(key, 1, timeout=settings.GAME_FILE_INDEX_RETRY_AFTER):
+            enqueue_on_commit('games.build_file_indexes', self.pk)
+
+    def validate_file(self):
+        """Run the file checks now and record the report."""
+        try:
+            path = self.file_path.path
+        except (NotImplementedError, ValueError):
+            return
+        report = validate_file(path, get_limits(), self.file_sha256)
+        self.record_file_validation(report)
+
+    def record_file_validation(self, report):
+        """Store a validation report for the file with `self.file_sha256`.
+
+        Reports for a file that has since been replaced are dropped.
+        """
+        self.file_validation_status = 'invalid' if report['errors'] else 'valid'
+        self.file_validation_report = report
+        self.file_validated_at = timezone.now()
+        Game.objects.filter(
+            pk=self.pk, file_sha256=self.file_sha256
+        ).update(
+            file_validation_status=self.file_validation_status,
+            file_validation_report=report,
+            file_validated_at=self.file_validated_at,
+            updated_at=self.file_validated_at,
+        )
+        bump_table_versions([Game])
+
+    @classmethod
+    def touch(cls, game_ids):
+        """Set `updated_at` of the given games, which keys their cached
+        fragments, after changes that do not save the game."""
+        cls.objects.filter(pk__in=game_ids).update(updated_at=timezone.now())
+
+    @classmethod
+    def sync_cover(cls, game_id):
+        """Point `cover`/`cover_url` at the game's current base screenshot.
+
+        Uses a queryset update so other fields are left untouched;
+        `updated_at` is set as the cover is part of the game's payload.
+        Returns the base screenshot (or None).
+        """
+        with transaction.atomic():
+            base = (
+                Screenshot.objects.select_for_update()
+                .filter(game_id=game_id, is_base=True)
+                .only('id', 'image_path')
+                .first()
+            )
+            cls.objects.filter(pk=game_id).update(
+                cover=base,
+                cover_url=base.image_path.url if base else '',
+                updated_at=timezone.now(),
+            )
+        bump_table_versions([cls])
+        return base
+
 
 class Screenshot(models.Model):
     """
@@ -134,6 +340,11 @@ class Screenshot(models.Model):
             'for the game'
         ),
     )
+    placeholder = models.TextField(
+        blank=True,
+        default='',
+        help_text='Tiny base64 data URI preview shown while the image loads'
+    )
     uploaded_at = models.DateTimeField(
         auto_now_add=True,
         help_text='Upload timestamp'
@@ -155,6 +366,17 @@ class Screenshot(models.Model):
     def __str__(self):
         return f"Screenshot for {self.game.title}"
 
+    def save(self, *args, **kwargs):
+        # Compute the placeholder once, when a new image is uploaded, so
+        # reads never touch the image file. Existing rows are handled by
+        # the `backfill_placeholders` management command.
+        if self.image_path and not self.image_path._committed:
+            self.placeholder = build_placeholder(self.image_path)
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'placeholder'}
+        super().save(*args, **kwargs)
+
 
 class Review(models.Model):
     """
@@ -196,3 +418,598 @@ class Review(models.Model):
 
     def __str__(self):
         return f"Review by {self.user.username} for {self.game.title}"
+
+
+class UploadSession(models.Model):
+    """
+    Resumable, chunked upload of a game archive.
+
+    Chunks are written into a part file under UPLOAD_SESSION_DIR. Once
+    complete, the part file is moved (not copied) into the game storage
+    and attached to a Game.
+
+    `offset` is claimed when a chunk has been received in full; `written`
+    counts the bytes copied into the part file, which trails `offset`
+    while chunks are being copied.
+    """
+    STATUS_CHOICES = [
+        ('uploading', 'Uploading'),
+        ('finalizing', 'Finalizing'),
+        ('complete', 'Complete'),
+        ('attached', 'Attached'),
+        ('failed', 'Failed checksum'),
+    ]
+
+    id = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='upload_sessions',
+        help_text='Uploading user'
+    )
+    game = models.ForeignKey(
+        Game,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='upload_sessions',
+        help_text='Game the file is attached to (optional until finalize)'
+    )
+    filename = models.CharField(
+        max_length=255,
+        help_text='Original file name'
+    )
+    size = models.PositiveBigIntegerField(
+        help_text='Total file size in bytes'
+    )
+    offset = models.PositiveBigIntegerField(
+        default=0,
+        help_text='Number of bytes received so far'
+    )
+    written = models.PositiveBigIntegerField(
+        default=0,
+        help_text='Number of bytes stored in the part file'
+    )
+    sha256 = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text='Expected SHA-256 of the whole file (hex, optional)'
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='uploading',
+        help_text='Upload session status'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        help_text='Creation timestamp'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        help_text='Last chunk timestamp'
+    )
+
+    class Meta:
+        verbose_name = 'Upload Session'
+        verbose_name_plural = 'Upload Sessions'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Upload {self.id} ({self.filename})"
+
+    @property
+    def part_path(self):
+        return os.path.join(settings.UPLOAD_SESSION_DIR, f'{self.id}.part')
+
+    def new_chunk_path(self):
+        """Path of a new file receiving one chunk request."""
+        return os.path.join(
+            settings.UPLOAD_SESSION_DIR,
+            f'{self.id}.{uuid.uuid4().hex}.chunk',
+        )
+
+    def discard(self):
+        """Remove the part file, if any."""
+        try:
+            os.remove(self.part_path)
+        except FileNotFoundError:
+            pass
+
+    def begin_finalize(self):
+        """Hand a fully received upload to the `games.finalize_upload`
+        job. Returns False when it is incomplete or already handed over."""
+        started = UploadSession.objects.filter(
+            pk=self.pk, status='uploading',
+            offset=self.size, written=self.size,
+        ).update(status='finalizing', updated_at=timezone.now())
+        if started:
+            self.status = 'finalizing'
+            enqueue_on_commit('games.finalize_upload', str(self.pk))
+        return bool(started)
+
+    def finalize(self):
+        """Hash the received file and verify it against `sha256`, then
+        mark the session complete and attach it to `game` (if set). A
+        mismatching file is discarded and the session marked failed.
+
+        Reads the whole file; runs as the `games.finalize_upload` job.
+        """
+        # Whole file and manifest chunks in a single pass; attach() and
+        # downloads reuse the results.
+        chunk_size = settings.GAME_MANIFEST_CHUNK_SIZE
+        scan = scan_file(self.part_path, chunk_size)
+        if self.sha256 and scan['sha256'] != self.sha256:
+            self.discard()
+            self.status = 'failed'
+            self.save(update_fields=['status', 'updated_at'])
+            return
+        with transaction.atomic():
+            FileManifest.from_scan(scan, chunk_size)
+            self.sha256 = scan['sha256']
+            self.status = 'complete'
+            self.save(update_fields=['sha256', 'status', 'updated_at'])
+            if self.game is not None:
+                self.attach(self.game)
+
+    def attach(self, game):
+        """Move the completed file into game storage and link it to `game`.
+
+        The part file lives on the same filesystem as MEDIA_ROOT, so this
+        is a rename rather than a copy. If an identical blob is already
+        stored, the part file is dropped and the existing blob is reused.
+        """
+        storage = game.file_path.storage
+        digest = self.sha256 or file_sha256(self.part_path)
+        name = storage.name_for_digest(digest, self.filename)
+        if storage.exists(name):
+            self.discard()
+        else:
+            destination = storage.path(name)
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            os.replace(self.part_path, destination)
+
+        game.file_path.name = name
+        game.file_sha256 = digest
+        game.file_size = self.size
+        game.reset_file_validation()
+        game.save(update_fields=[
+            'file_path', 'file_size', 'file_sha256',
+            'file_validation_status', 'file_validation_report',
+            'file_validated_at', 'updated_at',
+        ])
+        game.file_stored()
+        self.game = game
+        self.status = 'attached'
+        self.save(update_fields=['game', 'status', 'updated_at'])
+
+
+class FileManifest(models.Model):
+    """
+    Per-chunk SHA-256 digests of a stored game file.
+
+    Keyed by the whole-file digest, so games sharing a content-addressed
+    blob share one manifest. Clients fetch chunks in parallel with range
+    requests and verify each one independently.
+    """
+    sha256 = models.CharField(
+        max_length=64,
+        unique=True,
+        help_text='SHA-256 of the whole file (hex)'
+    )
+    size = models.PositiveBigIntegerField(
+        help_text='File size in bytes'
+    )
+    chunk_size = models.PositiveIntegerField(
+        help_text='Size of every chunk except possibly the last'
+    )
+    chunks = models.JSONField(
+        default=list,
+        help_text='SHA-256 hex digest of each chunk, in order'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        help_text='Creation timestamp'
+    )
+
+    class Meta:
+        verbose_name = 'File Manifest'
+        verbose_name_plural = 'File Manifests'
+
+    def __str__(self):
+        return f"Manifest {self.sha256[:12]} ({len(self.chunks)} chunks)"
+
+    @classmethod
+    def from_scan(cls, scan, chunk_size):
+        """Store the result of `scan_file()` (idempotent)."""
+        manifest, _ = cls.objects.get_or_create(
+            sha256=scan['sha256'],
+            defaults={
+                'size': scan['size'],
+                'chunk_size': chunk_size,
+                'chunks': scan['chunks'],
+            },
+        )
+        return manifest
+
+    @classmethod
+    def lookup(cls, game):
+        """Return the stored manifest of a game's file, or None."""
+        if not game.file_sha256:
+            return None
+        return cls.objects.filter(sha256=game.file_sha256).first()
+
+    @classmethod
+    def ensure(cls, game):
+        """Return the manifest for a game's file, building it if missing.
+
+        Scans the whole file; call from background jobs. The digest of a
+        legacy file stored without one is recorded on the game.
+        """
+        manifest = cls.lookup(game)
+        if manifest is not None:
+            return manifest
+        if not game.file_path:
+            return None
+        try:
+            path = game.file_path.path
+        except NotImplementedError:
+            return None
+        if not os.path.exists(path):
+            return None
+        chunk_size = settings.GAME_MANIFEST_CHUNK_SIZE
+        scan = scan_file(path, chunk_size)
+        if not game.file_sha256:
+            Game.objects.filter(pk=game.pk, file_sha256='').update(
+                file_sha256=scan['sha256']
+            )
+            game.file_sha256 = scan['sha256']
+        return cls.from_scan(scan, chunk_size)
+
+
+class ArchiveIndex(models.Model):
+    """
+    Packed central-directory index of a stored zip archive.
+
+    Keyed by the whole-file digest like FileManifest. `index` holds one
+    fixed-size record per entry followed by its UTF-8 name
+    (see games/archives.py). Archives that cannot be indexed get a row
+    with `error` set, so they are not read again.
+    """
+    sha256 = models.CharField(
+        max_length=64,
+        unique=True,
+        help_text='SHA-256 of the archive (hex)'
+    )
+    entry_count = models.PositiveIntegerField(
+        help_text='Number of file entries'
+    )
+    total_size = models.PositiveBigIntegerField(
+        help_text='Sum of uncompressed entry sizes (install size)'
+    )
+    total_compressed = models.PositiveBigIntegerField(
+        help_text='Sum of compressed entry sizes'
+    )
+    index = models.BinaryField(
+        help_text='Packed entry table'
+    )
+    error = models.CharField(
+        max_length=255,
+        blank=True,
+        help_text='Why the archive could not be indexed (empty when indexed)'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        help_text='Creation timestamp'
+    )
+
+    class Meta:
+        verbose_name = 'Archive Index'
+        verbose_name_plural = 'Archive Indexes'
+
+    def __str__(self):
+        return f"Archive index {self.sha256[:12]} ({self.entry_count} entries)"
+
+    @staticmethod
+    def indexable(game):
+        """Whether the game's file is a zip archive."""
+        return bool(game.file_path) and (
+            game.file_path.name.lower().endswith('.zip')
+        )
+
+    @classmethod
+    def lookup(cls, game):
+        """Return the stored index (or recorded failure) of a game's
+        file, or None."""
+        if not game.file_sha256 or not cls.indexable(game):
+            return None
+        return cls.objects.filter(sha256=game.file_sha256).first()
+
+    @classmethod
+    def ensure(cls, game):
+        """Return the index for a zip game file, building it if missing.
+
+        Reads the archive; call from background jobs. Returns None for
+        other archive types; unreadable zips are recorded with `error`.
+        """
+        if not game.file_sha256 or not cls.indexable(game):
+            return None
+        existing = cls.lookup(game)
+        if existing is not None:
+            return existing
+        try:
+            result = build_index(game.file_path.path)
+        except NotImplementedError:
+            return None
+        except ArchiveError as exc:
+            result = {
+                'entry_count': 0, 'total_size': 0, 'total_compressed': 0,
+                'index': b'', 'error': str(exc)[:255],
+            }
+        index, _ = cls.objects.get_or_create(
+            sha256=game.file_sha256, defaults=result
+        )
+        return index
+
+
+class GameBuild(models.Model):
+    """
+    A version of a game's file. A new build is recorded whenever
+    `Game.file_path` receives new content.
+    """
+    game = models.ForeignKey(
+        Game,
+        on_delete=models.CASCADE,
+        related_name='builds',
+        help_text='Game this build belongs to'
+    )
+    version = models.PositiveIntegerField(
+        help_text='Sequential build number (1 = first upload)'
+    )
+    file = models.FileField(
+        upload_to='games/',
+        storage=get_game_file_storage,
+        help_text='Build archive (shares the content-addressed blob)'
+    )
+    size = models.PositiveBigIntegerField(
+        null=True,
+        blank=True,
+        help_text='Build size in bytes'
+    )
+    sha256 = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text='SHA-256 of the build (hex)'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        help_text='Creation timestamp'
+    )
+
+    class Meta:
+        verbose_name = 'Game Build'
+        verbose_name_plural = 'Game Builds'
+        ordering = ['game', 'version']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['game', 'version'],
+                name='unique_build_version_per_game'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.game.title} build {self.version}"
+
+    @classmethod
+    def record(cls, game):
+        """Record the game's current file as its latest build.
+
+        When a previous build exists, a delta patch from it is queued for
+        background generation. Returns the (possibly existing) build.
+        """
+        with transaction.atomic():
+            latest = (
+                cls.objects.select_for_update()
+                .filter(game=game)
+                .order_by('-version')
+                .first()
+            )
+            if latest is not None and latest.sha256 == game.file_sha256:
+                return latest
+            build = cls.objects.create(
+                game=game,
+                version=(latest.version + 1) if latest else 1,
+                file=game.file_path.name,
+                size=game.file_size,
+                sha256=game.file_sha256,
+            )
+            if latest is not None:
+                patch = BuildPatch.objects.create(source=latest, target=build)
+                enqueue_on_commit('games.generate_build_patch', patch.pk)
+        return build
+
+
+class BuildPatch(models.Model):
+    """
+    Binary delta turning one build into the next, generated by a
+    background job (see games/patches.py).
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('ready', 'Ready'),
+        ('skipped', 'Skipped'),
+        ('failed', 'Failed'),
+    ]
+
+    source = models.ForeignKey(
+        GameBuild,
+        on_delete=models.CASCADE,
+        related_name='patches_from',
+        help_text='Build the patch applies to'
+    )
+    target = models.ForeignKey(
+        GameBuild,
+        on_delete=models.CASCADE,
+        related_name='patches_to',
+        help_text='Build the patch produces'
+    )
+    file = models.FileField(
+        upload_to='patches/',
+        blank=True,
+        help_text='zstd patch (decompress with the source build as dictionary)'
+    )
+    size = models.PositiveBigIntegerField(
+        null=True,
+        blank=True,
+        help_text='Patch size in bytes'
+    )
+    sha256 = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text='SHA-256 of the patch file (hex)'
+    )
+    window_log = models.PositiveSmallIntegerField(
+        null=True,
+        blank=True,
+        help_text='zstd window log needed to apply the patch'
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pending',
+        help_text='Generation status'
+    )
+    error = models.TextField(
+        blank=True,
+        help_text='Failure or skip reason'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        help_text='Creation timestamp'
+    )
+
+    class Meta:
+        verbose_name = 'Build Patch'
+        verbose_name_plural = 'Build Patches'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['source', 'target'],
+                name='unique_patch_per_build_pair'
+            ),
+        ]
+
+    def __str__(self):
+        return f"Patch {self.source.version} -> {self.target.version}"
+
+
+class CatalogChange(models.Model):
+    """
+    Append-only log of public catalog changes, read by the delta-sync
+    feed (`games/changes/?since=<cursor>`). The auto-increment id is the
+    cursor. Rows only name the changed object; the feed serializes its
+    current state, so `delete` rows are tombstones for games that were
+    deleted or left the public catalog (unapproved).
+
+    Ids are allocated at insert but rows become visible at commit, so a
+    row can appear behind a cursor already handed out; the feed only
+    reads rows older than `CATALOG_CHANGES_COMMIT_LAG`.
+    """
+    ENTITY_CHOICES = [
+        ('game', 'Game'),
+        ('category', 'Category'),
+    ]
+    ACTION_CHOICES = [
+        ('upsert', 'Created or updated'),
+        ('delete', 'Deleted or hidden'),
+    ]
+
+    entity = models.CharField(
+        max_length=20,
+        choices=ENTITY_CHOICES,
+        help_text='Kind of object that changed'
+    )
+    object_id = models.PositiveBigIntegerField(
+        help_text='Primary key of the changed object (kept after deletion)'
+    )
+    action = models.CharField(
+        max_length=10,
+        choices=ACTION_CHOICES,
+        help_text='Change type'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        db_index=True,
+        help_text='Creation timestamp'
+    )
+
+    class Meta:
+        verbose_name = 'Catalog Change'
+        verbose_name_plural = 'Catalog Changes'
+        ordering = ['id']
+
+    def __str__(self):
+        return f"#{self.pk} {self.action} {self.entity} {self.object_id}"
+
+    @classmethod
+    def log(cls, entity, object_ids, action):
+        """Append one change row per object id."""
+        cls.objects.bulk_create([
+            cls(entity=entity, object_id=pk, action=action)
+            for pk in object_ids
+        ])
+
+    @classmethod
+    def log_games(cls, games):
+        """Log approved games, and tombstones for games that left the
+        public catalog. Games that were never public are not logged, so
+        the feed never reveals unpublished ids. Call before the games'
+        new status is recorded as saved (post_save)."""
+        upserts = [g.pk for g in games if g.status == 'approved']
+        deletes = [
+            g.pk for g in games if g.status != 'approved' and g.was_public
+        ]
+        if upserts:
+            cls.log('game', upserts, 'upsert')
+        if deletes:
+            cls.log('game', deletes, 'delete')
+
+
+class CatalogSnapshot(models.Model):
+    """
+    Gzip-compressed NDJSON dump of the public catalog, generated
+    periodically (see games/snapshots.py) so desktop clients can cold-start
+    from one download and then follow the change feed from `cursor`.
+    """
+    file = models.FileField(
+        upload_to='snapshots/',
+        help_text='Compressed snapshot file'
+    )
+    cursor = models.PositiveBigIntegerField(
+        help_text='Change log cursor the snapshot is consistent with'
+    )
+    game_count = models.PositiveIntegerField(
+        help_text='Number of games in the snapshot'
+    )
+    size = models.PositiveBigIntegerField(
+        help_text='Compressed size in bytes'
+    )
+    sha256 = models.CharField(
+        max_length=64,
+        help_text='SHA-256 of the compressed file (hex)'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        help_text='Creation timestamp'
+    )
+
+    class Meta:
+        verbose_name = 'Catalog Snapshot'
+        verbose_name_plural = 'Catalog Snapshots'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Snapshot at cursor {self.cursor}"
@@ -0,0 +1,130 @@
+"""Binary delta patches between consecutive game builds.
+
+Patches are zstd frames compressed with the previous build as a raw-content
+dictionary and long-distance matching enabled (the same technique as
+`zstd --patch-from`). Unchanged regions of the archive collapse to short
+back-references, so small updates to large games produce small patches.
+Clients apply a patch with `zstd -d --patch-from=<old build> <patch>`.
+
+Generation runs as a background job (see games/tasks.py) so uploads return
+immediately.
+"""
+
+import hashlib
+import mmap
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.files import File
+
+from .models import BuildPatch
+
+
+# zstd cannot reference history further back than 2 GiB (window_log 31)
+MAX_WINDOW_LOG = 31
+COPY_BLOCK_SIZE = 1024 * 1024
+
+
+def generate_patch(patch_id):
+    """Build the delta for one BuildPatch row and store it."""
+    import zstandard
+
+    patch = BuildPatch.objects.select_related(
+        'source', 'target', 'source__game'
+    ).get(pk=patch_id)
+    if patch.status == 'ready':
+        return patch
+
+    try:
+        old_path = patch.source.file.path
+        new_path = patch.target.file.path
+        old_size = os.path.getsize(old_path)
+        new_size = os.path.getsize(new_path)
+    except (OSError, ValueError, NotImplementedError) as exc:
+        return _finish(patch, 'failed', error=str(exc))
+
+    window_log = max(old_size, new_size, 1024).bit_length()
+    if window_log > MAX_WINDOW_LOG or old_size == 0:
+        return _finish(
+            patch, 'skipped',
+            error='Source build is too large for a zstd patch.',
+        )
+
+    params = zstandard.ZstdCompressionParameters.from_level(
+        settings.GAME_PATCH_COMPRESSION_LEVEL,
+        window_log=window_log,
+        enable_ldm=True,
+    )
+    digest = hashlib.sha256()
+    with tempfile.TemporaryFile() as out:
+        with open(old_path, 'rb') as old_file, mmap.mmap(
+            old_file.fileno(), 0, access=mmap.ACCESS_READ
+        ) as old_data:
+            dictionary = zstandard.ZstdCompressionDict(
+                old_data, dict_type=zstandard.DICT_TYPE_RAWCONTENT
+            )
+            compressor = zstandard.ZstdCompressor(
+                dict_data=dictionary, compression_params=params
+            )
+            with open(new_path, 'rb') as new_file, compressor.stream_writer(
+                out, size=new_size, closefd=False
+            ) as writer:
+                for block in iter(lambda: new_file.read(COPY_BLOCK_SIZE), b''):
+                    writer.write(block)
+
+        size = out.tell()
+        out.seek(0)
+        for block in iter(lambda: out.read(COPY_BLOCK_SIZE), b''):
+            digest.update(block)
+        out.seek(0)
+
+        name = (
+            f'{patch.source.game_id}/'
+            f'{patch.source.version}-{patch.target.version}.zst'
+        )
+        patch.file.save(name, File(out), save=False)
+
+    return _finish(
+        patch, 'ready',
+        size=size, sha256=digest.hexdigest(), window_log=window_log,
+    )
+
+
+def _finish(patch, status, **fields):
+    patch.status = status
+    for key, value in fields.items():
+        setattr(patch, key, value)
+    patch.save()
+    return patch
+
+
+def patch_chain(game, from_build):
+    """Return the patches leading from `from_build` to the latest build.
+
+    Returns None when any step is missing or not ready, or when the chain
+    would be larger than downloading the latest build in full.
+    """
+    builds = list(
+        game.builds.filter(version__gte=from_build.version).order_by('version')
+    )
+    latest = builds[-1]
+    if latest.pk == from_build.pk:
+        return []
+
+    patches = {
+        p.source_id: p
+        for p in BuildPatch.objects.filter(
+            source__in=builds, target__in=builds, status='ready'
+        )
+    }
+    chain = []
+    for source, target in zip(builds, builds[1:]):
+        patch = patches.get(source.pk)
+        if patch is None or patch.target_id != target.pk:
+            return None
+        chain.append(patch)
+
+    if latest.size is not None and sum(p.size for p in chain) >= latest.size:
+        return None
+    return chain
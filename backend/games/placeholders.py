@@ -0,0 +1,52 @@
+"""Low-quality image placeholders (LQIP) for screenshots.
+
+A placeholder is a tiny, heavily compressed JPEG of the screenshot encoded
+as a base64 data URI (a few hundred bytes). Clients can render it blurred
+while the full image loads, without issuing an extra request.
+"""
+
+import base64
+import io
+
+from PIL import Image
+
+
+PLACEHOLDER_SIZE = 16
+PLACEHOLDER_QUALITY = 40
+
+
+def build_placeholder(image_file):
+    """Return a data URI placeholder for an image file, or '' on failure.
+
+    `image_file` may be a Django `FieldFile`, an uploaded file or any
+    binary file-like object. The file position is restored afterwards so
+    the caller can still save the original upload.
+    """
+    try:
+        position = image_file.tell()
+    except Exception:
+        position = None
+
+    try:
+        with Image.open(image_file) as img:
+            # draft() lets the JPEG decoder downscale while decoding, which
+            # avoids materialising full-resolution pixels for large shots.
+            img.draft('RGB', (PLACEHOLDER_SIZE * 4, PLACEHOLDER_SIZE * 4))
+            img = img.convert('RGB')
+            img.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+            buffer = io.BytesIO()
+            img.save(
+                buffer, format='JPEG',
+                quality=PLACEHOLDER_QUALITY, optimize=True
+            )
+    except Exception:
+        return ''
+    finally:
+        if position is not None:
+            try:
+                image_file.seek(position)
+            except Exception:
+                pass
+
+    encoded = base64.b64encode(buffer.getvalue()).decode('ascii')
+    return f'data:image/jpeg;base64,{encoded}'
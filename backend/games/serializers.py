@@ -1,13 +1,177 @@
+import os
 from rest_framework import serializers
 from rest_framework.exceptions import PermissionDenied
-from .models import Category, Game, Screenshot, Review
+from .models import (
+    GAME_FILE_EXTENSIONS, Category, Game, Screenshot, Review, UploadSession
+)
 from users.models import User
+from library.cache import library_game_ids_for_request
+from api.serializers import CompiledListSerializer, CompiledReadMixin
+from .fragments import CachedGameListSerializer
 
 
-class CategorySerializer(serializers.ModelSerializer):
+LANGUAGES = ('en', 'ar')
+
+# `?view=card` fields: what a grid card needs, without descriptions
+GAME_CARD_FIELDS = [
+    'id', 'title', 'title_ar',
+    'base_screenshot', 'base_screenshot_placeholder',
+    'average_rating', 'download_count', 'in_library',
+]
+
+# Model columns each GameSerializer field reads, for `.only()`. Fields not
+# listed (categories, annotations, in_library) need no game columns.
+GAME_FIELD_COLUMNS = {
+    'id': ['id'],
+    'title': ['title', 'title_ar'],
+    'title_ar': ['title_ar'],
+    'description': ['description', 'description_ar'],
+    'description_ar': ['description_ar'],
+    'file_path': ['file_path'],
+    'status': ['status'],
+    'developer': ['developer'],
+    'base_screenshot': ['cover_url'],
+    'base_screenshot_placeholder': ['cover__placeholder'],
+    'file_validation_status': ['file_validation_status'],
+    'file_validation_report': ['file_validation_report'],
+    'created_at': ['created_at'],
+    'updated_at': ['updated_at'],
+}
+
+
+def requested_language(request):
+    """`?lang=en|ar`, or the best match of Accept-Language for
+    `?lang=auto`; None keeps both languages in responses."""
+    if request is None:
+        return None
+    lang = request.query_params.get('lang')
+    if lang == 'auto':
+        header = request.headers.get('Accept-Language', '')
+        for part in header.split(','):
+            code = part.split(';')[0].strip().lower()[:2]
+            if code in LANGUAGES:
+                return code
+        return LANGUAGES[0]
+    return lang if lang in LANGUAGES else None
+
+
+def requested_game_fields(request):
+    """Field names selected with `?fields=` or `?view=card|detail` on a
+    read request, or None for the full representation."""
+    if request is None or request.method not in ('GET', 'HEAD'):
+        return None
+    fields = request.query_params.get('fields')
+    if fields:
+        return {'id'} | {f.strip() for f in fields.split(',') if f.strip()}
+    if request.query_params.get('view') == 'card':
+        return set(GAME_CARD_FIELDS)
+    return None
+
+
+def side_loaded_categories(request):
+    """Whether a read request asked for `?categories=ids`: games carry
+    `category_ids` and the categories are returned once, alongside."""
+    return (
+        request is not None
+        and request.method in ('GET', 'HEAD')
+        and request.query_params.get('categories') == 'ids'
+    )
+
+
+def game_columns(fields):
+    """Game columns to load for the selected fields (for `.only()`)."""
+    # `updated_at` keys the cached fragments
+    columns = {'id', 'cover', 'updated_at'}
+    for name in fields:
+        columns.update(GAME_FIELD_COLUMNS.get(name, []))
+    if not any(c.startswith('cover__') for c in columns):
+        # `cover` is always select_related; load only its key
+        columns.add('cover__id')
+    return sorted(columns)
+
+
+def sparse_game_queryset(qs, request):
+    """Defer the game columns a sparse or single-language read won't use."""
+    fields = requested_game_fields(request)
+    if fields is None or 'categories' in fields:
+        qs = qs.prefetch_related('categories')
+    if fields is not None:
+        return qs.only(*game_columns(fields))
+    if requested_language(request) == 'en':
+        return qs.defer('title_ar', 'description_ar')
+    return qs
+
+
+def categories_by_id(games, request):
+    """Deduplicated `{id: category}` for the prefetched categories of
+    `games`, serialized once each."""
+    categories = {}
+    for game in games:
+        for category in game.categories.all():
+            categories.setdefault(category.pk, category)
+    serializer = CategorySerializer(
+        categories.values(), many=True, context={'request': request}
+    )
+    return {str(item['id']): item for item in serializer.data}
+
+
+class LocalizedFieldsMixin:
+    """With `?lang=`, returns one language under the base field names.
+
+    `localized_fields` lists the base names; their Arabic values come from
+    `<name>_ar` and fall back to the English value when empty.
+    """
+    localized_fields = ()
+
+    def to_representation(self, instance):
+        rep = super().to_representation(instance)
+        lang = requested_language(self.context.get('request'))
+        if lang is None:
+            return rep
+        return self.localize(rep, lang)
+
+    def compile_representation(self, names=None):
+        represent = super().compile_representation(names)
+        lang = requested_language(self.context.get('request'))
+        if lang is None:
+            return represent
+        return lambda instance: self.localize(represent(instance), lang)
+
+    def localize(self, rep, lang):
+        for name in self.localized_fields:
+            arabic = rep.pop(f'{name}_ar', None)
+            if lang == 'ar' and arabic and name in rep:
+                rep[name] = arabic
+        return rep
+
+
+class SparseFieldsMixin:
+    """Drops readable fields not selected with `?fields=` / `?view=`."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        wanted = requested_game_fields(self.context.get('request'))
+        if wanted is None:
+            return
+        if requested_language(self.context.get('request')):
+            # The Arabic column backs the localized base field
+            wanted |= {
+                f'{name}_ar' for name in self.localized_fields
+                if name in wanted
+            }
+        for name, field in list(self.fields.items()):
+            if name not in wanted and not field.write_only:
+                self.fields.pop(name)
+
+
+class CategorySerializer(LocalizedFieldsMixin, CompiledReadMixin,
+                         serializers.ModelSerializer):
     """Serializer for Game Category"""
+    localized_fields = ('name', 'description')
+
     class Meta:
         model = Category
+        list_serializer_class = CompiledListSerializer
         fields = [
             'id', 'name', 'description',
             'name_ar', 'description_ar'
@@ -15,8 +179,45 @@ class CategorySerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
 
-class GameSerializer(serializers.ModelSerializer):
-    """Serializer for Game"""
+class CoverFieldsMixin:
+    """`base_screenshot` and `base_screenshot_placeholder` getters, read
+    from the denormalized `Game.cover` (select_related('cover'))."""
+
+    def get_base_screenshot(self, obj):
+        """Returns the URL of the base screenshot."""
+        if obj.cover_url:
+            request = self.context.get('request')
+            if request:
+                return request.build_absolute_uri(obj.cover_url)
+            return obj.cover_url
+        return None
+
+    def get_base_screenshot_placeholder(self, obj):
+        """Returns the inline data URI preview of the base screenshot.
+
+        Views should `select_related('cover')` to keep this join-only.
+        """
+        if obj.cover_id and obj.cover.placeholder:
+            return obj.cover.placeholder
+        return None
+
+
+class GameSerializer(SparseFieldsMixin, LocalizedFieldsMixin,
+                     CoverFieldsMixin, CompiledReadMixin,
+                     serializers.ModelSerializer):
+    """Serializer for Game
+
+    Read requests may select fields with `?fields=a,b` or `?view=card`,
+    and a single language with `?lang=` (see the mixins above). With
+    `?categories=ids`, `categories` is replaced by `category_ids`.
+    Lists are assembled from cached per-game fragments (fragments.py)
+    and serialize misses through the compiled read path. The file
+    validation fields are only returned to admins and the game's
+    developer, on single games.
+    """
+    localized_fields = ('title', 'description')
+    private_fields = ('file_validation_status', 'file_validation_report')
+
     # allow admin to set developer (pk). Devs auto-assigned on create
     developer = serializers.PrimaryKeyRelatedField(
         queryset=User.objects.filter(role='developer'),
@@ -33,34 +234,88 @@ class GameSerializer(serializers.ModelSerializer):
         required=False,
     )
 
+    # Attach a file uploaded through a resumable upload session instead of
+    # sending `file_path` in the request body.
+    upload_id = serializers.PrimaryKeyRelatedField(
+        queryset=UploadSession.objects.filter(status='complete'),
+        write_only=True,
+        required=False,
+    )
+
     base_screenshot = serializers.SerializerMethodField()
+    base_screenshot_placeholder = serializers.SerializerMethodField()
+    in_library = serializers.SerializerMethodField()
     average_rating = serializers.FloatField(read_only=True, required=False)
     download_count = serializers.IntegerField(read_only=True, required=False)
 
     class Meta:
         model = Game
+        list_serializer_class = CachedGameListSerializer
         fields = [
             'id', 'title', 'description',
             'title_ar', 'description_ar',
-            'file_path', 'status', 'developer',
+            'file_path', 'upload_id', 'status', 'developer',
             'categories', 'category_ids',
-            'base_screenshot', 'average_rating', 'download_count',
+            'base_screenshot', 'base_screenshot_placeholder',
+            'average_rating', 'download_count', 'in_library',
+            'file_validation_status', 'file_validation_report',
             'created_at', 'updated_at'
         ]
+        extra_kwargs = {'file_path': {'required': False}}
     read_only_fields = [
         'id', 'status', 'created_at', 'updated_at',
-        'base_screenshot', 'average_rating', 'download_count'
+        'base_screenshot', 'base_screenshot_placeholder',
+        'average_rating', 'download_count'
     ]
 
-    def get_base_screenshot(self, obj):
-        """Returns the URL of the base screenshot."""
-        base = obj.screenshots.filter(is_base=True).first()
-        if base:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(base.image_path.url)
-            return base.image_path.url
-        return None
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not self.shows_private_fields():
+            for name in self.private_fields:
+                self.fields.pop(name, None)
+        if 'categories' in self.fields and side_loaded_categories(
+            self.context.get('request')
+        ):
+            self.fields.pop('categories')
+            self.fields['category_ids'] = serializers.SerializerMethodField()
+
+    def shows_private_fields(self):
+        """Admins, and the developer of a single game (or of the game
+        being created)."""
+        request = self.context.get('request')
+        user = getattr(request, 'user', None)
+        if user is None or not user.is_authenticated:
+            return False
+        if user.role == 'admin':
+            return True
+        if self.instance is None:
+            return user.role == 'developer'
+        return (
+            isinstance(self.instance, Game)
+            and self.instance.developer_id == user.pk
+        )
+
+    def get_category_ids(self, obj):
+        return [category.pk for category in obj.categories.all()]
+
+    def compiled_accessors(self, build_url):
+        ids = library_game_ids_for_request(self.context.get('request'))
+
+        def base_screenshot(obj):
+            return build_url(obj.cover_url) if obj.cover_url else None
+
+        def in_library(obj):
+            return None if ids is None else obj.pk in ids
+
+        return {'base_screenshot': base_screenshot, 'in_library': in_library}
+
+    def get_in_library(self, obj):
+        """Whether the game is in the requester's library (None when
+        anonymous), from the cached per-user id set."""
+        ids = library_game_ids_for_request(self.context.get('request'))
+        if ids is None:
+            return None
+        return obj.pk in ids
 
     def validate(self, attrs):
         """Prevent non-admin users from setting status in payload."""
@@ -76,6 +331,22 @@ class GameSerializer(serializers.ModelSerializer):
         if not is_admin and 'status' in request.data:
             # non-admin trying to set status
             raise PermissionDenied('Only admins may set status.')
+
+        session = attrs.get('upload_id')
+        if session is not None and session.user_id != request.user.pk:
+            raise serializers.ValidationError(
+                {'upload_id': 'Unknown upload session.'}
+            )
+        if session is not None and 'file_path' in attrs:
+            raise serializers.ValidationError(
+                'Send either file_path or upload_id, not both.'
+            )
+        if self.instance is None and session is None and (
+            not attrs.get('file_path')
+        ):
+            raise serializers.ValidationError(
+                {'file_path': 'No file was submitted.'}
+            )
         return super().validate(attrs)
 
     def create(self, validated_data):
@@ -85,7 +356,11 @@ class GameSerializer(serializers.ModelSerializer):
             if request.user.role == 'developer':
                 validated_data.setdefault('developer', request.user)
 
-        return super().create(validated_data)
+        session = validated_data.pop('upload_id', None)
+        game = super().create(validated_data)
+        if session is not None:
+            session.attach(game)
+        return game
 
     def update(self, instance, validated_data):
         request = self.context.get('request')
@@ -97,18 +372,131 @@ class GameSerializer(serializers.ModelSerializer):
 
         if not is_admin and 'status' in validated_data:
             raise PermissionDenied('Only admin users can change the status.')
-        return super().update(instance, validated_data)
+
+        session = validated_data.pop('upload_id', None)
+        game = super().update(instance, validated_data)
+        if session is not None:
+            session.attach(game)
+        return game
+
+
+class ModerationGameSerializer(CoverFieldsMixin, serializers.ModelSerializer):
+    """Read-only summary of a game for the admin moderation queue.
+
+    Expects `select_related('developer', 'cover')` and
+    `prefetch_related('categories')`.
+    """
+    developer = serializers.SerializerMethodField()
+    categories = CategorySerializer(many=True, read_only=True)
+    base_screenshot = serializers.SerializerMethodField()
+    base_screenshot_placeholder = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Game
+        fields = [
+            'id', 'title', 'title_ar', 'status', 'rejection_reason',
+            'developer', 'categories',
+            'base_screenshot', 'base_screenshot_placeholder',
+            'file_size', 'file_validation_status', 'file_validation_report',
+            'created_at', 'updated_at'
+        ]
+        read_only_fields = fields
+
+    def get_developer(self, obj):
+        return {
+            'id': obj.developer_id,
+            'username': obj.developer.username,
+            'email': obj.developer.email,
+        }
+
+
+class ModerationActionSerializer(serializers.Serializer):
+    """Bulk status transition for the moderation queue"""
+    ACTIONS = {'approve': 'approved', 'reject': 'rejected'}
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        min_length=1,
+        max_length=500,
+    )
+    action = serializers.ChoiceField(choices=list(ACTIONS))
+    reason = serializers.CharField(required=False, allow_blank=True)
+
+    def validate(self, attrs):
+        if attrs['action'] == 'reject' and not attrs.get('reason', '').strip():
+            raise serializers.ValidationError(
+                {'reason': 'A reason is required when rejecting games.'}
+            )
+        return attrs
 
 
 class ScreenshotSerializer(serializers.ModelSerializer):
     """Serializer for Game Screenshot"""
     class Meta:
         model = Screenshot
-        fields = ['id', 'game', 'image_path', 'is_base', 'uploaded_at']
-        read_only_fields = ['id', 'uploaded_at']
+        fields = [
+            'id', 'game', 'image_path', 'is_base',
+            'placeholder', 'uploaded_at'
+        ]
+        read_only_fields = ['id', 'placeholder', 'uploaded_at']
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class UploadSessionSerializer(serializers.ModelSerializer):
+    """Serializer for resumable game upload sessions"""
+    game = serializers.PrimaryKeyRelatedField(
+        queryset=Game.objects.all(),
+        required=False,
+        allow_null=True,
+    )
+
+    class Meta:
+        model = UploadSession
+        fields = [
+            'id', 'game', 'filename', 'size', 'offset', 'sha256',
+            'status', 'created_at', 'updated_at'
+        ]
+        read_only_fields = [
+            'id', 'offset', 'status', 'created_at', 'updated_at'
+        ]
+
+    def validate_filename(self, value):
+        value = os.path.basename(value)
+        extension = os.path.splitext(value)[1][1:].lower()
+        if extension not in GAME_FILE_EXTENSIONS:
+            raise serializers.ValidationError(
+                'Allowed extensions are: '
+                + ', '.join(GAME_FILE_EXTENSIONS) + '.'
+            )
+        return value
+
+    def validate_size(self, value):
+        if value < 1:
+            raise serializers.ValidationError('Size must be positive.')
+        return value
+
+    def validate_sha256(self, value):
+        value = value.lower()
+        if value and (
+            len(value) != 64
+            or any(c not in '0123456789abcdef' for c in value)
+        ):
+            raise serializers.ValidationError(
+                'Expected a hex-encoded SHA-256 digest.'
+            )
+        return value
+
+    def validate_game(self, game):
+        request = self.context.get('request')
+        if game is not None and request is not None:
+            user = request.user
+            if user.role != 'admin' and game.developer_id != user.pk:
+                raise PermissionDenied(
+                    'You can only upload files for your own games.'
+                )
+        return game
+
+
+class ReviewSerializer(CompiledReadMixin, serializers.ModelSerializer):
     """Serializer for Game Review"""
     # Expose the review author as a read-only nested object (id + username)
     user = serializers.PrimaryKeyRelatedField(read_only=True)
@@ -117,6 +505,7 @@ class ReviewSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Review
+        list_serializer_class = CompiledListSerializer
         fields = [
             'id', 'game', 'user', 'user_username', 'user_profile_image',
             'rating', 'comment',
@@ -130,6 +519,17 @@ class ReviewSerializer(serializers.ModelSerializer):
         except Exception:
             return None
 
+    def compiled_accessors(self, build_url):
+        def user_profile_image(obj):
+            try:
+                if obj.user.profile_image:
+                    return build_url(obj.user.profile_image.url)
+                return None
+            except Exception:
+                return None
+
+        return {'user_profile_image': user_profile_image}
+
     def get_user_profile_image(self, obj):
         try:
             if obj.user.profile_image:
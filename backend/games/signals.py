@@ -0,0 +1,86 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import bump_catalog_version, bump_categories_version
+from .models import CatalogChange, Category, Game, Screenshot
+
+
+@receiver(post_save, sender=Screenshot)
+def screenshot_saved(sender, instance, created, raw=False, **kwargs):
+    """Keep `Game.cover` in sync when a screenshot is created or toggled."""
+    if raw:
+        return
+    # A new non-base screenshot cannot change the cover.
+    if created and not instance.is_base:
+        return
+    Game.sync_cover(instance.game_id)
+    _log_cover_change(instance.game_id)
+
+
+@receiver(post_delete, sender=Screenshot)
+def screenshot_deleted(sender, instance, **kwargs):
+    """Clear `Game.cover` when the base screenshot is removed."""
+    if instance.is_base:
+        Game.sync_cover(instance.game_id)
+        _log_cover_change(instance.game_id)
+
+
+def _log_cover_change(game_id):
+    """The base screenshot is part of the public game payload."""
+    if Game.objects.filter(pk=game_id, status='approved').exists():
+        CatalogChange.log('game', [game_id], 'upsert')
+        bump_catalog_version()
+
+
+@receiver(post_save, sender=Game)
+def game_saved(sender, instance, raw=False, **kwargs):
+    """Log the change and invalidate cached catalog data.
+
+    Bulk operations use queryset updates; they log their changes and
+    bump the version once themselves.
+    """
+    if raw:
+        return
+    CatalogChange.log_games([instance])
+    bump_catalog_version()
+
+
+@receiver(post_delete, sender=Game)
+def game_deleted(sender, instance, **kwargs):
+    if instance.was_public or instance.status == 'approved':
+        CatalogChange.log('game', [instance.pk], 'delete')
+    bump_catalog_version()
+
+
+@receiver(m2m_changed, sender=Game.categories.through)
+def game_categories_changed(sender, instance, action, reverse, pk_set,
+                            **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        # Changed from the category side: pk_set holds game ids (none for
+        # a clear, which only happens when the category goes away).
+        games = Game.objects.filter(pk__in=pk_set or [], status='approved')
+        CatalogChange.log('game', games.values_list('pk', flat=True), 'upsert')
+        Game.touch(pk_set or [])
+    else:
+        if instance.status == 'approved':
+            CatalogChange.log('game', [instance.pk], 'upsert')
+        Game.touch([instance.pk])
+    bump_catalog_version()
+
+
+@receiver(post_save, sender=Category)
+def category_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    CatalogChange.log('category', [instance.pk], 'upsert')
+    bump_catalog_version()
+    bump_categories_version()
+
+
+@receiver(post_delete, sender=Category)
+def category_deleted(sender, instance, **kwargs):
+    CatalogChange.log('category', [instance.pk], 'delete')
+    bump_catalog_version()
+    bump_categories_version()
@@ -0,0 +1,127 @@
+"""Offline catalog snapshots.
+
+A snapshot is a gzip-compressed NDJSON file (gzip decompresses natively
+in browsers, Node and Electron). Each line is one JSON object with a
+`type`:
+
+- `header`: `format`, `version`, `cursor`, `generated_at`
+- `category`: a category, as returned by the categories API
+- `game`: an approved game, as returned by the games API
+- `end`: `games` and `categories` counts, so truncated files are detected
+
+Games are streamed from the database in chunks and written straight to
+the compressor, so memory use does not grow with the catalog. `cursor` is
+read before the games, so replaying the change feed from it catches
+anything that changed while the snapshot was written.
+"""
+
+import gzip
+import hashlib
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.utils import timezone
+from rest_framework.utils.encoders import JSONEncoder
+
+from .models import CatalogChange, CatalogSnapshot, Category, Game
+from .serializers import CategorySerializer, GameSerializer
+
+
+FORMAT = 'indiehub-catalog'
+VERSION = 1
+CHUNK_SIZE = 500
+
+
+class _HashingWriter:
+    """File wrapper that hashes and counts the bytes written through it."""
+
+    def __init__(self, f):
+        self.f = f
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data):
+        self.digest.update(data)
+        self.size += len(data)
+        return self.f.write(data)
+
+    def flush(self):
+        self.f.flush()
+
+
+def latest_cursor():
+    """The last change id no uncommitted row can precede (see
+    `CatalogChange`)."""
+    settled = timezone.now() - timedelta(
+        seconds=settings.CATALOG_CHANGES_COMMIT_LAG
+    )
+    changes = CatalogChange.objects.values_list('id', flat=True)
+    pending = changes.filter(created_at__gt=settled).order_by('id').first()
+    if pending is not None:
+        return pending - 1
+    return changes.order_by('-id').first() or 0
+
+
+def build_snapshot(force=False):
+    """Write a new snapshot and drop older ones.
+
+    Returns the new snapshot, or the latest one unchanged when nothing
+    changed since it was built (unless `force`).
+    """
+    cursor = latest_cursor()
+    previous = CatalogSnapshot.objects.first()
+    if previous is not None and previous.cursor == cursor and not force:
+        return previous
+
+    encoder = JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    games = (
+        Game.objects.filter(status='approved')
+        .select_related('cover')
+        .prefetch_related('categories')
+        .order_by('pk')
+    )
+    represent_category = CategorySerializer().compile_representation()
+    represent_game = GameSerializer().compile_representation()
+    game_count = category_count = 0
+    with tempfile.TemporaryFile() as out:
+        writer = _HashingWriter(out)
+        with gzip.GzipFile(
+            fileobj=writer, mode='wb', mtime=0,
+            compresslevel=settings.CATALOG_SNAPSHOT_COMPRESSION_LEVEL,
+        ) as gz:
+            def emit(record):
+                gz.write(encoder.encode(record).encode('utf-8') + b'\n')
+
+            emit({
+                'type': 'header', 'format': FORMAT, 'version': VERSION,
+                'cursor': cursor, 'generated_at': timezone.now(),
+            })
+            for category in Category.objects.order_by('pk').iterator():
+                emit({'type': 'category', **represent_category(category)})
+                category_count += 1
+            for game in games.iterator(chunk_size=CHUNK_SIZE):
+                emit({'type': 'game', **represent_game(game)})
+                game_count += 1
+            emit({
+                'type': 'end', 'games': game_count,
+                'categories': category_count,
+            })
+
+        out.seek(0)
+        snapshot = CatalogSnapshot(
+            cursor=cursor,
+            game_count=game_count,
+            size=writer.size,
+            sha256=writer.digest.hexdigest(),
+        )
+        snapshot.file.save(f'catalog-{cursor}.ndjson.gz', File(out), save=False)
+        snapshot.save()
+
+    for old in CatalogSnapshot.objects.exclude(pk=snapshot.pk)[
+        settings.CATALOG_SNAPSHOT_KEEP - 1:
+    ]:
+        old.file.delete(save=False)
+        old.delete()
+    return snapshot
@@ -0,0 +1,89 @@
+"""Content-addressed storage for game archives.
+
+Files are stored under `games/<first two hex chars>/<sha256><ext>`, so
+identical uploads share a single blob and the digest can be recovered from
+the stored name without re-reading the file.
+"""
+
+import hashlib
+import os
+import re
+
+from django.core.files.storage import FileSystemStorage
+
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+_DIGEST_NAME_RE = re.compile(r'(?:^|/)([0-9a-f]{64})(?:\.[^/]*)?$')
+
+
+def file_sha256(path):
+    """Hash a file from disk without loading it into memory."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def scan_file(path, chunk_size):
+    """Hash a file and each fixed-size chunk of it in a single pass.
+
+    Returns a dict with the whole-file `sha256`, its `size` and the list
+    of per-chunk SHA-256 hex digests (`chunks`).
+    """
+    digest = hashlib.sha256()
+    chunks = []
+    size = 0
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+            chunks.append(hashlib.sha256(chunk).hexdigest())
+            size += len(chunk)
+    return {'sha256': digest.hexdigest(), 'size': size, 'chunks': chunks}
+
+
+def digest_from_name(name):
+    """Return the SHA-256 encoded in a content-addressed name, or ''."""
+    match = _DIGEST_NAME_RE.search(name or '')
+    return match.group(1) if match else ''
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage that names files after their SHA-256 digest.
+
+    Saving content that is already stored returns the existing name
+    instead of writing a duplicate.
+    """
+    prefix = 'games'
+
+    def name_for_digest(self, digest, original_name):
+        extension = os.path.splitext(original_name)[1].lower()
+        return f'{self.prefix}/{digest[:2]}/{digest}{extension}'
+
+    def get_available_name(self, name, max_length=None):
+        # Names are derived from content, so an existing file with the same
+        # name is the same blob and must be reused, not renamed.
+        return name
+
+    def _save(self, name, content):
+        digest = hashlib.sha256()
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        for chunk in content.chunks(HASH_BLOCK_SIZE):
+            digest.update(chunk)
+        name = self.name_for_digest(digest.hexdigest(), name)
+        if self.exists(name):
+            return name
+        content.seek(0)
+        return super()._save(name, content)
+
+
+# Concurrent uploads of the same blob write identical bytes, so overwriting
+# is safe and avoids FileSystemStorage retrying under a new name.
+game_file_storage = ContentAddressedStorage(allow_overwrite=True)
+
+
+def get_game_file_storage():
+    """Callable used by `Game.file_path` so migrations stay storage-agnostic."""
+    return game_file_storage
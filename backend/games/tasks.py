@@ -0,0 +1,60 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from jobs.queue import task
+
+from .models import CatalogChange, Game, UploadSession
+from .patches import generate_patch
+from .snapshots import build_snapshot
+
+
+@task(name='games.generate_build_patch', queue='games')
+def generate_build_patch(patch_id):
+    generate_patch(patch_id)
+
+
+@task(name='games.build_file_indexes', queue='games', priority=-1)
+def build_file_indexes(game_id):
+    game = Game.objects.filter(pk=game_id).first()
+    if game is not None and game.file_path:
+        game.build_file_indexes()
+
+
+@task(name='games.finalize_upload', queue='games')
+def finalize_upload(session_id):
+    session = UploadSession.objects.filter(
+        pk=session_id, status='finalizing'
+    ).select_related('game').first()
+    if session is not None:
+        session.finalize()
+
+
+@task(name='games.validate_game_file', queue='validation')
+def validate_game_file(game_id):
+    game = Game.objects.filter(pk=game_id).first()
+    if game is not None and game.file_path:
+        game.validate_file()
+
+
+@task(name='games.prune_catalog_changes')
+def prune_catalog_changes():
+    """Drop change log rows past the retention period.
+
+    The newest row is always kept so the feed can tell a pruned cursor
+    from an idle catalog.
+    """
+    cutoff = timezone.now() - timedelta(
+        days=settings.CATALOG_CHANGES_RETENTION_DAYS
+    )
+    latest = CatalogChange.objects.order_by('-id').values_list(
+        'id', flat=True
+    ).first()
+    CatalogChange.objects.filter(created_at__lt=cutoff).exclude(
+        pk=latest
+    ).delete()
+
+
+@task(name='games.build_catalog_snapshot', queue='games')
+def build_catalog_snapshot():
+    build_snapshot()
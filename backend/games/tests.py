@@ -1,10 +1,31 @@
+import base64
+import errno
+import hashlib
 import io
+import zipfile
+from unittest import mock
+import msgpack
+from PIL import Image
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Avg, Count
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from django.core.files.uploadedfile import SimpleUploadedFile
 from rest_framework import status
-from rest_framework.test import APITestCase
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
 from django.contrib.auth import get_user_model
-from .models import Game, Category, Review
+from api.cache import bump_table_versions
+from api.renderers import ORJSONRenderer
+from library.models import LibraryEntry
+from .cache import catalog_version
+from .models import CatalogChange, Game, Category, Review, Screenshot, UploadSession
+from .serializers import GameSerializer, ReviewSerializer, sparse_game_queryset
 
 User = get_user_model()
 
@@ -126,3 +147,531 @@ class GameTests(APITestCase):
         url = reverse('screenshot-list-list')
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def _png(self, name='shot.png'):
+        buf = io.BytesIO()
+        Image.new('RGB', (64, 48), color=(10, 120, 200)).save(buf, 'png')
+        return SimpleUploadedFile(name, buf.getvalue(), content_type='image/png')
+
+    def test_screenshot_placeholder_inlined_in_game_list(self):
+        game = Game.objects.create(title='G1', title_ar='ا', description='D', description_ar='و', developer=self.dev, status='approved')
+        shot = Screenshot.objects.create(game=game, image_path=self._png(), is_base=True)
+        self.assertTrue(shot.placeholder.startswith('data:image/jpeg;base64,'))
+
+        response = self.client.get(reverse('game-list-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]['base_screenshot_placeholder'], shot.placeholder)
+
+    def test_backfill_placeholders_command(self):
+        game = Game.objects.create(title='G1', title_ar='ا', description='D', description_ar='و', developer=self.dev, status='approved')
+        shot = Screenshot.objects.create(game=game, image_path=self._png(), is_base=True)
+        Screenshot.objects.filter(pk=shot.pk).update(placeholder='')
+        Game.touch([game.pk])
+        bump_table_versions([Screenshot])
+        url = reverse('game-list-list')
+        self.assertIsNone(self.client.get(url).json()[0]['base_screenshot_placeholder'])
+
+        call_command('backfill_placeholders', workers=2, stdout=io.StringIO())
+        shot.refresh_from_db()
+        self.assertTrue(shot.placeholder.startswith('data:image/jpeg;base64,'))
+        # Cached game payloads pick up the new placeholder
+        self.assertEqual(self.client.get(url).json()[0]['base_screenshot_placeholder'], shot.placeholder)
+
+    def test_cover_follows_base_screenshot(self):
+        game = Game.objects.create(title='G1', title_ar='ا', description='D', description_ar='و', developer=self.dev, status='approved')
+        first = Screenshot.objects.create(game=game, image_path=self._png(), is_base=True)
+        game.refresh_from_db()
+        self.assertEqual(game.cover_id, first.id)
+        self.assertEqual(game.cover_url, first.image_path.url)
+
+        first.is_base = False
+        first.save()
+        second = Screenshot.objects.create(game=game, image_path=self._png(), is_base=True)
+        game.refresh_from_db()
+        self.assertEqual(game.cover_id, second.id)
+
+        second.delete()
+        game.refresh_from_db()
+        self.assertIsNone(game.cover_id)
+        self.assertEqual(game.cover_url, '')
+
+    def test_check_game_covers_command_repairs(self):
+        game = Game.objects.create(title='G1', title_ar='ا', description='D', description_ar='و', developer=self.dev, status='approved')
+        shot = Screenshot.objects.create(game=game, image_path=self._png(), is_base=True)
+        Game.objects.filter(pk=game.pk).update(cover=None, cover_url='')
+
+        out = io.StringIO()
+        call_command('check_game_covers', fix=True, stdout=out)
+        self.assertIn('Repaired 1', out.getvalue())
+        game.refresh_from_db()
+        self.assertEqual(game.cover_id, shot.id)
+
+    def test_resumable_upload_then_create_game(self):
+        self.client.force_authenticate(user=self.dev)
+        payload = b'0123456789' * 100
+        response = self.client.post(reverse('upload-session-create'), {
+            'filename': 'big.zip', 'size': len(payload),
+            'sha256': hashlib.sha256(payload).hexdigest(),
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        detail = reverse('upload-session-detail', args=[response.data['id']])
+
+        first, second = payload[:600], payload[600:]
+        response = self.client.patch(
+            detail, first, content_type='application/offset+octet-stream',
+            HTTP_UPLOAD_OFFSET='0',
+            HTTP_UPLOAD_CHECKSUM='sha256 ' + base64.b64encode(hashlib.sha256(first).digest()).decode(),
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Upload-Offset'], '600')
+
+        # Replaying a stale offset is rejected with the current offset
+        response = self.client.patch(
+            detail, second, content_type='application/offset+octet-stream',
+            HTTP_UPLOAD_OFFSET='0',
+        )
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['offset'], 600)
+
+        # A chunk failing its checksum does not claim its range
+        response = self.client.patch(
+            detail, second, content_type='application/offset+octet-stream',
+            HTTP_UPLOAD_OFFSET='600',
+            HTTP_UPLOAD_CHECKSUM='sha256 ' + base64.b64encode(hashlib.sha256(first).digest()).decode(),
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(detail)['Upload-Offset'], '600')
+
+        # A chunk that cannot be copied into place gives its range back
+        with mock.patch(
+            'games.views.shutil.copyfileobj',
+            side_effect=OSError(errno.ENOSPC, 'No space left on device'),
+        ), self.assertRaises(OSError):
+            self.client.patch(
+                detail, second, content_type='application/offset+octet-stream',
+                HTTP_UPLOAD_OFFSET='600',
+            )
+        self.assertEqual(self.client.get(detail)['Upload-Offset'], '600')
+
+        response = self.client.patch(
+            detail, second, content_type='application/offset+octet-stream',
+            HTTP_UPLOAD_OFFSET='600',
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # Finalizing waits for claimed chunks still being copied
+        session = UploadSession.objects.get()
+        self.assertEqual(session.written, len(payload))
+        UploadSession.objects.update(written=600)
+        response = self.client.post(detail + 'finalize/')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        UploadSession.objects.update(written=len(payload))
+
+        # The file is hashed and verified by a background job
+        with override_settings(JOBS_EAGER=True), \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(detail + 'finalize/')
+            self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+            self.assertEqual(response.data['status'], 'finalizing')
+        response = self.client.get(detail)
+        self.assertEqual(response.data['status'], 'complete')
+
+        data = {k: v for k, v in self.game_data.items() if k != 'file_path'}
+        data['upload_id'] = response.data['id']
+        response = self.client.post(reverse('game-list'), data, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        game = Game.objects.get()
+        with game.file_path.open('rb') as f:
+            self.assertEqual(f.read(), payload)
+
+    def test_game_create_requires_file_or_upload(self):
+        self.client.force_authenticate(user=self.dev)
+        data = {k: v for k, v in self.game_data.items() if k != 'file_path'}
+        response = self.client.post(reverse('game-list'), data, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('file_path', response.data)
+
+    def _zip(self, files, compression=None):
+        buf = io.BytesIO()
+        if compression is None:
+            compression = zipfile.ZIP_DEFLATED
+        with zipfile.ZipFile(buf, 'w', compression) as archive:
+            for name, data in files.items():
+                archive.writestr(name, data)
+        return buf.getvalue()
+
+    def test_uploaded_file_validated_in_background(self):
+        self.client.force_authenticate(user=self.dev)
+        data = dict(self.game_data)
+        data['file_path'] = SimpleUploadedFile('ok.zip', self._zip({'game.bin': b'x' * 500}))
+        with override_settings(JOBS_EAGER=True), self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('game-list'), data, format='multipart')
+            # The response is sent before the checks run
+            self.assertEqual(response.data['file_validation_status'], 'pending')
+        game = Game.objects.get()
+        self.assertEqual(game.file_validation_status, 'valid')
+        self.assertEqual(game.file_validation_report['entries'], 1)
+
+        # Validation results are private to the developer and admins
+        Game.objects.filter(pk=game.pk).update(status='approved')
+        url = reverse('game-detail', args=[game.pk])
+        self.assertEqual(self.client.get(url).data['file_validation_status'], 'valid')
+        self.client.force_authenticate(user=self.user)
+        self.assertNotIn('file_validation_report', self.client.get(url).data)
+        listed = self.client.get(reverse('game-list-list')).data
+        self.assertNotIn('file_validation_report', listed[0])
+        self.client.force_authenticate(user=self.dev)
+
+        # Highly compressible payload over the ratio limit, and a truncated zip
+        bomb = self._zip({'zeros.bin': b'\0' * 200000})
+        truncated = self._zip({'game.bin': bytes(range(256)) * 40})[:-30]
+        # zipfile cannot write encrypted entries: set the flag bit in the
+        # local and central headers of a stored entry
+        encrypted = bytearray(self._zip({'game.bin': b'x' * 500}, zipfile.ZIP_STORED))
+        encrypted[6] |= 0x1
+        encrypted[encrypted.index(b'PK\x01\x02') + 8] |= 0x1
+        for name, payload in [
+            ('bomb.zip', bomb), ('cut.zip', truncated), ('locked.zip', bytes(encrypted)),
+        ]:
+            with override_settings(JOBS_EAGER=True, GAME_ARCHIVE_MAX_RATIO=50), \
+                    self.captureOnCommitCallbacks(execute=True):
+                game.file_path = SimpleUploadedFile(name, payload)
+                game.save()
+            game.refresh_from_db()
+            self.assertEqual(game.file_validation_status, 'invalid', name)
+            self.assertTrue(game.file_validation_report['errors'])
+        self.assertIn('Encrypted', game.file_validation_report['errors'][0])
+
+    def test_validate_game_files_command(self):
+        game = Game.objects.create(
+            title='Exe', title_ar='لعبة', description='D', description_ar='و',
+            developer=self.dev,
+            file_path=SimpleUploadedFile('game.exe', b'not an executable'),
+        )
+        self.assertEqual(game.file_validation_status, 'pending')
+        call_command('validate_game_files', '--workers', '2', stdout=io.StringIO())
+        game.refresh_from_db()
+        self.assertEqual(game.file_validation_status, 'invalid')
+        self.assertIn('not a Windows executable', game.file_validation_report['errors'][0])
+
+    def test_moderation_queue_and_bulk_actions(self):
+        games = [
+            Game.objects.create(
+                title=f'Pending {i}', title_ar='لعبة', description='D', description_ar='و',
+                developer=self.dev, file_path=SimpleUploadedFile(f'g{i}.zip', b'content %d' % i),
+            )
+            for i in range(3)
+        ]
+        for game in games:
+            game.categories.add(self.category)
+        Screenshot.objects.create(game=games[0], image_path=self._png(), is_base=True)
+        Game.objects.filter(pk=games[2].pk).update(file_validation_status='invalid')
+
+        self.client.force_authenticate(user=self.admin)
+        url = reverse('game-moderation')
+        # Games with developer and cover, then one query for all categories
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data), 3)
+        self.assertEqual(response.data[0]['developer']['username'], 'dev')
+        self.assertEqual(response.data[0]['categories'][0]['name'], 'Action')
+        self.assertTrue(response.data[0]['base_screenshot'])
+
+        version = catalog_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, {
+                'ids': [g.pk for g in games] + [9999], 'action': 'approve',
+            }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['updated'], [games[0].pk, games[1].pk])
+        self.assertEqual(response.data['skipped'], [games[2].pk])
+        self.assertEqual(response.data['not_found'], [9999])
+        self.assertEqual(catalog_version(), version + 1)
+
+        response = self.client.post(url, {'ids': [games[2].pk], 'action': 'reject'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(url, {
+            'ids': [games[2].pk], 'action': 'reject', 'reason': 'Corrupt archive',
+        }, format='json')
+        games[2].refresh_from_db()
+        self.assertEqual(games[2].status, 'rejected')
+        self.assertEqual(games[2].rejection_reason, 'Corrupt archive')
+
+    @override_settings(CATALOG_CHANGES_COMMIT_LAG=0)
+    def test_catalog_changes_feed(self):
+        url = reverse('catalog-changes')
+        cursor = self.client.get(url, {'since': 0}).data['cursor']
+
+        game = Game.objects.create(
+            title='Synced', title_ar='لعبة', description='D', description_ar='و',
+            developer=self.dev, status='approved',
+            file_path=SimpleUploadedFile('synced.zip', b'synced'),
+        )
+        game.categories.add(self.category)
+        hidden = Game.objects.create(
+            title='Hidden', title_ar='لعبة', description='D', description_ar='و',
+            developer=self.dev, file_path=SimpleUploadedFile('hidden.zip', b'hidden'),
+        )
+        response = self.client.get(url, {'since': cursor})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([g['id'] for g in response.data['games']], [game.id])
+        self.assertEqual(response.data['games'][0]['categories'][0]['id'], self.category.id)
+        # Games that were never public are not revealed
+        self.assertEqual(response.data['deleted_games'], [])
+        hidden.title = 'Still hidden'
+        hidden.save()
+        hidden.delete()
+        cursor = response.data['cursor']
+        self.assertEqual(self.client.get(url, {'since': cursor}).data['cursor'], cursor)
+
+        # Unapproved (bulk moderation) and deleted games become tombstones
+        self.client.force_authenticate(user=self.admin)
+        self.client.post(reverse('game-moderation'), {
+            'ids': [game.id], 'action': 'reject', 'reason': 'Broken',
+        }, format='json')
+        category_id = self.category.id
+        self.category.delete()
+        response = self.client.get(url, {'since': cursor, 'limit': 1})
+        self.assertEqual(response.data['deleted_games'], [game.id])
+        self.assertTrue(response.data['has_more'])
+        response = self.client.get(url, {'since': response.data['cursor']})
+        self.assertEqual(response.data['deleted_categories'], [category_id])
+        self.assertFalse(response.data['has_more'])
+
+        # Rows still within the commit lag are held back
+        game.status = 'approved'
+        game.save()
+        with override_settings(CATALOG_CHANGES_COMMIT_LAG=60):
+            response = self.client.get(url, {'since': cursor})
+            self.assertEqual(response.data['cursor'], cursor)
+            self.assertEqual(response.data['games'], [])
+            self.assertFalse(response.data['has_more'])
+
+        # Cursors older than the retained log must resync
+        CatalogChange.objects.filter(id__lte=cursor).delete()
+        response = self.client.get(url, {'since': 0})
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+
+    def test_sparse_fields_and_language(self):
+        game = Game.objects.create(
+            title='Card', title_ar='بطاقة', description='Long description',
+            description_ar='', developer=self.dev, status='approved',
+            file_path=SimpleUploadedFile('card.zip', b'card'),
+        )
+        game.categories.add(self.category)
+        url = reverse('game-list-list')
+
+        response = self.client.get(url, {'view': 'card'})
+        self.assertEqual(set(response.data[0]), {
+            'id', 'title', 'title_ar', 'base_screenshot',
+            'base_screenshot_placeholder', 'in_library', 'download_count',
+        })
+
+        # One language under the base names, English fallback when empty
+        response = self.client.get(url, {'fields': 'title,description,categories', 'lang': 'ar'})
+        self.assertEqual(response.data[0]['title'], 'بطاقة')
+        self.assertEqual(response.data[0]['description'], 'Long description')
+        self.assertNotIn('title_ar', response.data[0])
+        self.assertEqual(response.data[0]['categories'][0]['name'], 'أكشن')
+        self.assertNotIn('name_ar', response.data[0]['categories'][0])
+        response = self.client.get(url, {'view': 'card', 'lang': 'auto'}, HTTP_ACCEPT_LANGUAGE='ar-SA,ar;q=0.9')
+        self.assertEqual(response.data[0]['title'], 'بطاقة')
+
+        # Unused columns are not selected (on a response cache miss)
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url, {'view': 'card'})
+        self.assertNotIn('description', queries[0]['sql'])
+
+    def test_side_loaded_categories(self):
+        for title in ('One', 'Two'):
+            game = Game.objects.create(
+                title=title, title_ar=title, description='d', description_ar='d',
+                developer=self.dev, status='approved',
+                file_path=SimpleUploadedFile(f'{title}.zip', b'x'),
+            )
+            game.categories.add(self.category)
+
+        response = self.client.get(reverse('game-list-list'), {'categories': 'ids'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['games']), 2)
+        for item in response.data['games']:
+            self.assertNotIn('categories', item)
+            self.assertEqual(item['category_ids'], [self.category.id])
+        self.assertEqual(list(response.data['categories']), [str(self.category.id)])
+        self.assertEqual(response.data['categories'][str(self.category.id)]['name'], 'Action')
+
+        response = self.client.get(reverse('game-home-sections'), {'categories': 'ids'})
+        self.assertIn(str(self.category.id), response.data['categories'])
+        self.assertIn('category_ids', response.data['new_releases'][0])
+
+        # The categories list revalidates with its ETag until a category changes
+        url = reverse('category-list-list')
+        response = self.client.get(url)
+        etag = response['ETag']
+        self.assertIn('max-age', response['Cache-Control'])
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        Category.objects.create(name='Puzzle')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_compiled_list_serialization_matches_serializer(self):
+        covered = Game.objects.create(
+            title='Covered', title_ar='مغطاة', description='D', description_ar='',
+            developer=self.dev, status='approved',
+            file_path=SimpleUploadedFile('covered game.zip', b'c'),
+        )
+        covered.categories.add(self.category, Category.objects.create(name='Puzzle'))
+        Screenshot.objects.create(game=covered, image_path=self._png(), is_base=True)
+        plain = Game.objects.create(
+            title='Plain', title_ar='', description='D', description_ar='و', developer=self.dev,
+        )
+        LibraryEntry.objects.create(user=self.user, game=plain)
+        self.user.profile_image = self._png()
+        self.user.save()
+        Review.objects.create(game=covered, user=self.user, rating=4, comment='Good')
+        Review.objects.create(game=covered, user=self.dev, rating=5, comment='')
+
+        factory = APIRequestFactory()
+        variants = [
+            {}, {'view': 'card'}, {'fields': 'title,categories,file_path'},
+            {'lang': 'ar'}, {'lang': 'en', 'categories': 'ids'},
+        ]
+        for params in variants:
+            for user in (None, self.user):
+                request = Request(factory.get('/api/games/games-list/', params))
+                if user is not None:
+                    request.user = user
+                context = {'request': request}
+                qs = sparse_game_queryset(
+                    Game.objects.select_related('cover'), request
+                ).annotate(download_count=Count('downloads'), average_rating=Avg('reviews__rating'))
+                compiled = GameSerializer(qs, many=True, context=context).data
+                per_field = [GameSerializer(game, context=context).data for game in qs]
+                self.assertEqual(
+                    JSONRenderer().render(compiled), JSONRenderer().render(per_field), params
+                )
+                # Cached fragments render the same bytes, whether serialized
+                # (first pass) or read from the cache
+                for _ in range(2):
+                    cached = GameSerializer(qs, many=True, context=context).data
+                    self.assertEqual(
+                        ORJSONRenderer().render(cached), ORJSONRenderer().render(per_field), params
+                    )
+
+        reviews = Review.objects.select_related('user')
+        context = {'request': Request(factory.get('/api/games/reviews-list/'))}
+        self.assertEqual(
+            JSONRenderer().render(ReviewSerializer(reviews, many=True, context=context).data),
+            JSONRenderer().render([ReviewSerializer(r, context=context).data for r in reviews]),
+        )
+        images = [r['user_profile_image'] for r in ReviewSerializer(reviews, many=True, context=context).data]
+        self.assertTrue(any(image and image.startswith('http://testserver/media/') for image in images))
+
+    def test_game_fragments_cached_until_game_changes(self):
+        game = Game.objects.create(
+            title='Cached', title_ar='مخزنة', description='D', description_ar='و',
+            developer=self.dev, status='approved',
+            file_path=SimpleUploadedFile('cached.zip', b'c'),
+        )
+        list_url = reverse('game-list-list')
+        detail_url = reverse('game-list-detail', args=[game.pk])
+        self.assertEqual(self.client.get(list_url).json()[0]['title'], 'Cached')
+
+        # Fragments are keyed on updated_at: queryset updates that leave
+        # it alone are not seen, those setting it (e.g. from a worker
+        # process, without any signal) are
+        Game.objects.filter(pk=game.pk).update(title='Silent')
+        self.assertEqual(self.client.get(list_url).json()[0]['title'], 'Cached')
+        self.assertEqual(self.client.get(detail_url).json()['title'], 'Cached')
+        Game.objects.filter(pk=game.pk).update(title='Worker', updated_at=timezone.now())
+        self.assertEqual(self.client.get(detail_url).json()['title'], 'Worker')
+
+        game.refresh_from_db()
+        game.title = 'Renamed'
+        game.save()
+        self.assertEqual(self.client.get(list_url).json()[0]['title'], 'Renamed')
+        game.categories.add(self.category)
+        self.assertEqual(self.client.get(detail_url).json()['categories'][0]['name'], 'Action')
+        self.category.name = 'Arcade'
+        self.category.save()
+        self.assertEqual(self.client.get(detail_url).json()['categories'][0]['name'], 'Arcade')
+
+        # Per-user fields are not part of the fragment
+        LibraryEntry.objects.create(user=self.user, game=game)
+        self.assertIsNone(self.client.get(list_url).json()[0]['in_library'])
+        self.client.force_authenticate(user=self.user)
+        self.assertTrue(self.client.get(list_url).json()[0]['in_library'])
+        response = self.client.get(list_url, HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(msgpack.unpackb(response.content)[0]['title'], 'Renamed')
+
+    def test_public_list_responses_cached_per_role(self):
+        game = Game.objects.create(
+            title='Listed', title_ar='مدرجة', description='D', description_ar='و',
+            developer=self.dev, status='approved',
+        )
+        url = reverse('game-list-list')
+        self.client.get(url, {'view': 'card', 'sort': ''})
+        # Anonymous repeat (same normalized query): no database access
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {'sort': '', 'view': 'card'})
+        self.assertEqual(response.json()[0]['title'], 'Listed')
+        self.assertIn('Authorization', response['Vary'])
+
+        # Roles get their own buckets: the developer also sees pending games
+        Game.objects.create(
+            title='Pending', title_ar='معلقة', description='D', description_ar='و',
+            developer=self.dev,
+        )
+        self.assertEqual(len(self.client.get(url).json()), 1)
+        self.client.force_authenticate(user=self.dev)
+        self.assertEqual(len(self.client.get(url).json()), 2)
+        self.client.force_authenticate(user=None)
+
+        # A queryset update bumps the table version itself
+        Game.objects.filter(pk=game.pk).update(status='rejected')
+        bump_table_versions([Game])
+        self.assertEqual(self.client.get(url).json(), [])
+
+        reviews_url = reverse('review-list-list')
+        self.client.get(reviews_url, {'game': game.pk})
+        Review.objects.create(game=game, user=self.user, rating=5)
+        self.assertEqual(len(self.client.get(reviews_url, {'game': game.pk}).json()), 1)
+
+    def test_conditional_get_on_catalog_endpoints(self):
+        game = Game.objects.create(
+            title='Listed', title_ar='مدرجة', description='D', description_ar='و',
+            developer=self.dev, status='approved',
+        )
+        url = reverse('game-list-list')
+        response = self.client.get(url)
+        etag, last_modified = response['ETag'], response['Last-Modified']
+
+        # Validators are checked before any query or serialization
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        # Other queries and other users have their own validators
+        response = self.client.get(url, {'view': 'card'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        Review.objects.create(game=game, user=self.user, rating=4)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+        sections = reverse('game-home-sections')
+        etag = self.client.get(sections)['ETag']
+        response = self.client.get(sections, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.force_authenticate(user=self.admin)
+        metrics = self.client.get(reverse('cache-metrics')).data['views']
+        self.assertGreaterEqual(metrics['GameListView']['not_modified'], 2)
+        self.assertGreaterEqual(metrics['GameHomeSectionsView']['not_modified'], 1)
+        self.assertIsNotNone(metrics['GameListView']['cache_hit_rate'])
@@ -6,7 +6,12 @@ from .views import (
     AnalyticsDownloadsView,
     AnalyticsAvgRatingView,
     AnalyticsRatingDistributionView,
-    GameHomeSectionsView
+    GameHomeSectionsView,
+    UploadSessionCreateView,
+    UploadSessionDetailView,
+    UploadSessionFinalizeView,
+    GameModerationView,
+    CatalogChangesView
 )
 from rest_framework.routers import DefaultRouter
 from django.urls import path
@@ -42,4 +47,29 @@ urlpatterns += [
         GameHomeSectionsView.as_view(),
         name='game-home-sections'
         ),
+    path(
+        'uploads/',
+        UploadSessionCreateView.as_view(),
+        name='upload-session-create'
+        ),
+    path(
+        'uploads/<uuid:pk>/',
+        UploadSessionDetailView.as_view(),
+        name='upload-session-detail'
+        ),
+    path(
+        'uploads/<uuid:pk>/finalize/',
+        UploadSessionFinalizeView.as_view(),
+        name='upload-session-finalize'
+        ),
+    path(
+        'moderation/',
+        GameModerationView.as_view(),
+        name='game-moderation'
+        ),
+    path(
+        'changes/',
+        CatalogChangesView.as_view(),
+        name='catalog-changes'
+        ),
 ]
@@ -0,0 +1,206 @@
+"""Integrity and safety checks for uploaded game files.
+
+`validate_file` only takes a path and plain limits and returns a plain
+report, so it can run in a worker process (see `manage.py runworker
+--mode process` and the `validate_game_files` command). Checks:
+
+- the file is within the size limit and matches its recorded SHA-256;
+- the format matches the extension (zip, 7z, rar and exe signatures);
+- zip: entry count, total uncompressed size and compression ratio limits
+  (zip-bomb guard) from the central directory, then a full CRC test
+  (encrypted archives cannot be tested and are rejected);
+- 7z: start header and next header CRCs (catches truncated uploads),
+  and a full test when the optional `py7zr` package is installed.
+"""
+
+import binascii
+import hashlib
+import os
+import struct
+import zipfile
+
+from django.conf import settings
+
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+ZIP_SIGNATURES = (b'PK\x03\x04', b'PK\x05\x06')
+SEVEN_ZIP_SIGNATURE = b"7z\xbc\xaf'\x1c"
+RAR_SIGNATURE = b'Rar!\x1a\x07'
+EXE_SIGNATURE = b'MZ'
+ENCRYPTED_ZIP = 'Encrypted or unsupported zip archive.'
+# signature, version, start header CRC, next header offset/size/CRC
+SEVEN_ZIP_START_HEADER = struct.Struct('<6s2sIQQI')
+
+
+def get_limits():
+    """Validation limits from settings, as a picklable dict."""
+    return {
+        'max_size': settings.GAME_FILE_MAX_SIZE,
+        'max_entries': settings.GAME_ARCHIVE_MAX_ENTRIES,
+        'max_uncompressed': settings.GAME_ARCHIVE_MAX_UNCOMPRESSED,
+        'max_ratio': settings.GAME_ARCHIVE_MAX_RATIO,
+    }
+
+
+def validate_file(path, limits, expected_sha256=''):
+    """Check one game file and return a report dict.
+
+    The report always has `errors` (a list of messages, empty when the
+    file is valid), `sha256` and `size`; archive checks add `format`,
+    `entries`, `uncompressed_size` and `ratio` where known.
+    """
+    report = {'errors': [], 'format': '', 'sha256': '', 'size': None}
+    errors = report['errors']
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        errors.append('File is not readable.')
+        return report
+    report['size'] = size
+    if size > limits['max_size']:
+        errors.append(
+            f'File is {size} bytes, the limit is {limits["max_size"]}.'
+        )
+        return report
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        head = f.read(HASH_BLOCK_SIZE)
+        digest.update(head)
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    report['sha256'] = digest.hexdigest()
+    if expected_sha256 and report['sha256'] != expected_sha256:
+        errors.append('Stored file does not match its recorded SHA-256.')
+
+    extension = os.path.splitext(path)[1].lower().lstrip('.')
+    checks = {
+        'zip': _check_zip,
+        '7z': _check_7z,
+        'rar': _check_rar,
+        'exe': _check_exe,
+    }
+    report['format'] = extension
+    check = checks.get(extension)
+    if check is None:
+        errors.append(f'Unsupported file type: .{extension}')
+    else:
+        check(path, head, limits, report)
+    return report
+
+
+def _check_ratio(report, limits, compressed):
+    uncompressed = report['uncompressed_size']
+    report['ratio'] = round(uncompressed / compressed, 2) if compressed else 0
+    if report['entries'] > limits['max_entries']:
+        report['errors'].append(
+            f'Archive has {report["entries"]} entries, '
+            f'the limit is {limits["max_entries"]}.'
+        )
+    if uncompressed > limits['max_uncompressed']:
+        report['errors'].append(
+            f'Archive expands to {uncompressed} bytes, '
+            f'the limit is {limits["max_uncompressed"]}.'
+        )
+    if report['ratio'] > limits['max_ratio']:
+        report['errors'].append(
+            f'Compression ratio {report["ratio"]} exceeds '
+            f'{limits["max_ratio"]} (possible zip bomb).'
+        )
+
+
+def _check_zip(path, head, limits, report):
+    errors = report['errors']
+    if not head.startswith(ZIP_SIGNATURES):
+        errors.append('File is not a zip archive.')
+        return
+    try:
+        with zipfile.ZipFile(path) as archive:
+            infos = archive.infolist()
+            report['entries'] = len(infos)
+            report['uncompressed_size'] = sum(i.file_size for i in infos)
+            compressed = sum(i.compress_size for i in infos)
+            _check_ratio(report, limits, compressed)
+            for info in infos:
+                if info.compress_size and (
+                    info.file_size / info.compress_size > limits['max_ratio']
+                ):
+                    errors.append(
+                        f'Entry {info.filename} has a suspicious '
+                        'compression ratio (possible zip bomb).'
+                    )
+                    break
+            if errors:
+                # Never decompress an archive that already failed the
+                # size checks.
+                return
+            if any(info.flag_bits & 0x1 for info in infos):
+                errors.append(ENCRYPTED_ZIP)
+                return
+            bad = archive.testzip()
+            if bad is not None:
+                errors.append(f'Entry {bad} is corrupt (CRC mismatch).')
+    except (zipfile.BadZipFile, zipfile.LargeZipFile, OSError,
+            EOFError, NotImplementedError, ValueError):
+        errors.append('Corrupt zip archive.')
+    except RuntimeError:
+        # zipfile needs a password to read the entry
+        errors.append(ENCRYPTED_ZIP)
+
+
+def _check_7z(path, head, limits, report):
+    errors = report['errors']
+    if len(head) < SEVEN_ZIP_START_HEADER.size or not head.startswith(
+        SEVEN_ZIP_SIGNATURE
+    ):
+        errors.append('File is not a 7z archive.')
+        return
+    (
+        _, _, start_crc, next_offset, next_size, next_crc
+    ) = SEVEN_ZIP_START_HEADER.unpack_from(head)
+    if binascii.crc32(head[12:32]) != start_crc:
+        errors.append('Corrupt 7z archive: bad start header.')
+        return
+    header_start = SEVEN_ZIP_START_HEADER.size + next_offset
+    if header_start + next_size > report['size']:
+        errors.append('Truncated 7z archive.')
+        return
+    with open(path, 'rb') as f:
+        f.seek(header_start)
+        crc = 0
+        remaining = next_size
+        while remaining > 0:
+            block = f.read(min(HASH_BLOCK_SIZE, remaining))
+            crc = binascii.crc32(block, crc)
+            remaining -= len(block)
+        if crc != next_crc:
+            errors.append('Corrupt 7z archive: bad header CRC.')
+            return
+
+    try:
+        import py7zr
+    except ImportError:
+        return
+    try:
+        with py7zr.SevenZipFile(path) as archive:
+            infos = [i for i in archive.list() if not i.is_directory]
+            report['entries'] = len(infos)
+            report['uncompressed_size'] = sum(i.uncompressed for i in infos)
+            _check_ratio(report, limits, report['size'])
+            if errors:
+                return
+            if archive.testzip() is not None:
+                errors.append('Corrupt 7z archive (CRC mismatch).')
+    except Exception:
+        errors.append('Corrupt 7z archive.')
+
+
+def _check_rar(path, head, limits, report):
+    if not head.startswith(RAR_SIGNATURE):
+        report['errors'].append('File is not a rar archive.')
+
+
+def _check_exe(path, head, limits, report):
+    if not head.startswith(EXE_SIGNATURE):
+        report['errors'].append('File is not a Windows executable.')
@@ -1,20 +1,42 @@
+import base64
+import binascii
+import hashlib
+import os
+import shutil
 from rest_framework import status, viewsets
 from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied
-from django.db.models import Q
-from .models import Category, Game, Screenshot, Review
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_cache_control
+from .models import (
+    Category, Game, Screenshot, Review, UploadSession, CatalogChange
+)
+from .cache import bump_catalog_version
 from .serializers import (
     CategorySerializer,
     GameSerializer,
     ScreenshotSerializer,
-    ReviewSerializer
+    ReviewSerializer,
+    UploadSessionSerializer,
+    ModerationGameSerializer,
+    ModerationActionSerializer,
+    categories_by_id,
+    side_loaded_categories,
+    sparse_game_queryset
     )
 from users.permissions import IsAdminUser, IsAdminOrDeveloper, IsOwnerOrAdmin
+from users.models import User
+from api.cache import CachedResponseMixin, bump_table_versions
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from django.db.models import Count, Avg
 from django.db.models.functions import TruncDay, TruncWeek, TruncMonth
 from downloads.models import DownloadHistory
+from library.cache import library_state
 from django.utils import timezone
 from datetime import datetime, timedelta
 
@@ -45,17 +67,63 @@ class CategoryViewSet(viewsets.ModelViewSet):
         )
 
 
-class CategoryListView(viewsets.ReadOnlyModelViewSet):
+class CategoryListView(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     """
     API endpoint for listing and retrieving game categories.
     Accessible by all users.
+    Clients may reuse responses for `CATEGORY_LIST_MAX_AGE`, then
+    revalidate with `If-None-Match` and get 304 without a query.
     """
     queryset = Category.objects.all().order_by('name')
     serializer_class = CategorySerializer
     permission_classes = []  # Allow any user (authenticated or not)
+    cache_models = (Category,)
+
+    def conditional(self, request, render, *args, **kwargs):
+        response = super().conditional(request, render, *args, **kwargs)
+        patch_cache_control(
+            response, public=True, max_age=settings.CATEGORY_LIST_MAX_AGE
+        )
+        return response
 
 
-class GameViewSet(viewsets.ModelViewSet):
+class CachedGameRetrieveMixin:
+    """Game detail from the cached fragment shared with list responses.
+
+    Admins and the game's developer also get the private fields, which
+    are never cached.
+    """
+
+    def retrieve(self, request, *args, **kwargs):
+        game = self.get_object()
+        serializer = self.get_serializer(game)
+        if serializer.shows_private_fields():
+            return Response(serializer.data)
+        serializer = self.get_serializer([game], many=True)
+        return Response(serializer.data[0])
+
+
+class SideLoadedCategoriesMixin:
+    """`?categories=ids` on list: `{"games": [...], "categories": {...}}`,
+    each category serialized once instead of nested in every game."""
+
+    def list(self, request, *args, **kwargs):
+        if not side_loaded_categories(request):
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        games = list(page if page is not None else queryset)
+        data = {
+            'games': self.get_serializer(games, many=True).data,
+            'categories': categories_by_id(games, request),
+        }
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+
+class GameViewSet(CachedGameRetrieveMixin, SideLoadedCategoriesMixin,
+                  viewsets.ModelViewSet):
     """
     API endpoint for managing games.
     - Public (anonymous) users see only approved games.
@@ -90,35 +158,55 @@ class GameViewSet(viewsets.ModelViewSet):
             and user.is_authenticated
             and getattr(user, 'role', None) == 'admin'
         ):
-            return Game.objects.all().order_by('-created_at')
+            qs = Game.objects.all()
 
         # Developers see their own games and approved games
-        if (
+        elif (
             user
             and user.is_authenticated
             and getattr(user, 'role', None) == 'developer'
         ):
-            return (
-                Game.objects.filter(Q(status='approved') | Q(developer=user))
-                .order_by('-created_at')
-            )
+            qs = Game.objects.filter(Q(status='approved') | Q(developer=user))
 
         # Public: only approved games
-        return Game.objects.filter(status='approved').order_by('-created_at')
+        else:
+            qs = Game.objects.filter(status='approved')
+
+        qs = qs.select_related('cover').order_by('-created_at')
+        return sparse_game_queryset(qs, self.request)
 
     def perform_create(self, serializer):
         # Serializer assigns developer for developer users; admin may set it.
         serializer.save()
 
 
-class GameListView(viewsets.ReadOnlyModelViewSet):
+class GameListView(CachedResponseMixin, CachedGameRetrieveMixin,
+                   SideLoadedCategoriesMixin, viewsets.ReadOnlyModelViewSet):
     """
     API endpoint for listing and retrieving games.
     Accessible by all users.
+    Supports `?view=card`, `?fields=`, `?lang=en|ar|auto` and
+    `?categories=ids`; unused columns are deferred in SQL. List responses
+    are cached per role bucket and answer conditional GETs (api/cache.py).
     """
     queryset = Game.objects.all().order_by('-created_at')
     serializer_class = GameSerializer
     permission_classes = []  # Allow any user (authenticated or not)
+    cache_models = (
+        Game, Game.categories.through, Category, Screenshot, Review,
+        DownloadHistory,
+    )
+    cache_per_user = True  # in_library
+
+    def get_user_state(self, request):
+        changed = library_state(request)
+        return None if changed is None else (changed, changed)
+
+    def get_validator_period(self):
+        # Weekly download counts change as downloads leave the window
+        if self.request.query_params.get('sort') == 'trending':
+            return settings.TRENDING_VALIDATOR_PERIOD
+        return None
 
     def get_queryset(self):
         user = self.request.user
@@ -142,6 +230,10 @@ class GameListView(viewsets.ReadOnlyModelViewSet):
         else:
             qs = Game.objects.filter(status='approved')
 
+        # Base screenshot comes from the denormalized cover pointer
+        qs = qs.select_related('cover')
+        qs = sparse_game_queryset(qs, self.request)
+
         # Annotations for sorting
         qs = qs.annotate(
             avg_rating=Avg('reviews__rating'),
@@ -214,7 +306,7 @@ class ScreenshotViewSet(viewsets.ModelViewSet):
         serializer.save()
 
 
-class ScreenshotListView(viewsets.ReadOnlyModelViewSet):
+class ScreenshotListView(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     """
     Public read-only view for listing screenshots.
     Only returns screenshots for approved games for public users.
@@ -222,6 +314,7 @@ class ScreenshotListView(viewsets.ReadOnlyModelViewSet):
     queryset = Screenshot.objects.all().order_by('-uploaded_at')
     serializer_class = ScreenshotSerializer
     permission_classes = []  # Allow any
+    cache_models = (Screenshot, Game)
 
     def get_queryset(self):
         qs = Screenshot.objects.all().order_by('-uploaded_at')
@@ -282,7 +375,7 @@ class ReviewViewSet(viewsets.ModelViewSet):
             )
 
 
-class ReviewListView(viewsets.ReadOnlyModelViewSet):
+class ReviewListView(CachedResponseMixin, viewsets.ReadOnlyModelViewSet):
     """
     Public read-only view for listing and retrieving reviews.
     Allows filtering by game.
@@ -290,6 +383,7 @@ class ReviewListView(viewsets.ReadOnlyModelViewSet):
     queryset = Review.objects.select_related('user').all().order_by('-created_at')
     serializer_class = ReviewSerializer
     permission_classes = []  # Allow any (public)
+    cache_models = (Review, User)
 
     def get_queryset(self):
         qs = Review.objects.select_related('user').all().order_by('-created_at')
@@ -454,7 +548,7 @@ class AnalyticsRatingDistributionView(APIView):
 
         return Response({'distribution': distribution})
 
-class GameHomeSectionsView(APIView):
+class GameHomeSectionsView(CachedResponseMixin, APIView):
     """
     API endpoint to fetch all curated game sections for the home page.
     - Most Popular: Top 10 by total downloads.
@@ -462,15 +556,30 @@ class GameHomeSectionsView(APIView):
     - Top Rated: Top 10 by average rating (min 3 reviews).
     - Trending Now: Top 10 by downloads in the last 7 days.
     - Hidden Gems: Top 10 with rating > 4.0 and downloads < 50.
+    Responses are cached per role bucket and answer conditional GETs;
+    concurrent identical requests are computed once (api/cache.py).
     """
     permission_classes = []  # Allow anyone
+    cache_models = GameListView.cache_models
+    cache_per_user = True  # in_library
+    get_user_state = GameListView.get_user_state
+
+    def get_validator_period(self):
+        # Trending Now ranks downloads over a sliding window
+        return settings.TRENDING_VALIDATOR_PERIOD
 
     def get(self, request):
+        return self.conditional(request, self.cached(self._sections))
+
+    def _sections(self, request):
         now = timezone.now()
         last_week = now - timedelta(days=7)
 
         # Base queryset for approved games
-        approved_games = Game.objects.filter(status='approved')
+        approved_games = sparse_game_queryset(
+            Game.objects.filter(status='approved').select_related('cover'),
+            request,
+        )
 
         # 1. Most Popular (Top 10 by total downloads)
         most_popular = approved_games.annotate(
@@ -497,10 +606,385 @@ class GameHomeSectionsView(APIView):
             download_count=Count('downloads')
         ).filter(average_rating__gte=4.0).order_by('download_count', '-average_rating')[:10]
 
+        sections = {
+            'most_popular': most_popular,
+            'new_releases': new_releases,
+            'top_rated': top_rated,
+            'trending_now': trending_now,
+            'hidden_gems': hidden_gems,
+        }
+        data = {
+            name: GameSerializer(games, many=True, context={'request': request}).data
+            for name, games in sections.items()
+        }
+        if side_loaded_categories(request):
+            # Sections overlap; each category is sent once for all of them
+            data['categories'] = categories_by_id(
+                [game for games in sections.values() for game in games],
+                request,
+            )
+        return Response(data)
+
+
+# Request bodies are streamed to disk in blocks of this size
+UPLOAD_READ_BLOCK_SIZE = 1024 * 1024
+
+
+class GameModerationView(APIView):
+    """Admin moderation queue.
+
+    GET lists games in a status (`?status=`, default `pending`) with their
+    developer, categories, base screenshot and file validation results,
+    in a constant number of queries.
+
+    POST applies one transition to many games in a single transaction:
+    `{"ids": [...], "action": "approve" | "reject", "reason": "..."}`.
+    Games whose file failed validation are not approved. Cached catalog
+    data is invalidated once per batch.
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        wanted = request.query_params.get('status', 'pending')
+        if wanted not in dict(Game.STATUS_CHOICES):
+            return Response(
+                {'detail': 'Unknown status.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        games = (
+            Game.objects.filter(status=wanted)
+            .select_related('developer', 'cover')
+            .prefetch_related('categories')
+            .order_by('created_at')
+        )
+        serializer = ModerationGameSerializer(
+            games, many=True, context={'request': request}
+        )
+        return Response(serializer.data)
+
+    def post(self, request):
+        serializer = ModerationActionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = set(serializer.validated_data['ids'])
+        action = serializer.validated_data['action']
+        reason = serializer.validated_data.get('reason', '').strip()
+
+        with transaction.atomic():
+            found = {
+                pk: (game_status, checked)
+                for pk, game_status, checked in Game.objects
+                .select_for_update()
+                .filter(pk__in=ids)
+                .values_list('pk', 'status', 'file_validation_status')
+            }
+            skipped = []
+            if action == 'approve':
+                skipped = sorted(
+                    pk for pk, (_, checked) in found.items()
+                    if checked == 'invalid'
+                )
+            targets = sorted(set(found) - set(skipped))
+            if targets:
+                Game.objects.filter(pk__in=targets).update(
+                    status=ModerationActionSerializer.ACTIONS[action],
+                    rejection_reason=reason if action == 'reject' else '',
+                    updated_at=timezone.now(),
+                )
+                if action == 'approve':
+                    CatalogChange.log('game', targets, 'upsert')
+                else:
+                    # Tombstones only for games leaving the public catalog
+                    CatalogChange.log('game', [
+                        pk for pk in targets if found[pk][0] == 'approved'
+                    ], 'delete')
+                transaction.on_commit(bump_catalog_version)
+                transaction.on_commit(lambda: bump_table_versions([Game]))
+
         return Response({
-            'most_popular': GameSerializer(most_popular, many=True, context={'request': request}).data,
-            'new_releases': GameSerializer(new_releases, many=True, context={'request': request}).data,
-            'top_rated': GameSerializer(top_rated, many=True, context={'request': request}).data,
-            'trending_now': GameSerializer(trending_now, many=True, context={'request': request}).data,
-            'hidden_gems': GameSerializer(hidden_gems, many=True, context={'request': request}).data,
+            'action': action,
+            'updated': targets,
+            'skipped': skipped,
+            'not_found': sorted(ids - set(found)),
         })
+
+
+class CatalogChangesView(APIView):
+    """Delta-sync feed of the public catalog.
+
+    `?since=<cursor>` returns the current state of every approved game and
+    category changed after the cursor, ids of games and categories that
+    were deleted or left the public catalog, and the next `cursor`. Start
+    from the cursor of a full sync (or 0) and repeat while `has_more`.
+    Responds 410 when the log no longer reaches back to the cursor; the
+    client must then do a full sync. Changes are served once they are
+    `CATALOG_CHANGES_COMMIT_LAG` seconds old.
+    """
+    permission_classes = []  # Allow any
+
+    def get(self, request):
+        try:
+            since = int(request.query_params['since'])
+            limit = int(request.query_params.get(
+                'limit', settings.CATALOG_CHANGES_PAGE_SIZE
+            ))
+        except (KeyError, ValueError):
+            return Response(
+                {'detail': 'An integer `since` cursor is required.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if since < 0:
+            return Response(
+                {'detail': 'An integer `since` cursor is required.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        limit = min(max(limit, 1), settings.CATALOG_CHANGES_PAGE_SIZE)
+
+        first = CatalogChange.objects.order_by('id').values_list(
+            'id', flat=True
+        ).first()
+        if first is not None and since < first - 1:
+            return Response(
+                {'detail': 'Cursor is too old, do a full sync.'},
+                status=status.HTTP_410_GONE
+            )
+
+        # Rows younger than the commit lag may still have uncommitted
+        # predecessors; stop before the first one and serve it later
+        settled = timezone.now() - timedelta(
+            seconds=settings.CATALOG_CHANGES_COMMIT_LAG
+        )
+        rows = []
+        for row_id, entity, object_id, created_at in (
+            CatalogChange.objects.filter(id__gt=since)
+            .order_by('id')
+            .values_list('id', 'entity', 'object_id', 'created_at')[:limit]
+        ):
+            if created_at > settled:
+                limit = None
+                break
+            rows.append((row_id, entity, object_id))
+        game_ids = {pk for _, entity, pk in rows if entity == 'game'}
+        category_ids = {pk for _, entity, pk in rows if entity == 'category'}
+
+        games = list(
+            Game.objects.filter(pk__in=game_ids, status='approved')
+            .select_related('cover')
+            .prefetch_related('categories')
+            .order_by('pk')
+        )
+        categories = list(
+            Category.objects.filter(pk__in=category_ids).order_by('pk')
+        )
+        context = {'request': request}
+        return Response({
+            'cursor': rows[-1][0] if rows else since,
+            'has_more': limit is not None and len(rows) == limit,
+            'games': GameSerializer(games, many=True, context=context).data,
+            'deleted_games': sorted(game_ids - {g.pk for g in games}),
+            'categories': CategorySerializer(categories, many=True).data,
+            'deleted_categories': sorted(
+                category_ids - {c.pk for c in categories}
+            ),
+        })
+
+
+class UploadSessionCreateView(APIView):
+    """
+    Start a resumable upload of a game archive.
+
+    POST body: filename, size, optional sha256 (hex) and optional game id.
+    Chunks are then sent with PATCH to the session URL and the upload is
+    completed with POST to `finalize/`.
+    """
+    permission_classes = [IsAdminOrDeveloper]
+
+    def post(self, request):
+        serializer = UploadSessionSerializer(
+            data=request.data, context={'request': request}
+        )
+        serializer.is_valid(raise_exception=True)
+        session = serializer.save(user=request.user)
+        os.makedirs(settings.UPLOAD_SESSION_DIR, exist_ok=True)
+        open(session.part_path, 'wb').close()
+        return Response(
+            serializer.data,
+            status=status.HTTP_201_CREATED,
+            headers={'Upload-Offset': '0'},
+        )
+
+
+def _offset_mismatch(session):
+    return Response(
+        {'detail': 'Offset mismatch.', 'offset': session.offset},
+        status=status.HTTP_409_CONFLICT,
+        headers={'Upload-Offset': str(session.offset)},
+    )
+
+
+class UploadSessionDetailView(APIView):
+    """
+    Inspect (GET), append a chunk to (PATCH) or abort (DELETE) an upload.
+
+    PATCH requires an `Upload-Offset` header equal to the current offset
+    and may carry an `Upload-Checksum: sha256 <base64 digest>` header for
+    the chunk. The raw request body is streamed straight to the part file.
+    """
+    permission_classes = [IsAdminOrDeveloper]
+
+    def get_session(self, request, pk):
+        return get_object_or_404(UploadSession, pk=pk, user=request.user)
+
+    def get(self, request, pk):
+        session = self.get_session(request, pk)
+        return Response(
+            UploadSessionSerializer(session).data,
+            headers={'Upload-Offset': str(session.offset)},
+        )
+
+    def patch(self, request, pk):
+        session = self.get_session(request, pk)
+        try:
+            offset = int(request.headers.get('Upload-Offset', ''))
+        except ValueError:
+            return Response(
+                {'detail': 'Upload-Offset header is required.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        expected_digest = None
+        checksum = request.headers.get('Upload-Checksum')
+        if checksum:
+            algorithm, _, value = checksum.partition(' ')
+            try:
+                expected_digest = base64.b64decode(value, validate=True)
+            except (binascii.Error, ValueError):
+                expected_digest = None
+            if algorithm.lower() != 'sha256' or expected_digest is None:
+                return Response(
+                    {'detail': 'Upload-Checksum must be "sha256 <base64>".'},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        if session.status != 'uploading':
+            return Response(
+                {'detail': 'Upload session is already complete.'},
+                status=status.HTTP_409_CONFLICT,
+            )
+        if offset != session.offset:
+            return _offset_mismatch(session)
+
+        # The chunk is received into a file of its own without holding a
+        # lock on the session; only a complete, verified chunk claims its
+        # range (conditional update of the offset) and is copied in place.
+        chunk_path = session.new_chunk_path()
+        try:
+            digest = hashlib.sha256()
+            received = 0
+            stream = request.stream
+            with open(chunk_path, 'wb') as chunk:
+                while stream is not None:
+                    block = stream.read(UPLOAD_READ_BLOCK_SIZE)
+                    if not block:
+                        break
+                    received += len(block)
+                    if offset + received > session.size:
+                        return Response(
+                            {'detail': 'Chunk exceeds declared file size.'},
+                            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        )
+                    chunk.write(block)
+                    digest.update(block)
+
+            if (
+                expected_digest is not None
+                and digest.digest() != expected_digest
+            ):
+                return Response(
+                    {'detail': 'Chunk checksum mismatch.'},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            claimed = UploadSession.objects.filter(
+                pk=pk, status='uploading', offset=offset
+            ).update(offset=offset + received, updated_at=timezone.now())
+            if not claimed:
+                # Another request sent this range first
+                session.refresh_from_db()
+                return _offset_mismatch(session)
+
+            try:
+                with open(chunk_path, 'rb') as chunk, \
+                        open(session.part_path, 'r+b') as part:
+                    part.seek(offset)
+                    shutil.copyfileobj(chunk, part, UPLOAD_READ_BLOCK_SIZE)
+            except FileNotFoundError:
+                raise Http404  # Aborted meanwhile
+            except OSError:
+                # Give the range back so the chunk can be resent; if a
+                # later chunk claimed the next range meanwhile, the part
+                # file has a hole and the upload cannot complete
+                if not UploadSession.objects.filter(
+                    pk=pk, status='uploading', offset=offset + received
+                ).update(offset=offset, updated_at=timezone.now()):
+                    UploadSession.objects.filter(
+                        pk=pk, status='uploading'
+                    ).update(status='failed', updated_at=timezone.now())
+                raise
+            UploadSession.objects.filter(pk=pk).update(
+                written=F('written') + received
+            )
+        finally:
+            try:
+                os.remove(chunk_path)
+            except FileNotFoundError:
+                pass
+
+        return Response(
+            {'offset': offset + received, 'size': session.size},
+            headers={'Upload-Offset': str(offset + received)},
+        )
+
+    def delete(self, request, pk):
+        session = self.get_session(request, pk)
+        if session.status == 'attached':
+            return Response(
+                {'detail': 'Upload is already attached to a game.'},
+                status=status.HTTP_409_CONFLICT,
+            )
+        session.discard()
+        session.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class UploadSessionFinalizeView(APIView):
+    """
+    Complete an upload once all bytes are received.
+
+    A background job hashes the file, verifies it against the declared
+    SHA-256 (if any), then attaches it to the session's game (if any);
+    this responds 202 with status `finalizing` until it is done. Poll the
+    session until it is `complete` (or `failed` on a checksum mismatch).
+    A complete session can be referenced as `upload_id` when creating or
+    updating a game.
+    """
+    permission_classes = [IsAdminOrDeveloper]
+
+    def post(self, request, pk):
+        session = get_object_or_404(UploadSession, pk=pk, user=request.user)
+        if session.status == 'uploading' and not session.begin_finalize():
+            session.refresh_from_db()
+            if session.status == 'uploading':
+                return Response(
+                    {
+                        'detail': 'Upload is incomplete.',
+                        'offset': session.offset,
+                    },
+                    status=status.HTTP_409_CONFLICT,
+                )
+        return Response(
+            UploadSessionSerializer(session).data,
+            status=(
+                status.HTTP_202_ACCEPTED if session.status == 'finalizing'
+                else status.HTTP_200_OK
+            ),
+        )
@@ -0,0 +1,56 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('queue', models.CharField(default='default', help_text='Queue name (workers can be limited to some queues)', max_length=50)),
+                ('task', models.CharField(help_text='Registered task name', max_length=255)),
+                ('args', models.JSONField(blank=True, default=list, help_text='Positional arguments')),
+                ('kwargs', models.JSONField(blank=True, default=dict, help_text='Keyword arguments')),
+                ('priority', models.SmallIntegerField(default=0, help_text='Higher runs first')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='queued', help_text='Job status', max_length=20)),
+                ('attempts', models.PositiveSmallIntegerField(default=0, help_text='Number of times the job was claimed')),
+                ('max_attempts', models.PositiveSmallIntegerField(default=3, help_text='Give up after this many attempts')),
+                ('run_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Earliest time the job may run')),
+                ('locked_until', models.DateTimeField(blank=True, help_text='Visibility timeout: a running job whose lock expired is considered abandoned and is claimed again', null=True)),
+                ('locked_by', models.CharField(blank=True, help_text='Worker that claimed the job', max_length=100)),
+                ('last_error', models.TextField(blank=True, help_text='Traceback of the last failure')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Creation timestamp')),
+                ('started_at', models.DateTimeField(blank=True, help_text='When the last attempt started', null=True)),
+                ('finished_at', models.DateTimeField(blank=True, help_text='When the job completed or failed for good', null=True)),
+            ],
+            options={
+                'verbose_name': 'Job',
+                'verbose_name_plural': 'Jobs',
+                'ordering': ['-priority', 'run_at'],
+                'indexes': [models.Index(fields=['status', 'queue', 'run_at'], name='job_ready_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PeriodicJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Schedule name', max_length=100, unique=True)),
+                ('task', models.CharField(help_text='Registered task name', max_length=255)),
+                ('args', models.JSONField(blank=True, default=list, help_text='Positional arguments')),
+                ('queue', models.CharField(default='default', help_text='Queue the jobs are put on', max_length=50)),
+                ('interval', models.PositiveIntegerField(help_text='Seconds between runs')),
+                ('next_run_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Next time a job is enqueued')),
+            ],
+            options={
+                'verbose_name': 'Periodic Job',
+                'verbose_name_plural': 'Periodic Jobs',
+                'ordering': ['name'],
+            },
+        ),
+    ]
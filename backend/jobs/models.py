@@ -0,0 +1,145 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """
+    A unit of background work executed by `manage.py runworker`.
+
+    `task` is the registered name of a function decorated with
+    `jobs.queue.task`; it is called with `args` and `kwargs`.
+    """
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    queue = models.CharField(
+        max_length=50,
+        default='default',
+        help_text='Queue name (workers can be limited to some queues)'
+    )
+    task = models.CharField(
+        max_length=255,
+        help_text='Registered task name'
+    )
+    args = models.JSONField(
+        default=list,
+        blank=True,
+        help_text='Positional arguments'
+    )
+    kwargs = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text='Keyword arguments'
+    )
+    priority = models.SmallIntegerField(
+        default=0,
+        help_text='Higher runs first'
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='queued',
+        help_text='Job status'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        help_text='Number of times the job was claimed'
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        default=3,
+        help_text='Give up after this many attempts'
+    )
+    run_at = models.DateTimeField(
+        default=timezone.now,
+        help_text='Earliest time the job may run'
+    )
+    locked_until = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text='Visibility timeout: a running job whose lock expired '
+                  'is considered abandoned and is claimed again'
+    )
+    locked_by = models.CharField(
+        max_length=100,
+        blank=True,
+        help_text='Worker that claimed the job'
+    )
+    last_error = models.TextField(
+        blank=True,
+        help_text='Traceback of the last failure'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        help_text='Creation timestamp'
+    )
+    started_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text='When the last attempt started'
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text='When the job completed or failed for good'
+    )
+
+    class Meta:
+        verbose_name = 'Job'
+        verbose_name_plural = 'Jobs'
+        ordering = ['-priority', 'run_at']
+        indexes = [
+            models.Index(
+                fields=['status', 'queue', 'run_at'],
+                name='job_ready_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.task} [{self.status}]"
+
+
+class PeriodicJob(models.Model):
+    """
+    Schedule state for a periodic task declared in `JOBS_PERIODIC`.
+
+    Workers compare-and-swap `next_run_at`, so each period enqueues
+    exactly one job even with several workers running.
+    """
+    name = models.CharField(
+        max_length=100,
+        unique=True,
+        help_text='Schedule name'
+    )
+    task = models.CharField(
+        max_length=255,
+        help_text='Registered task name'
+    )
+    args = models.JSONField(
+        default=list,
+        blank=True,
+        help_text='Positional arguments'
+    )
+    queue = models.CharField(
+        max_length=50,
+        default='default',
+        help_text='Queue the jobs are put on'
+    )
+    interval = models.PositiveIntegerField(
+        help_text='Seconds between runs'
+    )
+    next_run_at = models.DateTimeField(
+        default=timezone.now,
+        help_text='Next time a job is enqueued'
+    )
+
+    class Meta:
+        verbose_name = 'Periodic Job'
+        verbose_name_plural = 'Periodic Jobs'
+        ordering = ['name']
+
+    def __str__(self):
+        return f"{self.name} every {self.interval}s"
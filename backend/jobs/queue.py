@@ -0,0 +1,347 @@
+"""Database-backed job queue.
+
+Usage:
+
+    from jobs.queue import task, enqueue
+
+    @task()
+    def rebuild_stats(game_id):
+        ...
+
+    enqueue(rebuild_stats, game_id)
+
+Tasks live in `<app>/tasks.py` modules, which workers import at startup.
+Jobs are claimed with `SELECT ... FOR UPDATE SKIP LOCKED` on databases
+that support it (Postgres) and inside an immediate (write-locked)
+transaction on SQLite, so concurrent workers never run the same job.
+While a job runs, its worker keeps extending the lease (`locked_until`);
+a job whose lease expires is claimed again only while it has attempts
+left, and is marked failed otherwise.
+"""
+
+import logging
+import threading
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Avg, Count, F, Min, Q
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from .models import Job, PeriodicJob
+
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+def task(name=None, queue='default', priority=0, max_attempts=None):
+    """Register a function as a job task.
+
+    The decorated function keeps working as a plain function; its job
+    defaults are attached for `enqueue`.
+    """
+    def decorator(func):
+        task_name = name or f'{func.__module__}.{func.__name__}'
+        func.job_name = task_name
+        func.job_queue = queue
+        func.job_priority = priority
+        func.job_max_attempts = max_attempts
+        _registry[task_name] = func
+        return func
+    return decorator
+
+
+def get_task(name):
+    if name not in _registry:
+        autodiscover_tasks()
+    try:
+        return _registry[name]
+    except KeyError:
+        raise LookupError(f'Unknown job task: {name}')
+
+
+def autodiscover_tasks():
+    """Import `tasks` modules of all installed apps."""
+    autodiscover_modules('tasks')
+
+
+def enqueue(func, *args, queue=None, priority=None, run_at=None,
+            delay=None, max_attempts=None, **kwargs):
+    """Create a job for a registered task and return it.
+
+    Call inside `transaction.on_commit` when the job depends on rows
+    written by the current transaction.
+    """
+    name = func if isinstance(func, str) else func.job_name
+    registered = get_task(name)
+    if run_at is None:
+        run_at = timezone.now()
+        if delay:
+            run_at += timedelta(seconds=delay)
+    if max_attempts is None:
+        max_attempts = (
+            registered.job_max_attempts or settings.JOBS_MAX_ATTEMPTS
+        )
+    job = Job.objects.create(
+        task=name,
+        args=list(args),
+        kwargs=kwargs,
+        queue=queue or registered.job_queue,
+        priority=registered.job_priority if priority is None else priority,
+        run_at=run_at,
+        max_attempts=max_attempts,
+    )
+    if settings.JOBS_EAGER:
+        execute(job.pk)
+        job.refresh_from_db()
+    return job
+
+
+def enqueue_on_commit(func, *args, **kwargs):
+    """Enqueue once the current transaction commits."""
+    transaction.on_commit(lambda: enqueue(func, *args, **kwargs))
+
+
+def _ready_jobs(queues, now):
+    ready = Q(status='queued', run_at__lte=now) | Q(
+        status='running', locked_until__lt=now,
+        attempts__lt=F('max_attempts'),
+    )
+    qs = Job.objects.filter(ready)
+    if queues:
+        qs = qs.filter(queue__in=queues)
+    return qs.order_by('-priority', 'run_at', 'id')
+
+
+def claim(worker_id, limit=1, queues=None, visibility_timeout=None):
+    """Atomically claim up to `limit` ready jobs for `worker_id`.
+
+    Returns the list of claimed job ids.
+    """
+    if visibility_timeout is None:
+        visibility_timeout = settings.JOBS_VISIBILITY_TIMEOUT
+    now = timezone.now()
+    fail_abandoned(now)
+
+    def take(qs):
+        ids = list(qs.values_list('id', flat=True)[:limit])
+        if ids:
+            Job.objects.filter(id__in=ids).update(
+                status='running',
+                locked_by=worker_id,
+                locked_until=now + timedelta(seconds=visibility_timeout),
+                started_at=now,
+                attempts=F('attempts') + 1,
+            )
+        return ids
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            return take(
+                _ready_jobs(queues, now).select_for_update(skip_locked=True)
+            )
+
+    if connection.vendor == 'sqlite' and not connection.in_atomic_block:
+        # BEGIN IMMEDIATE takes the write lock up front, so two workers
+        # cannot both read the same ready rows before updating them.
+        connection.ensure_connection()
+        with connection.cursor() as cursor:
+            cursor.execute('BEGIN IMMEDIATE')
+            try:
+                ids = take(_ready_jobs(queues, now))
+            except Exception:
+                cursor.execute('ROLLBACK')
+                raise
+            cursor.execute('COMMIT')
+        return ids
+
+    with transaction.atomic():
+        return take(_ready_jobs(queues, now).select_for_update())
+
+
+def fail_abandoned(now=None):
+    """Mark running jobs whose lease expired and that have no attempts
+    left as failed (a job that kills its worker is not retried forever).
+    """
+    now = now or timezone.now()
+    return Job.objects.filter(
+        status='running', locked_until__lt=now,
+        attempts__gte=F('max_attempts'),
+    ).update(
+        status='failed',
+        finished_at=now,
+        locked_until=None,
+        last_error='Abandoned: the worker lease expired on the last attempt.',
+    )
+
+
+class _Heartbeat(threading.Thread):
+    """Extends the lease of a running job until stopped."""
+
+    def __init__(self, job, claimed, lease):
+        super().__init__(daemon=True, name=f'job-{job.pk}-heartbeat')
+        self.claimed = claimed
+        self.lease = lease
+        self.stopped = threading.Event()
+
+    def run(self):
+        try:
+            while not self.stopped.wait(self.lease / 3):
+                self.claimed.update(
+                    locked_until=timezone.now()
+                    + timedelta(seconds=self.lease)
+                )
+        finally:
+            connection.close()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def execute(job_id, visibility_timeout=None):
+    """Run one claimed job and record its outcome.
+
+    Failures are retried with exponential backoff until `max_attempts`.
+    Outcomes are only recorded while this claim still owns the job: a
+    worker whose lease was taken over leaves the new owner's job alone.
+    """
+    job = Job.objects.get(pk=job_id)
+    if job.status == 'queued':
+        # Eager execution or a direct call: mark it as claimed here
+        Job.objects.filter(pk=job.pk).update(
+            status='running', started_at=timezone.now(),
+            attempts=F('attempts') + 1,
+        )
+        job.refresh_from_db()
+    # Each claim increments `attempts`, so it identifies this claim
+    claimed = Job.objects.filter(
+        pk=job.pk, status='running',
+        locked_by=job.locked_by, attempts=job.attempts,
+    )
+
+    heartbeat = None
+    if job.locked_until is not None:
+        heartbeat = _Heartbeat(
+            job, claimed, visibility_timeout or settings.JOBS_VISIBILITY_TIMEOUT
+        )
+        heartbeat.start()
+    try:
+        get_task(job.task)(*job.args, **job.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        logger.warning('Job %s (%s) failed:\n%s', job.pk, job.task, error)
+        if job.attempts < job.max_attempts:
+            backoff = settings.JOBS_RETRY_BACKOFF * 2 ** (job.attempts - 1)
+            claimed.update(
+                status='queued',
+                run_at=timezone.now() + timedelta(seconds=backoff),
+                locked_until=None,
+                locked_by='',
+                last_error=error,
+            )
+        else:
+            claimed.update(
+                status='failed',
+                finished_at=timezone.now(),
+                locked_until=None,
+                last_error=error,
+            )
+        return False
+    finally:
+        if heartbeat is not None:
+            heartbeat.stop()
+
+    claimed.update(
+        status='done', finished_at=timezone.now(), locked_until=None
+    )
+    return True
+
+
+def sync_schedule():
+    """Create or update PeriodicJob rows from `JOBS_PERIODIC`."""
+    names = []
+    for entry in settings.JOBS_PERIODIC:
+        names.append(entry['name'])
+        PeriodicJob.objects.update_or_create(
+            name=entry['name'],
+            defaults={
+                'task': entry['task'],
+                'args': entry.get('args', []),
+                'queue': entry.get('queue', 'default'),
+                'interval': entry['interval'],
+            },
+        )
+    PeriodicJob.objects.exclude(name__in=names).delete()
+
+
+def enqueue_due_periodic():
+    """Enqueue one job for every periodic schedule that is due."""
+    now = timezone.now()
+    enqueued = 0
+    for periodic in PeriodicJob.objects.filter(next_run_at__lte=now):
+        # Compare-and-swap: only the worker that moves next_run_at forward
+        # enqueues the job for this period.
+        moved = PeriodicJob.objects.filter(
+            pk=periodic.pk, next_run_at=periodic.next_run_at
+        ).update(next_run_at=now + timedelta(seconds=periodic.interval))
+        if moved:
+            enqueue(periodic.task, *periodic.args, queue=periodic.queue)
+            enqueued += 1
+    return enqueued
+
+
+def queue_stats(window_minutes=15):
+    """Queue depth and latency per queue.
+
+    - depth: jobs ready to run now
+    - scheduled: queued jobs whose run_at is in the future
+    - oldest_wait_seconds: age of the oldest ready job
+    - avg_wait_seconds: mean delay between run_at and start, for jobs
+      started within the last `window_minutes`
+    - avg_run_seconds: mean run time of jobs finished in that window
+    """
+    now = timezone.now()
+    since = now - timedelta(minutes=window_minutes)
+    stats = {}
+
+    def bucket(queue):
+        return stats.setdefault(queue, {
+            'depth': 0, 'scheduled': 0, 'running': 0, 'failed': 0,
+            'oldest_wait_seconds': 0.0, 'avg_wait_seconds': None,
+            'avg_run_seconds': None,
+        })
+
+    rows = Job.objects.filter(status__in=['queued', 'running', 'failed'])
+    rows = rows.values('queue').annotate(
+        depth=Count('id', filter=Q(status='queued', run_at__lte=now)),
+        scheduled=Count('id', filter=Q(status='queued', run_at__gt=now)),
+        running=Count('id', filter=Q(status='running')),
+        failed=Count('id', filter=Q(status='failed')),
+        oldest=Min('run_at', filter=Q(status='queued', run_at__lte=now)),
+    )
+    for row in rows:
+        data = bucket(row['queue'])
+        for key in ('depth', 'scheduled', 'running', 'failed'):
+            data[key] = row[key]
+        if row['oldest']:
+            data['oldest_wait_seconds'] = (now - row['oldest']).total_seconds()
+
+    recent = Job.objects.filter(started_at__gte=since).values('queue').annotate(
+        wait=Avg(F('started_at') - F('run_at')),
+        run=Avg(
+            F('finished_at') - F('started_at'),
+            filter=Q(finished_at__isnull=False),
+        ),
+    )
+    for row in recent:
+        data = bucket(row['queue'])
+        if row['wait'] is not None:
+            data['avg_wait_seconds'] = row['wait'].total_seconds()
+        if row['run'] is not None:
+            data['avg_run_seconds'] = row['run'].total_seconds()
+    return stats
@@ -0,0 +1,9 @@
+from django.core.management import call_command
+
+from .queue import task
+
+
+@task(name='jobs.management_command')
+def management_command(name, *args):
+    """Run a management command as a job (used by periodic schedules)."""
+    call_command(name, *args)
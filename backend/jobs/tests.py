@@ -0,0 +1,109 @@
+from datetime import timedelta
+from django.db.models import F
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth import get_user_model
+from .models import Job, PeriodicJob
+from .queue import claim, enqueue, enqueue_due_periodic, execute, sync_schedule, task
+
+User = get_user_model()
+
+calls = []
+
+
+@task(name='jobs.tests.record')
+def record(value):
+    calls.append(value)
+
+
+@task(name='jobs.tests.explode')
+def explode():
+    raise RuntimeError('boom')
+
+
+@task(name='jobs.tests.take_over')
+def take_over():
+    # Another worker claims the job after this worker's lease expired
+    Job.objects.filter(task='jobs.tests.take_over').update(
+        locked_by='w2', attempts=F('attempts') + 1
+    )
+
+
+class JobQueueTests(APITestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_claim_runs_by_priority_and_retries_with_backoff(self):
+        low = enqueue(record, 'low')
+        high = enqueue(record, 'high', priority=5)
+        enqueue(record, 'later', delay=3600)
+
+        self.assertEqual(claim('w1', limit=1), [high.pk])
+        # Claimed jobs are invisible to other workers until the lock expires
+        self.assertEqual(claim('w2', limit=5), [low.pk])
+        Job.objects.filter(pk=high.pk).update(
+            locked_until=timezone.now() - timedelta(seconds=1)
+        )
+        self.assertEqual(claim('w2', limit=5), [high.pk])
+
+        self.assertTrue(execute(high.pk))
+        self.assertEqual(calls, ['high'])
+        self.assertEqual(Job.objects.get(pk=high.pk).status, 'done')
+
+        failing = enqueue(explode, max_attempts=2)
+        claim('w1', limit=5)
+        with self.assertLogs('jobs.queue', 'WARNING'):
+            self.assertFalse(execute(failing.pk))
+        failing.refresh_from_db()
+        self.assertEqual(failing.status, 'queued')
+        self.assertGreater(failing.run_at, timezone.now())
+        self.assertIn('RuntimeError', failing.last_error)
+
+        Job.objects.filter(pk=failing.pk).update(run_at=timezone.now())
+        claim('w1', limit=5)
+        with self.assertLogs('jobs.queue', 'WARNING'):
+            self.assertFalse(execute(failing.pk))
+        self.assertEqual(Job.objects.get(pk=failing.pk).status, 'failed')
+
+    def test_expired_leases_fail_out_of_attempts_and_lose_ownership(self):
+        stale = enqueue(record, 'stale', max_attempts=1)
+        self.assertEqual(claim('w1', limit=1), [stale.pk])
+        Job.objects.filter(pk=stale.pk).update(
+            locked_until=timezone.now() - timedelta(seconds=1)
+        )
+        # No attempts left: the abandoned job fails instead of rerunning
+        self.assertEqual(claim('w2', limit=5), [])
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, 'failed')
+        self.assertIn('Abandoned', stale.last_error)
+
+        job = enqueue(take_over)
+        claim('w1', limit=1)
+        self.assertTrue(execute(job.pk))
+        # w1's late outcome does not overwrite w2's claim
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'running')
+        self.assertEqual(job.locked_by, 'w2')
+
+    @override_settings(JOBS_PERIODIC=[{
+        'name': 'record-tick', 'task': 'jobs.tests.record',
+        'args': ['tick'], 'interval': 60,
+    }])
+    def test_periodic_jobs_enqueue_once_per_interval(self):
+        sync_schedule()
+        periodic = PeriodicJob.objects.get(name='record-tick')
+        self.assertEqual(enqueue_due_periodic(), 1)
+        self.assertEqual(enqueue_due_periodic(), 0)
+        periodic.refresh_from_db()
+        self.assertGreater(periodic.next_run_at, timezone.now())
+
+        admin = User.objects.create_user(
+            username='admin', email='a@a.com', password='p', role='admin'
+        )
+        self.client.force_authenticate(user=admin)
+        response = self.client.get(reverse('job-metrics'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['queues']['default']['depth'], 1)
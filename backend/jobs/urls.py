@@ -0,0 +1,10 @@
+from django.urls import path
+from .views import QueueMetricsView
+
+urlpatterns = [
+    path(
+        'metrics/',
+        QueueMetricsView.as_view(),
+        name='job-metrics'
+        ),
+]
@@ -0,0 +1,14 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from users.permissions import IsAdminUser
+from .queue import queue_stats
+
+
+class QueueMetricsView(APIView):
+    """
+    Queue depth and latency per queue (admin only).
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({'queues': queue_stats()})
@@ -0,0 +1,81 @@
+"""Cached per-user sets of library game ids.
+
+Game listings mark games in the requester's library (`in_library`). The
+set of ids is read once per user from the cache, stored as a packed array
+of 64-bit ints, instead of joining library entries into every list query.
+Library writes invalidate the user's key.
+
+Cached game responses of signed-in users are keyed on the user's library
+version (`library_state`) rather than on the library table, so a library
+write only invalidates the writer's responses.
+"""
+
+import time
+from array import array
+
+from django.conf import settings
+from django.core.cache import cache
+
+from api.cache import bump_table_versions
+from .models import LibraryEntry
+
+
+def _key(user_id):
+    return f'library:game-ids:{user_id}'
+
+
+def _version_key(user_id):
+    return f'library:changed:{user_id}'
+
+
+def library_game_ids(user_id):
+    """Return the frozenset of game ids in the user's library."""
+    packed = cache.get(_key(user_id))
+    if packed is None:
+        ids = array('Q', sorted(
+            LibraryEntry.objects.filter(user_id=user_id)
+            .values_list('game_id', flat=True)
+        ))
+        cache.set(
+            _key(user_id), ids.tobytes(), settings.LIBRARY_IDS_CACHE_TIMEOUT
+        )
+        return frozenset(ids)
+    ids = array('Q')
+    ids.frombytes(packed)
+    return frozenset(ids)
+
+
+def library_game_ids_for_request(request):
+    """Library game ids of the authenticated requester, memoized on the
+    request; None for anonymous requests."""
+    if request is None or not request.user.is_authenticated:
+        return None
+    ids = getattr(request, '_library_game_ids', None)
+    if ids is None:
+        ids = library_game_ids(request.user.pk)
+        request._library_game_ids = ids
+    return ids
+
+
+def library_state(request):
+    """Time (epoch seconds) of the last change to the requester's library,
+    which also serves as its version; None for anonymous requests."""
+    if request is None or not request.user.is_authenticated:
+        return None
+    key = _version_key(request.user.pk)
+    changed = cache.get(key)
+    if changed is None:
+        # Unknown (expired): assume it just changed
+        cache.add(key, time.time(), settings.LIBRARY_IDS_CACHE_TIMEOUT)
+        changed = cache.get(key, time.time())
+    return changed
+
+
+def invalidate_library(user_id):
+    cache.delete(_key(user_id))
+    # Cached game responses of this user carrying `in_library`
+    cache.set(
+        _version_key(user_id), time.time(), settings.LIBRARY_IDS_CACHE_TIMEOUT
+    )
+    # Cached library responses (admins list every user's entries)
+    bump_table_versions([LibraryEntry])
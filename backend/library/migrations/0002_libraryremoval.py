@@ -0,0 +1,33 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='libraryentry',
+            index=models.Index(fields=['user', 'added_at'], name='library_user_added_idx'),
+        ),
+        migrations.CreateModel(
+            name='LibraryRemoval',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('game_id', models.PositiveBigIntegerField(help_text='Removed game (kept after the game is deleted)')),
+                ('removed_at', models.DateTimeField(auto_now_add=True, help_text='Date removed from library')),
+                ('user', models.ForeignKey(help_text='User', on_delete=django.db.models.deletion.CASCADE, related_name='library_removals', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Library Removal',
+                'verbose_name_plural': 'Library Removals',
+                'ordering': ['removed_at'],
+                'indexes': [models.Index(fields=['user', 'removed_at'], name='library_user_removed_idx')],
+            },
+        ),
+    ]
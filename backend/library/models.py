@@ -29,6 +29,53 @@ class LibraryEntry(models.Model):
         verbose_name_plural = 'Library Entries'
         ordering = ['-added_at']
         unique_together = ['user', 'game']
+        indexes = [
+            models.Index(
+                fields=['user', 'added_at'],
+                name='library_user_added_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.username}'s library: {self.game.title}"
+
+
+class LibraryRemoval(models.Model):
+    """
+    Tombstone for a game removed from a user's library, so clients can
+    sync removals with `entries/changes/?since=`. Pruned after
+    `LIBRARY_TOMBSTONE_RETENTION_DAYS`.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='library_removals',
+        help_text='User'
+    )
+    game_id = models.PositiveBigIntegerField(
+        help_text='Removed game (kept after the game is deleted)'
+    )
+    removed_at = models.DateTimeField(
+        auto_now_add=True,
+        help_text='Date removed from library'
+    )
+
+    class Meta:
+        verbose_name = 'Library Removal'
+        verbose_name_plural = 'Library Removals'
+        ordering = ['removed_at']
+        indexes = [
+            models.Index(
+                fields=['user', 'removed_at'],
+                name='library_user_removed_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} removed game {self.game_id}"
+
+    @classmethod
+    def record(cls, user, game_ids):
+        cls.objects.bulk_create([
+            cls(user=user, game_id=game_id) for game_id in game_ids
+        ])
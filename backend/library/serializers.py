@@ -25,3 +25,24 @@ class LibraryEntrySerializer(serializers.ModelSerializer):
         rep = super().to_representation(instance)
         rep['game'] = GameSerializer(instance.game, context=self.context).data
         return rep
+
+
+class LibraryBulkSerializer(serializers.Serializer):
+    """Bulk add/remove of games (by id) in the user's library"""
+    add = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        max_length=1000,
+    )
+    remove = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        max_length=1000,
+    )
+
+    def validate(self, attrs):
+        if not attrs.get('add') and not attrs.get('remove'):
+            raise serializers.ValidationError(
+                'Send game ids in `add` and/or `remove`.'
+            )
+        return attrs
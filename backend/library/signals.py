@@ -0,0 +1,16 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import invalidate_library
+from .models import LibraryEntry
+
+
+@receiver(post_save, sender=LibraryEntry)
+@receiver(post_delete, sender=LibraryEntry)
+def library_entry_changed(sender, instance, raw=False, **kwargs):
+    """Drop the user's cached library ids when an entry is added or removed.
+
+    `bulk_create` sends no signals; the bulk endpoint invalidates itself.
+    """
+    if not raw:
+        invalidate_library(instance.user_id)
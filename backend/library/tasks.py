@@ -0,0 +1,16 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from jobs.queue import task
+
+from .models import LibraryRemoval
+
+
+@task(name='library.prune_removals')
+def prune_removals():
+    """Drop library tombstones past the retention period."""
+    cutoff = timezone.now() - timedelta(
+        days=settings.LIBRARY_TOMBSTONE_RETENTION_DAYS
+    )
+    LibraryRemoval.objects.filter(removed_at__lt=cutoff).delete()
@@ -1,4 +1,9 @@
+from datetime import timedelta
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APITestCase
 from django.contrib.auth import get_user_model
@@ -45,3 +50,102 @@ class LibraryTests(APITestCase):
         response = self.client.delete(url)
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertEqual(LibraryEntry.objects.count(), 0)
+
+    def test_bulk_add_remove_and_delta_sync(self):
+        other = Game.objects.create(
+            title='Second', title_ar='لعبة', description='D', description_ar='و',
+            developer=self.dev, status='approved'
+        )
+        pending = Game.objects.create(
+            title='Pending', title_ar='لعبة', description='D', description_ar='و',
+            developer=self.dev
+        )
+        LibraryEntry.objects.create(user=self.user, game=self.game)
+        self.client.force_authenticate(user=self.user)
+
+        start = self.client.get(reverse('libraryentry-changes'), {'since': '2000-01-01T00:00:00Z'})
+        self.assertEqual(start.status_code, status.HTTP_410_GONE)
+        cursor = self.client.get(
+            reverse('libraryentry-changes'), {'since': '2100-01-01T00:00:00Z'}
+        ).data['cursor']
+
+        # Re-adding an existing game is a no-op instead of an IntegrityError
+        url = reverse('libraryentry-bulk')
+        response = self.client.post(url, {'add': [self.game.id, other.id, pending.id]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['added'], [other.id])
+        self.assertEqual(response.data['invalid'], [pending.id])
+        response = self.client.post(url, {'remove': [self.game.id, 9999]}, format='json')
+        self.assertEqual(response.data['removed'], [self.game.id])
+
+        # Changes younger than the commit lag are held back
+        response = self.client.get(reverse('libraryentry-changes'), {'since': cursor.isoformat()})
+        self.assertEqual(response.data['added'], [])
+        self.assertEqual(response.data['removed'], [])
+        self.assertLessEqual(response.data['cursor'], timezone.now() - timedelta(seconds=5))
+
+        with override_settings(CATALOG_CHANGES_COMMIT_LAG=0):
+            response = self.client.get(reverse('libraryentry-changes'), {'since': cursor.isoformat()})
+        self.assertEqual([e['game']['id'] for e in response.data['added']], [other.id])
+        self.assertEqual(response.data['removed'], [self.game.id])
+
+        response = self.client.get(reverse('libraryentry-list'), {'compact': '1'})
+        self.assertEqual(response.data, [other.id])
+
+    def test_in_library_flag_on_game_lists(self):
+        other = Game.objects.create(
+            title='Second', title_ar='لعبة', description='D', description_ar='و',
+            developer=self.dev, status='approved'
+        )
+        LibraryEntry.objects.create(user=self.user, game=self.game)
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get(reverse('game-list-list'))
+        flags = {g['id']: g['in_library'] for g in response.data}
+        self.assertEqual(flags, {self.game.id: True, other.id: False})
+
+        # The id set is cached: later lists do not touch library entries
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('game-list-list'))
+        self.assertFalse([q for q in queries if 'library_libraryentry' in q['sql']])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('libraryentry-bulk'), {'add': [other.id]}, format='json')
+        response = self.client.get(reverse('game-list-list'))
+        self.assertTrue(all(g['in_library'] for g in response.data))
+
+        self.client.force_authenticate(user=None)
+        response = self.client.get(reverse('game-list-list'))
+        self.assertIsNone(response.data[0]['in_library'])
+
+        # Library writes only invalidate the writer's cached game lists
+        anon_etag = response['ETag']
+        self.client.force_authenticate(user=self.other_user)
+        other_etag = self.client.get(reverse('game-list-list'))['ETag']
+        self.client.force_authenticate(user=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('libraryentry-bulk'), {'remove': [other.id]}, format='json')
+        self.assertFalse(self.client.get(reverse('game-list-list')).data[0]['in_library'])
+        self.client.force_authenticate(user=self.other_user)
+        response = self.client.get(reverse('game-list-list'), HTTP_IF_NONE_MATCH=other_etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.client.force_authenticate(user=None)
+        response = self.client.get(reverse('game-list-list'), HTTP_IF_NONE_MATCH=anon_etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_library_list_conditional_get(self):
+        self.client.force_authenticate(user=self.user)
+        url = reverse('libraryentry-list')
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Another user's library has its own validator
+        self.client.force_authenticate(user=self.other_user)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+        self.client.force_authenticate(user=self.user)
+        self.client.post(url, {'game': self.game.id})
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
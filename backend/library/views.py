@@ -1,25 +1,41 @@
+from datetime import timedelta
 from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db import IntegrityError
-from .models import LibraryEntry
-from .serializers import LibraryEntrySerializer
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from api.cache import ConditionalGetMixin
+from games.models import Category, Game, Screenshot
+from .cache import invalidate_library
+from .models import LibraryEntry, LibraryRemoval
+from .serializers import LibraryBulkSerializer, LibraryEntrySerializer
 from users.permissions import IsOwnerOrAdmin
 
 
-class LibraryEntryViewSet(viewsets.ModelViewSet):
+class LibraryEntryViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet for user's library entries.
     - list: authenticated user's entries (admin sees all)
     - create: add an approved game to the authenticated user's
       library (requires login)
     - retrieve/destroy: owner or admin only
+    - bulk: add/remove many games at once (idempotent)
+    - changes: entries added and games removed since a timestamp
+    - `?compact=1` on list/changes returns game ids instead of entries
+    - list/retrieve answer conditional GETs (api/cache.py)
     """
     queryset = LibraryEntry.objects.all()
     serializer_class = LibraryEntrySerializer
     permission_classes = [permissions.IsAuthenticated]
+    cache_models = (
+        LibraryEntry, Game, Game.categories.through, Category, Screenshot,
+    )
+    cache_per_user = True
 
     def get_permissions(self):
         # list/create require auth; retrieve/destroy require owner/admin
-        if self.action in ['list', 'create']:
+        if self.action in ['list', 'create', 'bulk', 'changes']:
             return [permissions.IsAuthenticated()]
         return [permissions.IsAuthenticated(), IsOwnerOrAdmin()]
 
@@ -30,9 +46,11 @@ class LibraryEntryViewSet(viewsets.ModelViewSet):
             and user.is_authenticated
             and getattr(user, 'role', None) == 'admin'
         ):
-            return LibraryEntry.objects.all()
+            return LibraryEntry.objects.select_related('game__cover')
         if user and user.is_authenticated:
-            return LibraryEntry.objects.filter(user=user)
+            return LibraryEntry.objects.filter(user=user).select_related(
+                'game__cover'
+            )
         return LibraryEntry.objects.none()
 
     def create(self, request, *args, **kwargs):
@@ -58,3 +76,116 @@ class LibraryEntryViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         serializer.save()
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            LibraryRemoval.record(instance.user, [instance.game_id])
+            instance.delete()
+
+    def _compact(self):
+        return self.request.query_params.get('compact') in ('1', 'true')
+
+    def list(self, request, *args, **kwargs):
+        if self._compact():
+            game_ids = self.get_queryset().values_list('game_id', flat=True)
+            return Response(list(game_ids))
+        return super().list(request, *args, **kwargs)
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Add and/or remove games: `{"add": [ids], "remove": [ids]}`.
+
+        Adding a game already in the library or removing one that is not
+        there is a no-op, so retries are safe.
+        """
+        serializer = LibraryBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        add = set(serializer.validated_data.get('add', []))
+        remove = set(serializer.validated_data.get('remove', [])) - add
+        user = request.user
+
+        with transaction.atomic():
+            valid = set(
+                Game.objects.filter(pk__in=add, status='approved')
+                .values_list('pk', flat=True)
+            )
+            existing = set(
+                LibraryEntry.objects.filter(user=user, game_id__in=valid)
+                .values_list('game_id', flat=True)
+            )
+            LibraryEntry.objects.bulk_create(
+                [LibraryEntry(user=user, game_id=pk) for pk in valid],
+                ignore_conflicts=True,
+            )
+
+            entries = LibraryEntry.objects.filter(
+                user=user, game_id__in=remove
+            )
+            removed = set(entries.values_list('game_id', flat=True))
+            if removed:
+                entries.delete()
+                LibraryRemoval.record(user, removed)
+            if valid - existing or removed:
+                transaction.on_commit(lambda: invalidate_library(user.pk))
+
+        return Response({
+            'added': sorted(valid - existing),
+            'removed': sorted(removed),
+            'invalid': sorted(add - valid),
+        })
+
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
+        """Entries added and game ids removed after `?since=<ISO time>`.
+
+        Pass the returned `cursor` as `since` on the next call. A `since`
+        older than the tombstone retention gets 410; the client must then
+        reload the full list. Changes are served once they are
+        `CATALOG_CHANGES_COMMIT_LAG` seconds old.
+        """
+        since = parse_datetime(request.query_params.get('since', ''))
+        if since is None:
+            return Response(
+                {'detail': 'An ISO 8601 `since` timestamp is required.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        # Rows are stamped before their transaction commits; stop the
+        # window short of the present so that a row committing late is
+        # not behind the returned cursor
+        cursor = timezone.now() - timedelta(
+            seconds=settings.CATALOG_CHANGES_COMMIT_LAG
+        )
+        retention = timedelta(days=settings.LIBRARY_TOMBSTONE_RETENTION_DAYS)
+        if since < cursor - retention:
+            return Response(
+                {'detail': 'Cursor is too old, reload the full library.'},
+                status=status.HTTP_410_GONE
+            )
+
+        user = request.user
+        added = LibraryEntry.objects.filter(
+            user=user, added_at__gt=since, added_at__lte=cursor
+        ).select_related('game__cover')
+        removed = set(
+            LibraryRemoval.objects.filter(
+                user=user, removed_at__gt=since, removed_at__lte=cursor
+            )
+            .values_list('game_id', flat=True)
+        )
+        if removed:
+            # Games removed and then added again are not removals
+            removed -= set(
+                LibraryEntry.objects.filter(user=user, game_id__in=removed)
+                .values_list('game_id', flat=True)
+            )
+        if self._compact():
+            added = list(added.values_list('game_id', flat=True))
+        else:
+            added = self.get_serializer(added, many=True).data
+        return Response({
+            'cursor': cursor,
+            'added': added,
+            'removed': sorted(removed),
+        })